@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  actor_concurrency.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Compares the throughput of an actor whose consumer waits on cooperative I/O
+with a single consumer, with concurrent consumers and with concurrent
+consumers releasing their events in order.
+
+Usage::
+
+    $ python benchmarks/actor_concurrency.py
+'''
+
+from gevent import spawn, sleep
+from time import time
+from wishbone.actorconfig import ActorConfig
+from wishbone.event import Event
+from wishbone.module import ProcessModule
+
+EVENTS = 2000
+BATCH = 100
+SIZE = 1000
+LATENCY = 0.001
+
+
+class Lookup(ProcessModule):
+
+    def __init__(self, actor_config):
+        ProcessModule.__init__(self, actor_config)
+        self.pool.createQueue("inbox")
+        self.pool.createQueue("outbox")
+        self.registerConsumer(self.consume, "inbox")
+
+    def consume(self, event):
+        sleep(LATENCY)
+        self.submit(event, "outbox")
+
+
+def run(concurrency, ordered):
+
+    events = [Event(i) for i in range(EVENTS)]
+    module = Lookup(ActorConfig("lookup", SIZE, 60, {}, "", concurrency=concurrency, ordered=ordered))
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.start()
+
+    def produce():
+        for index in range(0, len(events), BATCH):
+            module.pool.queue.inbox.putMany(events[index:index + BATCH])
+
+    start = time()
+    spawn(produce)
+    count = 0
+    while count < len(events):
+        count += len(module.pool.queue.outbox.getMany(BATCH))
+    module.stop()
+    return len(events) / (time() - start)
+
+
+def main():
+
+    print("%-24s %s" % ("scenario", "events/s"))
+    for name, concurrency, ordered in [("concurrency 1", 1, False),
+                                       ("concurrency 50", 50, False),
+                                       ("concurrency 50 ordered", 50, True)]:
+        print("%-24s %.0f" % (name, run(concurrency, ordered)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  event_clone.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Compares ``Event.clone()`` followed by a single field mutation against the
+previous full ``deepcopy()`` based clone for various payload sizes.
+
+Usage::
+
+    $ python benchmarks/event_clone.py
+'''
+
+import json
+from copy import deepcopy
+from timeit import repeat
+from wishbone.event import Event
+
+PAYLOAD_SIZES = [512, 2048, 5120, 10240]
+BRANCHES = 5
+ROUNDS = 1000
+
+
+def generatePayload(size):
+    '''
+    Generates a nested payload which is roughly ``size`` bytes in JSON.
+    '''
+
+    payload = {"host": "host01.local", "status": {"code": 0, "message": "ok"}, "items": []}
+    while len(json.dumps(payload)) < size:
+        payload["items"].append({"name": "metric_%s" % (len(payload["items"])), "value": 1.5, "tags": ["a", "b"]})
+    return payload
+
+
+def deepcopyClone(event):
+
+    e = deepcopy(event)
+    e.data["uuid_previous"].append(e.data["uuid"])
+    return e
+
+
+def fanout(clone, event):
+
+    for _ in range(BRANCHES):
+        e = clone(event)
+        e.set("switched", "data.status.message")
+
+
+def main():
+
+    print("%-12s %-18s %-18s %s" % ("payload", "deepcopy (us)", "clone (us)", "speedup"))
+    for size in PAYLOAD_SIZES:
+        event = Event(generatePayload(size))
+        old = min(repeat(lambda: fanout(deepcopyClone, event), number=ROUNDS, repeat=3)) / ROUNDS / BRANCHES * 1000000
+        new = min(repeat(lambda: fanout(Event.clone, event), number=ROUNDS, repeat=3)) / ROUNDS / BRANCHES * 1000000
+        print("%-12s %-18.2f %-18.2f %.1fx" % ("%s B" % (size), old, new, old / new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  log_format.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Compares filtering and formatting log events with the Jinja2 templates of
+the former ``_logs_filter`` and ``_logs_format`` modules against
+``LogSTDOUT``.
+
+Usage::
+
+    $ python benchmarks/log_format.py
+'''
+
+from timeit import repeat
+from time import time
+from wishbone.actor import ActorConfig, createTemplateEnvironment
+from wishbone.config.configfile import LOG_FILTER_TEMPLATE
+from wishbone.event import Event
+from wishbone.function.template.epoch import Epoch
+from wishbone.function.template.strftime import STRFTime
+from wishbone.module.logstdout import LogSTDOUT
+
+EVENTS = 1000
+ROUNDS = 10
+
+LOG_COLOR_TEMPLATE = '''
+    {%- if data.level == 0 -%}
+        \x1B[0;35m
+    {%- elif data.level == 1 -%}
+        \x1B[1;35m
+    {%- elif data.level == 2 -%}
+        \x1B[0;31m
+    {%- elif data.level == 3 -%}
+        \x1B[1;31m
+    {%- elif data.level == 4 -%}
+        \x1B[1;33m
+    {%- elif data.level == 5 -%}
+        \x1B[1;30m
+    {%- elif data.level == 6 -%}
+        \x1B[1;37m
+    {%- else -%}
+        \x1B[1;37m
+    {%- endif -%}
+    {{strftime(epoch(), "YYYY-MM-DDTHH:mm:ss.SSSSZZ")}} {{data.identification}}[{{data.pid}}] {{data.txt_level}} {{data.module}}: {{data.message}}\x1B[0m'''
+
+
+class Discard(object):
+
+    def write(self, data):
+        pass
+
+
+def main():
+
+    events = [Event({
+        "time": time(),
+        "identification": "wishbone",
+        "event_id": None,
+        "level": i % 8,
+        "txt_level": "debug",
+        "pid": 1,
+        "module": "benchmark",
+        "message": "Event with id '%s' dropped." % (i)
+    }) for i in range(EVENTS)]
+
+    environment = createTemplateEnvironment({"strftime": STRFTime(), "epoch": Epoch()})
+    log_filter = environment.from_string(LOG_FILTER_TEMPLATE.format(loglevel=6))
+    log_format = environment.from_string(LOG_COLOR_TEMPLATE)
+
+    def jinja():
+        for event in events:
+            view = event.getView()
+            if log_filter.render(view) == "pass":
+                log_format.render(view)
+
+    sink = LogSTDOUT(ActorConfig("logstdout", EVENTS, 60, {}, ""), loglevel=6)
+    sink.f = Discard()
+
+    def native():
+        for event in events:
+            event.kwargs = sink.kwargs
+            sink.consume(event)
+        sink.flush()
+
+    old = min(repeat(jinja, number=ROUNDS, repeat=3)) / ROUNDS / EVENTS * 1000000
+    new = min(repeat(native, number=ROUNDS, repeat=3)) / ROUNDS / EVENTS * 1000000
+    print("%-14s %-14s %s" % ("jinja2 (us)", "native (us)", "speedup"))
+    print("%-14.2f %-14.2f %.1fx" % (old, new, old / new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  logging_level.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Measures the cost of a debug() call which is above the configured log
+level against one which is generated.
+
+Usage::
+
+    $ python benchmarks/logging_level.py
+'''
+
+from time import time
+from wishbone.logging import Logging
+from wishbone.queue import Queue
+
+CALLS = 100000
+
+
+def run(level):
+
+    queue = Queue(CALLS)
+    queue.disableFallThrough()
+    logging = Logging("benchmark", queue, level=level)
+    start = time()
+    for i in range(CALLS):
+        logging.debug("Event with id '%s' and key '%s' dropped", i, "key")
+    return CALLS / (time() - start)
+
+
+def main():
+
+    print("%-10s %s" % ("loglevel", "calls/s"))
+    for level in [7, 6]:
+        print("%-10s %.0f" % (level, run(level)))
+
+
+if __name__ == '__main__':
+    main()
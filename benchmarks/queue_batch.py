@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  queue_batch.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Compares moving small events through a queue and through an actor one by
+one against putMany()/getMany() and batch draining consumers.
+
+Usage::
+
+    $ python benchmarks/queue_batch.py
+'''
+
+from gevent import spawn
+from time import time
+from wishbone.actorconfig import ActorConfig
+from wishbone.event import Event
+from wishbone.module import ProcessModule
+from wishbone.queue import Queue
+
+EVENTS = 200000
+BATCH = 100
+SIZE = 1000
+
+
+class PassThrough(ProcessModule):
+
+    def __init__(self, actor_config):
+        ProcessModule.__init__(self, actor_config)
+        self.pool.createQueue("inbox")
+        self.pool.createQueue("outbox")
+        self.registerConsumer(self.consume, "inbox")
+
+    def consume(self, event):
+        self.submit(event, "outbox")
+
+
+def queueSingle(events):
+
+    queue = Queue(SIZE)
+    queue.disableFallThrough()
+
+    def produce():
+        for event in events:
+            queue.put(event)
+
+    spawn(produce)
+    for _ in range(len(events)):
+        queue.get()
+
+
+def queueBatch(events):
+
+    queue = Queue(SIZE)
+    queue.disableFallThrough()
+
+    def produce():
+        for index in range(0, len(events), BATCH):
+            queue.putMany(events[index:index + BATCH])
+
+    spawn(produce)
+    count = 0
+    while count < len(events):
+        count += len(queue.getMany(BATCH))
+
+
+def actor(batch_size):
+
+    def run(events):
+
+        module = PassThrough(ActorConfig("passthrough", SIZE, 60, {}, "", batch_size=batch_size))
+        module.pool.queue.inbox.disableFallThrough()
+        module.pool.queue.outbox.disableFallThrough()
+        module.start()
+
+        def produce():
+            for index in range(0, len(events), BATCH):
+                module.pool.queue.inbox.putMany(events[index:index + BATCH])
+
+        spawn(produce)
+        count = 0
+        while count < len(events):
+            count += len(module.pool.queue.outbox.getMany(BATCH))
+        module.stop()
+
+    return run
+
+
+def main():
+
+    events = [Event(i) for i in range(EVENTS)]
+    print("%-34s %s" % ("scenario", "events/s"))
+    for name, scenario in [("queue put/get", queueSingle),
+                           ("queue putMany/getMany", queueBatch),
+                           ("actor consumer", actor(1)),
+                           ("actor consumer batch_size=%s" % (BATCH), actor(BATCH))]:
+        start = time()
+        scenario(events)
+        print("%-34s %.0f" % (name, EVENTS / (time() - start)))
+
+
+if __name__ == '__main__':
+    main()
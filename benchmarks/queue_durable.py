@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  queue_durable.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Measures the throughput of a durable queue without group commit (one fsync
+per event) and with group commit for different commit sizes, compared to a
+volatile queue.  Each event is put, consumed and acknowledged.
+
+Usage::
+
+    $ python benchmarks/queue_durable.py [directory]
+'''
+
+import os
+import sys
+from tempfile import mkdtemp
+from time import time
+from wishbone.event import Event
+from wishbone.queue import Queue
+
+EVENTS = 20000
+BATCH = 100
+SIZE = 1000
+
+
+def run(events, commit_size=None, directory=None):
+
+    queue = Queue(SIZE)
+    queue.disableFallThrough()
+    if commit_size is not None:
+        queue.enableDurability(os.path.join(directory, "%s.wal" % (commit_size)), commit_size=commit_size, commit_interval=1)
+
+    start = time()
+    for index in range(0, len(events), BATCH):
+        queue.putMany(events[index:index + BATCH])
+        for event in queue.getMany(BATCH):
+            queue.ack(event)
+    elapsed = time() - start
+
+    if commit_size is not None:
+        queue.clean()
+    return len(events) / elapsed
+
+
+def main():
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else mkdtemp()
+    events = [Event({"host": "web%s" % (i % 10), "value": i}) for i in range(EVENTS)]
+    print("%-34s %s" % ("scenario", "events/s"))
+    print("%-34s %.0f" % ("volatile", run(events)))
+    print("%-34s %.0f" % ("durable without group commit", run(events[:EVENTS // 10], 1, directory)))
+    for commit_size in [10, 100, 1000]:
+        print("%-34s %.0f" % ("durable commit_size=%s" % (commit_size), run(events, commit_size, directory)))
+
+
+if __name__ == '__main__':
+    main()
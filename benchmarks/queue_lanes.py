@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  queue_lanes.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Measures the time a control event submitted into a full queue of data
+events waits before it is consumed, with and without priority lanes, and
+the consume throughput of both.
+
+Usage::
+
+    $ python benchmarks/queue_lanes.py
+'''
+
+from time import time
+from wishbone.event import Event
+from wishbone.queue import Queue
+
+SIZE = 10000
+WORK = 0.00002
+
+
+def run(lanes):
+
+    queue = Queue(SIZE + 1, lanes=lanes)
+    queue.disableFallThrough()
+    for i in range(SIZE):
+        queue.put(Event(i))
+    control = Event("control")
+    control.set(1, "priority")
+    queue.put(control)
+
+    start = time()
+    consumed = 0
+    waited = None
+    while not queue.empty():
+        event = queue.get()
+        consumed += 1
+        deadline = time() + WORK
+        while time() < deadline:
+            pass
+        if event is control:
+            waited = time() - start
+    return waited, consumed / (time() - start)
+
+
+def main():
+
+    print("%-10s %-18s %s" % ("lanes", "control wait (ms)", "events/s"))
+    for lanes in [1, 2]:
+        waited, rate = run(lanes)
+        print("%-10s %-18.3f %.0f" % (lanes, waited * 1000, rate))
+
+
+if __name__ == '__main__':
+    main()
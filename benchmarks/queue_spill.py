@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  queue_spill.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Measures filling a queue far beyond its size with disk spilling enabled and
+draining it again, for each fsync policy.
+
+Usage::
+
+    $ python benchmarks/queue_spill.py [directory]
+'''
+
+import sys
+from tempfile import mkdtemp
+from time import time
+from wishbone.event import Event
+from wishbone.queue import Queue
+
+EVENTS = 100000
+SIZE = 1000
+
+
+def main():
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else mkdtemp()
+    events = [Event({"host": "web%s" % (i % 10), "value": i}) for i in range(EVENTS)]
+    print("%-16s %-14s %-14s %s" % ("fsync", "spill ev/s", "unspill ev/s", "bytes/event"))
+    for fsync in ["never", "segment", "always"]:
+        queue = Queue(SIZE)
+        queue.disableFallThrough()
+        queue.enableSpill(directory, segment_size=4194304, fsync=fsync)
+        count = EVENTS if fsync != "always" else EVENTS // 10
+
+        start = time()
+        for event in events[:count]:
+            queue.put(event)
+        spill = count / (time() - start)
+        size = sum(len(event.pack()) for event in events[:100]) / 100
+
+        start = time()
+        for _ in range(count):
+            queue.get()
+        unspill = count / (time() - start)
+        print("%-16s %-14.0f %-14.0f %.0f" % (fsync, spill, unspill, size))
+        queue.clean()
+
+
+if __name__ == '__main__':
+    main()
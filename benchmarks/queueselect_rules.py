@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  queueselect_rules.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Compares selecting queues out of N Jinja2 rule templates against the same
+rules expressed declaratively and compiled into a ``RuleIndex``.
+
+Usage::
+
+    $ python benchmarks/queueselect_rules.py
+'''
+
+from timeit import repeat
+from jinja2 import Environment, StrictUndefined
+from wishbone.event import Event
+from wishbone.utils.ruleindex import RuleIndex
+
+RULES = [10, 50, 200]
+ROUNDS = 1000
+
+
+def main():
+
+    env = Environment(undefined=StrictUndefined, trim_blocks=True)
+    events = [Event({"customer": "customer_%s" % (i), "level": i % 7}) for i in range(100)]
+
+    print("%-8s %-14s %-14s %s" % ("rules", "jinja2 (us)", "index (us)", "speedup"))
+    for amount in RULES:
+        templates = [env.from_string("{{ 'queue_%s' if data.customer == 'customer_%s' and data.level > 2 else '' }}" % (i, i)) for i in range(amount)]
+        index = RuleIndex([{"name": i, "queue": "queue_%s" % (i), "match": {"data.customer": "customer_%s" % (i), "data.level": {"gt": 2}}} for i in range(amount)])
+
+        def jinja():
+            for event in events:
+                view = event.getView()
+                [t.render(view) for t in templates]
+
+        def rules():
+            for event in events:
+                index.match(event)
+
+        old = min(repeat(jinja, number=ROUNDS // amount, repeat=3)) / (ROUNDS // amount) / len(events) * 1000000
+        new = min(repeat(rules, number=ROUNDS // amount, repeat=3)) / (ROUNDS // amount) / len(events) * 1000000
+        print("%-8s %-14.2f %-14.2f %.1fx" % (amount, old, new, old / new))
+
+
+if __name__ == '__main__':
+    main()
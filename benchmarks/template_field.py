@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  template_field.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Compares rendering single field reference templates through Jinja2 against
+the ``FieldTemplate`` fast path.
+
+Usage::
+
+    $ python benchmarks/template_field.py
+'''
+
+from timeit import repeat
+from jinja2 import Environment, StrictUndefined
+from wishbone.event import Event, compileFieldTemplate
+
+TEMPLATES = ["{{data.host}}", "{{tmp.switch.queue}}", "{{data.metrics[2].name}}"]
+ROUNDS = 100000
+
+
+def main():
+
+    env = Environment(undefined=StrictUndefined, trim_blocks=True)
+    event = Event({"host": "host01.local", "metrics": [{"name": "metric_%s" % (i)} for i in range(5)]})
+    event.set({"queue": "outbox"}, "tmp.switch")
+    view = event.getView()
+
+    print("%-26s %-14s %-14s %s" % ("template", "jinja2 (us)", "field (us)", "speedup"))
+    for source in TEMPLATES:
+        jinja = env.from_string(source)
+        field = compileFieldTemplate(env, source)
+        old = min(repeat(lambda: jinja.render(view), number=ROUNDS, repeat=3)) / ROUNDS * 1000000
+        new = min(repeat(lambda: field.render(view), number=ROUNDS, repeat=3)) / ROUNDS * 1000000
+        print("%-26s %-14.2f %-14.2f %.1fx" % (source, old, new, old / new))
+
+
+if __name__ == '__main__':
+    main()
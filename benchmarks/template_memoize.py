@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  template_memoize.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+'''
+Compares rendering routing style templates through Jinja2 against the
+``MemoizedTemplate`` which caches results per referred field value.
+
+Usage::
+
+    $ python benchmarks/template_memoize.py
+'''
+
+from timeit import repeat
+from jinja2 import Environment, StrictUndefined
+from wishbone.event import Event, compileTemplate
+
+TEMPLATES = [
+    "{% if data.level > 3 %}critical{% else %}outbox{% endif %}",
+    "{{tmp.switch.queue}}_{{data.env|lower}}"
+]
+ROUNDS = 100000
+
+
+def main():
+
+    env = Environment(undefined=StrictUndefined, trim_blocks=True)
+    events = []
+    for i in range(10):
+        event = Event({"level": i % 5, "env": "PROD"})
+        event.set({"queue": "outbox"}, "tmp.switch")
+        events.append(event.getView())
+
+    print("%-60s %-14s %-14s %s" % ("template", "jinja2 (us)", "memo (us)", "speedup"))
+    for source in TEMPLATES:
+        jinja = env.from_string(source)
+        memo = compileTemplate(env, source)
+        old = min(repeat(lambda: [jinja.render(view) for view in events], number=ROUNDS // 10, repeat=3)) / ROUNDS * 1000000
+        new = min(repeat(lambda: [memo.render(view) for view in events], number=ROUNDS // 10, repeat=3)) / ROUNDS * 1000000
+        print("%-60s %-14.2f %-14.2f %.1fx" % (source, old, new, old / new))
+
+
+if __name__ == '__main__':
+    main()
@@ -146,6 +146,7 @@ setup(
             'generator = wishbone.module.generator:Generator',
         ],
         'wishbone.module.output': [
+            'logstdout = wishbone.module.logstdout:LogSTDOUT',
             'null = wishbone.module.null:Null',
             'stdout = wishbone.module.stdout:STDOUT',
             'syslog = wishbone.module.wbsyslog:Syslog',
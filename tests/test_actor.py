@@ -23,9 +23,13 @@
 #
 
 from wishbone.actorconfig import ActorConfig
-from wishbone.module import InputModule, OutputModule
+from wishbone.module import InputModule, OutputModule, ProcessModule
+from wishbone.event import Event, FieldTemplate
+from wishbone.utils.test import getter
 from wishbone.error import ModuleInitFailure
 from wishbone.protocol.decode.plain import Plain
+from wishbone.hook import ConsumeHook
+from gevent import sleep
 
 
 class DummyModule(InputModule):
@@ -142,3 +146,240 @@ def test_init_outputmodule_bad():
             assert True
         else:
             assert False
+
+
+class KwargsModule(ProcessModule):
+
+    def __init__(self, actor_config, static="static", dynamic="static"):
+        ProcessModule.__init__(self, actor_config)
+        self.pool.createQueue("inbox")
+        self.pool.createQueue("outbox")
+        self.registerConsumer(self.consume, "inbox")
+
+    def consume(self, event):
+        event.set({"static": event.kwargs.static, "dynamic": event.kwargs.dynamic, "shared": event.kwargs is self.kwargs}, "data")
+        self.submit(event, "outbox")
+
+
+def test_kwargs_static():
+
+    actor_config = ActorConfig('kwargs', 100, 1, {}, "", disable_exception_handling=True)
+    module = KwargsModule(actor_config)
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.start()
+
+    assert module.kwargs_dynamic == {}
+    module.pool.queue.inbox.put(Event("hello"))
+    assert getter(module.pool.queue.outbox).get() == {"static": "static", "dynamic": "static", "shared": True}
+    module.stop()
+
+
+def test_kwargs_dynamic():
+
+    actor_config = ActorConfig('kwargs', 100, 1, {}, "", disable_exception_handling=True)
+    module = KwargsModule(actor_config, dynamic="{{data}}")
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.start()
+
+    assert list(module.kwargs_dynamic.keys()) == ["dynamic"]
+    module.pool.queue.inbox.put(Event("hello"))
+    assert getter(module.pool.queue.outbox).get() == {"static": "static", "dynamic": "hello", "shared": False}
+    module.stop()
+
+
+def test_kwargs_field_template():
+
+    actor_config = ActorConfig('kwargs', 100, 1, {}, "", disable_exception_handling=True)
+    module = KwargsModule(actor_config, static="{{data.one}} and {{data.two}}", dynamic="{{data.numbers[1]}}")
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.start()
+
+    assert isinstance(module.kwargs_dynamic["dynamic"], FieldTemplate)
+    assert not isinstance(module.kwargs_dynamic["static"], FieldTemplate)
+    module.pool.queue.inbox.put(Event({"one": 1, "two": 2, "numbers": [1, 2]}))
+    assert getter(module.pool.queue.outbox).get() == {"static": "1 and 2", "dynamic": 2, "shared": False}
+    module.stop()
+
+
+def test_batch_size():
+
+    actor_config = ActorConfig('kwargs', 100, 1, {}, "", disable_exception_handling=True, batch_size=10)
+    module = KwargsModule(actor_config, dynamic="{{data}}")
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue.inbox.putMany([Event("one"), Event("two")])
+    module.start()
+
+    assert getter(module.pool.queue.outbox).get()["dynamic"] == "one"
+    assert getter(module.pool.queue.outbox).get()["dynamic"] == "two"
+    module.stop()
+
+
+def test_durable_ack(tmpdir):
+
+    actor_config = ActorConfig('kwargs', 100, 1, {}, "", disable_exception_handling=True)
+    module = KwargsModule(actor_config, dynamic="{{data}}")
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.inbox.enableDurability(str(tmpdir.join("inbox.wal")))
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue.inbox.put(Event("one"))
+    assert module.pool.queue.inbox.stats()["wal_pending"] == 1
+    module.start()
+
+    assert getter(module.pool.queue.outbox).get()["dynamic"] == "one"
+    assert module.pool.queue.inbox.stats()["wal_pending"] == 0
+    module.stop()
+
+
+def test_instrument():
+
+    actor_config = ActorConfig('kwargs', 100, 1, {}, "", disable_exception_handling=True, instrument=True)
+    module = KwargsModule(actor_config, dynamic="{{data}}")
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue.inbox.put(Event("one"))
+    module.start()
+
+    assert getter(module.pool.queue.outbox).get()["dynamic"] == "one"
+    snapshot = dict((m["name"], m["value"]) for m in module.metrics.collect())
+    assert snapshot["module.kwargs.consume.inbox.function_time.count"] == 1
+    assert snapshot["module.kwargs.consume.inbox.functions_time.count"] == 1
+    assert snapshot["module.kwargs.submit_time.count"] >= 2
+    module.stop()
+
+
+def test_consume_hook():
+
+    class Hook(ConsumeHook):
+
+        def __init__(self):
+            self.calls = []
+
+        def preConsume(self, actor, queue, event):
+            self.calls.append(("pre", queue, event.get("data")))
+
+        def postConsume(self, actor, queue, event, error):
+            self.calls.append(("post", queue, event.get("data.dynamic"), error))
+
+    hook = Hook()
+    actor_config = ActorConfig('kwargs', 100, 1, {}, "", disable_exception_handling=True)
+    module = KwargsModule(actor_config, dynamic="{{data}}")
+    module.registerConsumeHook(hook)
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue.inbox.put(Event("one"))
+    module.start()
+
+    getter(module.pool.queue.outbox)
+    assert hook.calls == [("pre", "inbox", "one"), ("post", "inbox", "one", None)]
+    module.stop()
+
+
+class SleepModule(ProcessModule):
+
+    def __init__(self, actor_config):
+        ProcessModule.__init__(self, actor_config)
+        self.pool.createQueue("inbox")
+        self.pool.createQueue("outbox")
+        self.registerConsumer(self.consume, "inbox")
+
+    def consume(self, event):
+        self.logging.debug("Consuming %s", event.get("data"))
+        sleep(event.get("data"))
+        self.submit(event, "outbox")
+
+
+def test_concurrency():
+
+    actor_config = ActorConfig('sleep', 100, 1, {}, "", disable_exception_handling=True, concurrency=3)
+    module = SleepModule(actor_config)
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue._logs.disableFallThrough()
+    module.pool.queue.inbox.putMany([Event(0.2), Event(0.1), Event(0)])
+    module.start()
+
+    assert len(module.greenlets.consumer) == 3
+    events = [getter(module.pool.queue.outbox) for _ in range(3)]
+    assert [e.get() for e in events] == [0, 0.1, 0.2]
+
+    event_ids = {}
+    while module.pool.queue._logs.size() > 0:
+        log = module.pool.queue._logs.get().get()
+        if log["message"].startswith("Consuming"):
+            event_ids[log["message"]] = log["event_id"]
+    assert event_ids == dict(("Consuming %s" % (e.get()), e.get("uuid")) for e in events)
+    module.stop()
+
+
+def test_concurrency_ordered():
+
+    actor_config = ActorConfig('sleep', 100, 1, {}, "", disable_exception_handling=True, concurrency=3, ordered=True)
+    module = SleepModule(actor_config)
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue.inbox.putMany([Event(0.2), Event(0.1), Event(0)])
+    module.start()
+
+    assert [getter(module.pool.queue.outbox).get() for _ in range(3)] == [0.2, 0.1, 0]
+    module.stop()
+
+
+def test_submit_invalid(tmpdir):
+
+    actor_config = ActorConfig('kwargs', 100, 1, {}, "", disable_exception_handling=True)
+    module = KwargsModule(actor_config, dynamic="{{data}}")
+    module.pool.createQueue("outbox", 1)
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue.outbox.enableSpill(str(tmpdir.join("spill")))
+    module.pool.queue._logs.disableFallThrough()
+    module.pool.queue.inbox.putMany([Event("one"), Event(set([1])), Event("two")])
+    module.start()
+
+    assert getter(module.pool.queue.outbox).get()["dynamic"] == "one"
+    assert getter(module.pool.queue.outbox).get()["dynamic"] == "two"
+    assert module.pool.queue.outbox.stats()["dropped_invalid_total"] == 1
+    messages = []
+    while module.pool.queue._logs.size() > 0:
+        messages.append(module.pool.queue._logs.get().get("data.message"))
+    assert any("dropped by queue outbox" in message for message in messages)
+    module.stop()
+
+
+def test_concurrency_ordered_instrument():
+
+    actor_config = ActorConfig('sleep', 100, 1, {}, "", disable_exception_handling=True, concurrency=2, ordered=True, instrument=True)
+    module = SleepModule(actor_config)
+    module.pool.createQueue("outbox", 1)
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue.inbox.putMany([Event(0), Event(0)])
+    module.start()
+
+    sleep(0.2)
+    assert [getter(module.pool.queue.outbox).get() for _ in range(2)] == [0, 0]
+    snapshot = dict((m["name"], m["value"]) for m in module.metrics.collect())
+    assert snapshot["module.sleep.submit_time.max"] >= 0.1
+    module.stop()
+
+
+def test_instrument_submit_excluded():
+
+    actor_config = ActorConfig('sleep', 100, 1, {}, "", disable_exception_handling=True, instrument=True)
+    module = SleepModule(actor_config)
+    module.pool.createQueue("outbox", 1)
+    module.pool.queue.inbox.disableFallThrough()
+    module.pool.queue.outbox.disableFallThrough()
+    module.pool.queue.inbox.putMany([Event(0), Event(0)])
+    module.start()
+
+    sleep(0.2)
+    assert [getter(module.pool.queue.outbox).get() for _ in range(2)] == [0, 0]
+    snapshot = dict((m["name"], m["value"]) for m in module.metrics.collect())
+    assert snapshot["module.sleep.submit_time.max"] >= 0.1
+    assert snapshot["module.sleep.consume.inbox.function_time.max"] < 0.1
+    module.stop()
@@ -81,11 +81,12 @@ class Test_ConfigFile():
 
         c = ConfigFile('/tmp/.test_bootstrap.yaml', 'STDOUT')
         assert "_logs_stdout" in c.dump()["modules"]
-        assert c.dump()["modules"]["_logs_stdout"]["module"] == "wishbone.module.output.stdout"
+        assert c.dump()["modules"]["_logs_stdout"]["module"] == "wishbone.module.output.logstdout"
+        assert "_logs_filter" not in c.dump()["modules"]
 
     def test_logfilter_setup(self):
 
-        c = ConfigFile('/tmp/.test_bootstrap.yaml', 'STDOUT')
+        c = ConfigFile('/tmp/.test_bootstrap.yaml', 'SYSLOG')
         assert "_logs_filter" in c.dump()["modules"]
         assert c.dump()["modules"]["_logs_filter"]["module"] == "wishbone.module.flow.queueselect"
 
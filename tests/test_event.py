@@ -22,8 +22,11 @@
 #
 #
 
-from wishbone.event import Event
+from wishbone.event import Event, compileFieldTemplate, compileTemplate, MemoizedTemplate
 from wishbone.error import TTLExpired, InvalidData, BulkFull
+from jinja2 import Environment
+import json
+from wishbone.function.template.epoch import Epoch
 
 
 def test_event_bulk_default():
@@ -287,3 +290,204 @@ def test_render_field():
     assert e.get("data.template") == "{{data.value}} how are you doing?"
     e.renderField("data.template")
     assert e.get("data.template") == "Hello how are you doing?"
+
+
+def test_event_clone_copy_on_write():
+
+    a = Event({"one": {"two": 2}, "three": [3]})
+    b = a.clone()
+
+    assert a.get("data.one") is b.get("data.one")
+
+    b.set(22, "data.one.two")
+    assert a.get("data.one.two") == 2
+    assert b.get("data.one.two") == 22
+    assert a.get("data.three") is b.get("data.three")
+
+    a.merge([33], "data.three")
+    assert a.get("data.three") == [3, 33]
+    assert b.get("data.three") == [3]
+
+    b.delete("data.one")
+    assert a.get("data.one") == {"two": 2}
+
+    b.set("c", "tmp.clone")
+    assert not a.has("tmp.clone")
+
+
+def test_event_list_index():
+
+    e = Event({"items": [{"name": "one"}, {"name": "two"}]})
+    assert e.get("data.items[1].name") == "two"
+    assert e.has("data.items[0].name")
+    assert not e.has("data.items[5].name")
+
+    e.set("three", "data.items[1].name")
+    assert e.get("data.items[1].name") == "three"
+
+
+def test_event_compiled_key():
+
+    from wishbone.event import compileKey, KeyPath
+
+    key = compileKey("data.one.two")
+    assert isinstance(key, KeyPath)
+    assert key.steps == ("data", "one", "two")
+    assert compileKey("data.one.two") is key
+    assert compileKey(key) is key
+
+    e = Event({"one": {"two": 2}})
+    assert e.get(key) == 2
+    assert e.has(key)
+    e.set(3, key)
+    assert e.get("data.one.two") == 3
+    e.delete(key)
+    assert not e.has(key)
+
+
+def test_event_header_lazy():
+
+    e = Event({"one": 1})
+    assert e.data.tmp is None
+    assert e.data.uuid is None
+
+    assert e.get("tmp") == {}
+    assert e.data.tmp == {}
+    assert e.get("uuid") == e.get("uuid")
+
+
+def test_event_header_dict_view():
+
+    from wishbone.event import EVENT_RESERVED
+
+    e = Event({"one": 1})
+    e.set("value", "custom")
+
+    assert sorted(e.data.keys()) == sorted(EVENT_RESERVED + ["custom"])
+    assert dict(e.data)["data"] == {"one": 1}
+    assert e.dump()["custom"] == "value"
+
+    b = Event().slurp(e.dump())
+    assert b.get("custom") == "value"
+    assert b.get("uuid") == e.get("uuid")
+
+
+def test_event_view():
+
+    e = Event({"one": {"two": [1, 2]}})
+    view = e.getView()
+
+    assert e.getView() is view
+    assert view["data"]["one"]["two"] == [1, 2]
+    assert view["data"]["one"] == {"two": [1, 2]}
+
+    e.set(3, "data.three")
+    assert view["data"]["three"] == 3
+
+
+def test_event_render_readonly():
+
+    e = Event({"one": [1]})
+
+    try:
+        e.render("{{data.one.append(2)}}")
+    except InvalidData:
+        assert True
+    else:
+        assert False
+
+    assert e.get("data.one") == [1]
+
+
+def test_field_template():
+
+    env = Environment()
+    e = Event({"host": "host01", "items": [{"value": 1}]})
+    assert compileFieldTemplate(env, "{{data.host}}").render(e.getView()) == "host01"
+    assert compileFieldTemplate(env, "{{ data['items'][0].value }}").render(e.getView()) == 1
+    assert compileFieldTemplate(env, "{{data.host|upper}}") is None
+    assert compileFieldTemplate(env, "host {{data.host}}") is None
+
+
+def test_field_template_container():
+
+    env = Environment()
+    e = Event({"d": {"x": 1}, "l": [1]})
+    e.set(compileFieldTemplate(env, "{{data.d}}").render(e.getView()), "data.copy")
+    e.set(compileFieldTemplate(env, "{{data.l}}").render(e.getView()), "data.list")
+    e.set(2, "data.copy.y")
+    e.merge([2], "data.list")
+    assert e.get("data.d") == {"x": 1}
+    assert e.get("data.l") == [1]
+    assert json.loads(json.dumps(e.dump()))["data"]["copy"] == {"x": 1, "y": 2}
+    assert json.loads(json.dumps(e.dump()))["data"]["list"] == [1, 2]
+
+
+def test_memoized_template():
+
+    env = Environment()
+    t = compileTemplate(env, "{% if data.level > 3 %}high{% else %}low{% endif %}")
+    assert isinstance(t, MemoizedTemplate)
+    assert t.render(Event({"level": 5}).getView()) == "high"
+    assert t.render(Event({"level": 5, "other": 1}).getView()) == "high"
+    assert t.render(Event({"level": 1}).getView()) == "low"
+    assert len(t.results) == 2
+
+
+def test_memoized_template_nondeterministic():
+
+    env = Environment()
+    env.globals.update({"epoch": Epoch().get})
+    assert not isinstance(compileTemplate(env, "{{epoch()}}"), MemoizedTemplate)
+    assert not isinstance(compileTemplate(env, "{{data|random}}"), MemoizedTemplate)
+
+
+def test_event_pack():
+
+    from wishbone.event import unpackEvent
+    e = Event({"one": [1, 2], "two": "three"})
+    e.set("hello", "tmp.module")
+    u = unpackEvent(e.pack())
+    assert u.dump() == e.dump()
+    assert u.get("uuid") == e.get("uuid")
+
+
+def test_event_size():
+
+    e = Event("x" * 1000)
+    size = e.getSize()
+    assert size > 1000
+    assert e.clone().getSize() == size
+    e.set("x")
+    assert e.getSize() < size
+
+
+def test_event_size_carried():
+
+    e = Event(["x"] * 10)
+    assert e.size is None
+    size = e.getSize()
+    assert e.clone().size == size
+    e.set({"queue": "outbox"}, "tmp.module")
+    e.set(["one"], "tags")
+    assert e.size == size
+    e.set("x", "data[0]")
+    assert e.size is None
+    assert e.getSize() == size
+
+
+def test_render_list_operators():
+
+    e = Event({"l": [1, 2]})
+    assert e.render("{{data.l + [3]}}") == "[1, 2, 3]"
+    assert e.render("{{[0] + data.l}}") == "[0, 1, 2]"
+    assert e.render("{{data.l * 2}}") == "[1, 2, 1, 2]"
+
+
+def test_render_lazy_header():
+
+    e = Event("hello")
+    assert e.render("{{data}} {{random_value|default('none')}}") == "hello none"
+    assert e.data.uuid is None
+    assert e.data.tmp is None
+    assert len(e.render("{{uuid}}")) == 36
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_histogram.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.utils.histogram import Histogram, bucketIndex, bucketValue
+
+
+def test_buckets():
+
+    previous = 0
+    for value in range(100000):
+        index = bucketIndex(value)
+        assert index in (previous, previous + 1)
+        assert bucketValue(index) >= value
+        assert index == 0 or bucketValue(index - 1) < value
+        previous = index
+
+
+def test_percentiles():
+
+    h = Histogram()
+    for value in range(1, 1001):
+        h.record(value / 1000.0)
+    summary = h.summary()
+    assert abs(summary["p50"] - 0.5) < 0.5 * 0.04
+    assert abs(summary["p90"] - 0.9) < 0.9 * 0.04
+    assert abs(summary["p99"] - 0.99) < 0.99 * 0.04
+    assert summary["max"] == 1
+    assert summary["count"] == 1000
+
+
+def test_reset():
+
+    h = Histogram()
+    h.record(1)
+    h.reset()
+    assert h.summary() == {"p50": 0, "p90": 0, "p99": 0, "max": 0, "count": 0}
@@ -40,3 +40,17 @@ def test_module_logs():
     for key in ["time", "level", "pid", "module", "message"]:
         assert key in log
     test_event.stop()
+
+
+def test_module_logs_level():
+
+    actor_config = ActorConfig('generator', 100, 1, {}, "", loglevel=6)
+
+    test_event = Generator(actor_config)
+    test_event.pool.queue._logs.disableFallThrough()
+    test_event.logging.debug("Dropped %s", "at the source")
+    assert test_event.pool.queue._logs.size() == 0
+    test_event.logging.info("Event with id '%s' and key '%s'", "one", "two")
+    assert test_event.pool.queue._logs.get().get("data.message") == "Event with id 'one' and key 'two'"
+    assert test_event.logging.isEnabledFor(6)
+    assert not test_event.logging.isEnabledFor(7)
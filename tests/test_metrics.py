@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_metrics.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+
+from wishbone.metrics import MetricRegistry, MetricServer, snapshotEvent
+from wishbone.error import InvalidConfig
+from wishbone.actor import ActorConfig
+from wishbone.event import extractBulkItems
+from wishbone.module.unpack import Unpack
+from gevent import socket
+import json
+
+
+def test_registry():
+
+    registry = MetricRegistry(source="test")
+    registry.counter("a.counter").inc(2)
+    registry.counter("a.counter").inc()
+    registry.gauge("a.gauge").set(5)
+    registry.histogram("a.histogram").record(0.1)
+    registry.register("b", lambda: {"size": 1})
+
+    snapshot = {m["name"]: m["value"] for m in registry.collect()}
+    assert snapshot["a.counter"] == 3
+    assert snapshot["a.gauge"] == 5
+    assert snapshot["a.histogram.count"] == 1
+    assert snapshot["b.size"] == 1
+    assert registry.snapshot[0]["source"] == "test"
+    assert {m["name"]: m["value"] for m in registry.collect()}["a.histogram.count"] == 0
+
+    registry.unregister("a")
+    assert [m["name"] for m in registry.collect()] == ["b.size"]
+
+
+def test_registry_type():
+
+    registry = MetricRegistry()
+    registry.counter("a")
+    try:
+        registry.gauge("a")
+    except InvalidConfig:
+        assert True
+    else:
+        assert False
+
+
+def test_snapshot_event_items():
+
+    registry = MetricRegistry()
+    registry.gauge("a").set(1)
+    registry.gauge("b").set(2)
+    snapshot = registry.collect()
+
+    bulk = snapshotEvent(snapshot)
+    events = list(extractBulkItems(bulk))
+    assert [e.get() for e in events] == snapshot
+    assert len(set(e.get("uuid") for e in events)) == 2
+    events[0].set(3, "data.value")
+    assert snapshot[0]["value"] == 1
+
+
+def test_snapshot_event():
+
+    registry = MetricRegistry()
+    registry.register("b", lambda: dict(("metric_%s" % (i), i) for i in range(150)))
+
+    unpack = Unpack(ActorConfig('unpack', 200, 1, {}, "", metrics=registry))
+    unpack.pool.queue.inbox.disableFallThrough()
+    unpack.pool.queue.outbox.disableFallThrough()
+    unpack.pool.queue.inbox.put(snapshotEvent(registry.collect()))
+    unpack.start()
+
+    names = [unpack.pool.queue.outbox.get().get("data.name") for _ in range(150)]
+    assert names[0] == "b.metric_0"
+    assert len([m for m in registry.collect() if m["name"].startswith("module.unpack.queue.")]) > 0
+    unpack.stop()
+
+
+def test_metric_server(tmpdir):
+
+    registry = MetricRegistry()
+    registry.gauge("a").set(1)
+    registry.collect()
+
+    path = str(tmpdir.join("metrics.socket"))
+    server = MetricServer(registry, path)
+    server.start()
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    client.sendall(b"GET /metrics HTTP/1.0\r\n\r\n")
+    response = b""
+    while True:
+        data = client.recv(4096)
+        if not data:
+            break
+        response += data
+    client.close()
+    server.stop()
+
+    assert json.loads(response.split(b"\r\n\r\n", 1)[1].decode())[0]["value"] == 1
+
+
+def test_actor_metrics():
+
+    unpack = Unpack(ActorConfig('unpack', 100, 1, {}, ""))
+    unpack.pool.queue._metrics.disableFallThrough()
+    unpack.start()
+
+    snapshot = unpack.pool.queue._metrics.get()
+    assert snapshot.isBulk()
+    assert "module.unpack.queue.inbox.size" in [m["data"]["name"] for m in snapshot.get("data")]
+    unpack.stop()
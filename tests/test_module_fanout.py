@@ -52,4 +52,7 @@ def test_module_fanout():
 
     assert one.get() == ["hello"]
     assert two.get() == ["hello"]
-    assert id(one.get()) != id(two.get())
+
+    one.merge(["world"])
+    assert one.get() == ["hello", "world"]
+    assert two.get() == ["hello"]
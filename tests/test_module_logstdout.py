@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_module_logstdout.py
+#
+#  Copyright 2017 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+
+from wishbone.module.logstdout import LogSTDOUT, compileFormat
+
+from wishbone.actor import ActorConfig
+from wishbone.event import Event
+from gevent import sleep
+
+
+class Writer(object):
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(data)
+
+
+def test_module_logstdout_format():
+
+    (template, fields) = compileFormat("{level}% {module}: {message}")
+    assert template % fields({"level": 7, "module": "a", "message": "b"}) == "7% a: b"
+
+
+def test_module_logstdout():
+
+    actor_config = ActorConfig('logstdout', 100, 1, {}, "")
+    logstdout = LogSTDOUT(actor_config, loglevel=6, colorize=False, format="{txt_level} {module}: {message}")
+    logstdout.pool.queue.inbox.disableFallThrough()
+    logstdout.start()
+    logstdout.f = Writer()
+
+    for level, txt_level in [(6, "informational"), (7, "debug"), (3, "error")]:
+        logstdout.pool.queue.inbox.put(Event({
+            "time": 0,
+            "identification": "wishbone",
+            "event_id": None,
+            "level": level,
+            "txt_level": txt_level,
+            "pid": 1,
+            "module": "test",
+            "message": "hello"
+        }))
+    sleep(1)
+    assert "".join(logstdout.f.writes) == "informational test: hello\nerror test: hello\n"
+    logstdout.stop()
+
+
+def test_module_logstdout_batch():
+
+    actor_config = ActorConfig('logstdout', 100, 1, {}, "")
+    logstdout = LogSTDOUT(actor_config, colorize=False, format="{message}", batch_size=2)
+    logstdout.pool.queue.inbox.disableFallThrough()
+    events = [Event({"time": 0, "level": 6, "message": str(i)}) for i in range(3)]
+    logstdout.pool.queue.inbox.putMany(events)
+    logstdout.start()
+    logstdout.f = Writer()
+
+    sleep(1)
+    assert logstdout.f.writes == ["0\n1\n", "2\n"]
+    logstdout.stop()
@@ -202,3 +202,42 @@ def test_module_queueselect_novalidqueue():
     assert getter(queueselect.pool.queue.nomatch).get() == {"one": 1, "two": 2}
 
     queueselect.stop()
+
+
+def test_module_queueselect_rules():
+
+    actor_config = ActorConfig('queueselect', 100, 1, {}, "", disable_exception_handling=True)
+
+    rules = [
+        {
+            "name": "rule_1",
+            "match": {"data.env": "production", "data.level": {"gte": 3}},
+            "queue": "queue_1"
+        },
+        {
+            "name": "rule_2",
+            "match": {"data.env": {"in": ["production", "staging"]}, "data.host": {"regex": "^web"}},
+            "queue": "queue_2"
+        }
+    ]
+
+    queueselect = QueueSelect(actor_config, rules=rules)
+    queueselect.pool.queue.inbox.disableFallThrough()
+    queueselect.pool.queue.nomatch.disableFallThrough()
+
+    queueselect.pool.createQueue("queue_1")
+    queueselect.pool.queue.queue_1.disableFallThrough()
+
+    queueselect.pool.createQueue("queue_2")
+    queueselect.pool.queue.queue_2.disableFallThrough()
+
+    queueselect.start()
+
+    queueselect.pool.queue.inbox.put(Event({"env": "production", "level": 5, "host": "web01"}))
+    assert getter(queueselect.pool.queue.queue_1).get() == {"env": "production", "level": 5, "host": "web01"}
+    assert getter(queueselect.pool.queue.queue_2).get() == {"env": "production", "level": 5, "host": "web01"}
+
+    queueselect.pool.queue.inbox.put(Event({"env": "staging", "level": 5, "host": "db01"}))
+    assert getter(queueselect.pool.queue.nomatch).get() == {"env": "staging", "level": 5, "host": "db01"}
+
+    queueselect.stop()
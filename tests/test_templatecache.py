@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_templatecache.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from wishbone.templatecache import TemplateCache, TEMPLATE_CACHE, compileString
+from wishbone.event import Event
+from wishbone.actor import ActorConfig, createTemplateEnvironment
+from wishbone.module.generator import Generator
+from jinja2 import Environment
+
+
+def test_templatecache_hit():
+
+    cache = TemplateCache()
+    env = Environment()
+    assert cache.get(env, "{{one}}") is cache.get(env, "{{one}}")
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_templatecache_environment():
+
+    cache = TemplateCache()
+    assert cache.get(Environment(), "{{one}}") is not cache.get(Environment(), "{{one}}")
+
+
+def test_templatecache_evict():
+
+    cache = TemplateCache(size=2)
+    env = Environment()
+    one = cache.get(env, "{{one}}")
+    cache.get(env, "{{two}}")
+    cache.get(env, "{{one}}")
+    cache.get(env, "{{three}}")
+    assert cache.get(env, "{{one}}") is one
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_templatecache_event_render():
+
+    e = Event({"one": 1})
+    before = TEMPLATE_CACHE.stats()["hits"]
+    e.render("{{data.one}} cached")
+    assert e.render("{{data.one}} cached") == "1 cached"
+    assert TEMPLATE_CACHE.stats()["hits"] == before + 1
+
+
+def test_templatecache_bytecode(tmpdir):
+
+    env = createTemplateEnvironment(bytecode_cache_dir=str(tmpdir))
+    assert compileString(env, "{{one}}").render(one=1) == "1"
+    assert len(tmpdir.listdir()) == 1
+
+    env = createTemplateEnvironment(bytecode_cache_dir=str(tmpdir))
+    assert compileString(env, "{{one}}").render(one=1) == "1"
+    assert len(tmpdir.listdir()) == 1
+
+
+def test_templatecache_shared_environment():
+
+    env = createTemplateEnvironment()
+    one = Generator(ActorConfig("one", template_environment=env), payload="{{data}} x")
+    two = Generator(ActorConfig("two", template_environment=env), payload="{{data}} x")
+    assert one.env_template is two.env_template
+    assert one.kwargs_template["payload"] is two.kwargs_template["payload"]
@@ -24,6 +24,9 @@
 
 from wishbone.queue import QueuePool
 from wishbone.queue import Queue
+from wishbone.error import QueueEmpty, QueueFull, InvalidConfig, InvalidData
+from wishbone.event import Event
+from gevent import spawn_later, sleep
 
 
 def test_listQueues():
@@ -38,6 +41,17 @@ def test_createQueue():
     assert (q.queue.test)
 
 
+def test_createQueue_size():
+    q = QueuePool(1, sizes={"inbox": 10, "_logs": 5})
+    q.createQueue("inbox")
+    q.createQueue("outbox")
+    q.createQueue("other", size=20)
+    assert q.queue.inbox.max_size == 10
+    assert q.queue.outbox.max_size == 1
+    assert q.queue.other.max_size == 20
+    assert q.queue._logs.max_size == 5
+
+
 def test_hasQueue():
     q = QueuePool(1)
     q.createQueue("test")
@@ -48,3 +62,338 @@ def test_getQueue():
     q = QueuePool(1)
     q.createQueue("test")
     assert isinstance(q.getQueue("test"), Queue)
+
+
+def test_putMany_getMany():
+    q = Queue(10)
+    q.disableFallThrough()
+    q.putMany([1, 2, 3])
+    assert q.getMany(2) == [1, 2]
+    assert q.getMany(10) == [3]
+    assert q.stats()["in_total"] == 3
+    assert q.stats()["out_total"] == 3
+
+
+def test_getMany_timeout():
+    q = Queue(10)
+    try:
+        q.getMany(10, timeout=0.01)
+    except QueueEmpty:
+        assert True
+    else:
+        assert False
+
+
+def test_putMany_fallthrough():
+    q = Queue(10)
+    q.putMany([1, 2, 3])
+    assert q.stats()["dropped_total"] == 3
+
+
+def test_put_timeout():
+    q = Queue(1)
+    q.disableFallThrough()
+    q.put(1)
+    try:
+        q.put(2, timeout=0.1)
+    except QueueFull:
+        assert q.stats()["backpressure_time"] >= 0.1
+    else:
+        assert False
+
+
+def test_put_wakeup():
+    q = Queue(1)
+    q.disableFallThrough()
+    q.put(1)
+    spawn_later(0.05, q.get)
+    q.put(2, timeout=1)
+    assert q.get() == 2
+    assert q.stats()["backpressure_time"] < 0.5
+
+
+def test_overflow_drop_newest():
+    q = Queue(2, overflow="drop-newest")
+    q.disableFallThrough()
+    q.putMany([1, 2, 3])
+    assert q.getMany(10) == [1, 2]
+    assert q.stats()["dropped_newest_total"] == 1
+    assert q.stats()["dropped_total"] == 1
+
+
+def test_overflow_drop_oldest():
+    q = Queue(2)
+    q.setOverflow("drop-oldest")
+    q.disableFallThrough()
+    q.putMany([1, 2, 3])
+    assert q.getMany(10) == [2, 3]
+    assert q.stats()["dropped_oldest_total"] == 1
+
+
+def test_overflow_sample():
+    q = Queue(10, overflow="sample", sample_rate=0)
+    q.disableFallThrough()
+    q.putMany(list(range(20)))
+    assert q.size() == 5
+    assert q.stats()["dropped_sampled_total"] == 15
+
+
+def test_overflow_invalid():
+    try:
+        Queue(10, overflow="unknown")
+    except InvalidConfig:
+        assert True
+    else:
+        assert False
+
+
+def test_spill(tmpdir):
+
+    q = Queue(2)
+    q.disableFallThrough()
+    q.enableSpill(str(tmpdir.join("spill")), segment_size=256)
+    for i in range(20):
+        q.put(Event(i))
+    assert q.size() == 20
+    assert q.stats()["spilled_total"] == 18
+    assert [q.get().get() for _ in range(20)] == list(range(20))
+    assert q.stats()["unspilled_total"] == 18
+    assert q.stats()["spill_disk_bytes"] == 0
+    assert tmpdir.join("spill").listdir() == []
+
+
+def test_spill_max_disk(tmpdir):
+
+    q = Queue(1)
+    q.disableFallThrough()
+    q.enableSpill(str(tmpdir.join("spill")), segment_size=256, max_disk=256)
+    try:
+        for _ in range(100):
+            q.put(Event("x" * 50), timeout=0.1)
+    except QueueFull:
+        assert q.stats()["spill_disk_bytes"] == 256
+    else:
+        assert False
+
+
+def test_spill_invalid(tmpdir):
+
+    q = Queue(1)
+    q.disableFallThrough()
+    q.enableSpill(str(tmpdir.join("spill")))
+    q.put(Event(1))
+    e = Event({"error": ("one", 1)})
+    q.put(e)
+    try:
+        q.put(Event({"set": set([1])}))
+    except InvalidData:
+        assert True
+    else:
+        assert False
+    q.put(Event(3))
+    assert q.stats()["dropped_invalid_total"] == 1
+    assert [q.get().get() for _ in range(3)] == [1, {"error": ["one", 1]}, 3]
+
+
+def test_durable_replay(tmpdir):
+
+    path = str(tmpdir.join("queue.wal"))
+    q = Queue(10)
+    q.disableFallThrough()
+    q.enableDurability(path, commit_size=2)
+    for i in range(5):
+        q.put(Event(i))
+    q.ack(q.get())
+    q.get()
+    assert q.stats()["wal_pending"] == 4
+    assert q.stats()["wal_commits_total"] == 2
+
+    q = Queue(2)
+    q.disableFallThrough()
+    q.enableDurability(path)
+    assert q.size() == 4
+    assert q.stats()["wal_replayed_total"] == 4
+    assert [q.get().get() for _ in range(4)] == [1, 2, 3, 4]
+
+
+def test_durable_spill_ack(tmpdir):
+
+    q = Queue(1)
+    q.disableFallThrough()
+    q.enableSpill(str(tmpdir.join("spill")))
+    q.enableDurability(str(tmpdir.join("queue.wal")))
+    for i in range(5):
+        q.put(Event(i))
+    try:
+        q.put(Event(set([1])))
+    except InvalidData:
+        assert True
+    else:
+        assert False
+    assert q.size() == 5
+    assert q.stats()["wal_pending"] == 5
+    for i in range(5):
+        e = q.get()
+        assert e.get() == i
+        q.ack(e)
+    assert q.stats()["wal_pending"] == 0
+
+
+def test_durable_drop_oldest(tmpdir):
+
+    q = Queue(1, overflow="drop-oldest")
+    q.disableFallThrough()
+    q.enableDurability(str(tmpdir.join("queue.wal")))
+    q.put(Event(1))
+    q.put(Event(2))
+    assert q.stats()["wal_pending"] == 1
+
+
+def test_max_bytes():
+
+    event = Event("x" * 1000)
+    q = Queue(100, max_bytes=event.getSize() * 2)
+    q.disableFallThrough()
+    q.put(Event("x" * 1000))
+    q.put(Event("x" * 1000))
+    assert q.stats()["bytes"] == event.getSize() * 2
+    try:
+        q.put(Event("x" * 1000), timeout=0.1)
+    except QueueFull:
+        assert True
+    else:
+        assert False
+    q.get()
+    assert q.stats()["bytes"] == event.getSize()
+
+
+def test_pool_max_bytes():
+
+    event = Event("x" * 1000)
+    pool = QueuePool(100, max_bytes=event.getSize() * 2)
+    pool.createQueue("one")
+    pool.createQueue("two")
+    pool.queue.one.disableFallThrough()
+    pool.queue.two.disableFallThrough()
+    pool.queue.one.put(Event("x" * 1000))
+    pool.queue.two.put(Event("x" * 1000))
+    try:
+        pool.queue.one.put(Event("x" * 1000), timeout=0.1)
+    except QueueFull:
+        assert True
+    else:
+        assert False
+    pool.queue.two.get()
+    pool.queue.one.put(Event("x" * 1000), timeout=0.1)
+    assert pool.budget.bytes == event.getSize() * 2
+
+
+def test_pool_max_bytes_drop_oldest():
+
+    event = Event("x" * 1000)
+    pool = QueuePool(100, max_bytes=event.getSize())
+    pool.createQueue("one")
+    pool.createQueue("two")
+    pool.queue.one.disableFallThrough()
+    pool.queue.two.setOverflow("drop-oldest")
+    pool.queue.two.disableFallThrough()
+    pool.queue.one.put(Event("x" * 1000))
+    pool.queue.two.put(Event("x" * 1000))
+    assert pool.queue.two.size() == 0
+    assert pool.queue.two.stats()["dropped_oldest_total"] == 1
+
+
+def test_lanes():
+
+    q = Queue(100)
+    q.disableFallThrough()
+    q.put(Event("data"))
+    q.setLanes(2, starvation_limit=2)
+    for _ in range(3):
+        e = Event("control")
+        e.set(5, "priority")
+        q.put(e)
+    q.put(Event("data"))
+    assert [q.get().get() for _ in range(5)] == ["control", "control", "data", "control", "data"]
+
+
+def test_lanes_max_bytes():
+
+    small = Event("x")
+    small.set(1, "priority")
+    large = Event("x" * 10000)
+    q = Queue(100, max_bytes=small.getSize() + large.getSize(), lanes=2)
+    q.disableFallThrough()
+    q.put(large)
+    q.put(small)
+    assert q.stats()["bytes"] == small.getSize() + large.getSize()
+    assert q.get() is small
+    assert q.stats()["bytes"] == large.getSize()
+    assert q.get() is large
+    assert q.stats()["bytes"] == 0
+
+
+def test_lanes_drop_oldest():
+
+    q = Queue(2, lanes=2, overflow="drop-oldest", max_bytes=10 ** 6)
+    q.disableFallThrough()
+    q.put(Event("d1"))
+    control = Event("control")
+    control.set(1, "priority")
+    q.put(control)
+    q.put(Event("d2"))
+    assert [q.get().get() for _ in range(2)] == ["control", "d2"]
+    assert q.stats()["bytes"] == 0
+    assert q.stats()["dropped_oldest_total"] == 1
+
+
+def test_lanes_full(tmpdir):
+
+    q = Queue(2, lanes=2)
+    q.disableFallThrough()
+    q.put(Event(1))
+    q.put(Event(2))
+    try:
+        q.put(Event(3), timeout=0.1)
+    except QueueFull:
+        assert True
+    else:
+        assert False
+    try:
+        q.enableSpill(str(tmpdir.join("spill")))
+    except InvalidConfig:
+        assert True
+    else:
+        assert False
+
+
+def test_latency_tracking():
+
+    q = Queue(100)
+    q.disableFallThrough()
+    q.enableLatencyTracking(0.5)
+    for i in range(10):
+        q.put(Event(i))
+    sleep(0.05)
+    for i in range(10):
+        q.get()
+    stats = q.stats()
+    assert stats["latency_count"] == 5
+    assert stats["latency_p50"] >= 0.05
+    assert stats["latency_max"] >= stats["latency_p99"] >= stats["latency_p50"]
+    assert q.stats()["latency_count"] == 0
+
+
+def test_latency_tracking_spill(tmpdir):
+
+    q = Queue(2)
+    q.disableFallThrough()
+    q.enableSpill(str(tmpdir.join("spill")))
+    q.enableLatencyTracking(1)
+    for i in range(10):
+        q.put(Event(i))
+    for i in range(10):
+        e = q.get()
+        assert not e.tracking
+    assert q.stats()["latency_count"] == 10
+
@@ -25,21 +25,27 @@
 from gevent.monkey import patch_all; patch_all()
 from wishbone.queue import QueuePool
 from wishbone.logging import Logging
+from wishbone.metrics import MetricRegistry, snapshotEvent
 from wishbone.event import Event as Wishbone_Event
-from wishbone.error import ModuleInitFailure, InvalidModule, TTLExpired
+from wishbone.event import compileKey, compileFieldTemplate, compileTemplate, unwrapReadOnly, TEMPLATE_TYPES
+from wishbone.templatecache import TEMPLATE_CACHE
+from wishbone.error import ModuleInitFailure, InvalidModule, TTLExpired, InvalidData
 from wishbone.actorconfig import ActorConfig
+from wishbone.moduletype import ModuleType
 from wishbone.function.template import TemplateFunction
 from wishbone.function.module import ModuleFunction
 
 from collections import namedtuple
-from gevent import spawn, kill
-from gevent import sleep, socket
+from gevent import spawn, kill, getcurrent
+from gevent import sleep
 from gevent.event import Event
 from wishbone.error import QueueFull
-from time import time
+from time import time, monotonic
+from functools import wraps
 from sys import exc_info
 import traceback
 import inspect
+import os
 import jinja2
 from copy import deepcopy
 
@@ -49,6 +55,89 @@ from pkg_resources import get_distribution
 
 Greenlets = namedtuple('Greenlets', "consumer generic log metric")
 
+SUBMIT_TIMEOUT = 1
+QUEUE_FULL_WARNING_INTERVAL = 10
+
+
+class OrderedCompletion(object):
+
+    '''
+    Hands out consecutive tickets to the events consumed from a queue and
+    lets the holder of a ticket wait until all lower tickets are completed.
+    '''
+
+    def __init__(self):
+
+        self.next = 0
+        self.completed = 0
+        self.turns = {}
+
+    def complete(self):
+        '''
+        Completes the current ticket and wakes up the holder of the next one.
+        '''
+
+        self.completed += 1
+        turn = self.turns.pop(self.completed, None)
+        if turn is not None:
+            turn.set()
+
+    def reserve(self, amount=1):
+        '''
+        Returns the first of ``amount`` consecutive tickets.
+        '''
+
+        ticket = self.next
+        self.next += amount
+        return ticket
+
+    def wait(self, ticket):
+        '''
+        Blocks until all tickets lower than ``ticket`` are completed.
+        '''
+
+        if ticket != self.completed:
+            turn = self.turns[ticket] = Event()
+            turn.wait()
+
+
+def createTemplateEnvironment(template_functions={}, bytecode_cache_dir=None):
+    '''
+    Creates the Jinja2 environment used to render kwargs templates.
+
+    A router creates one environment shared by all its actors so templates
+    are only compiled once.
+
+    Args:
+        template_functions (dict): A dictionary of template functions.
+        bytecode_cache_dir (str): When set, the directory in which compiled
+            templates are persisted between restarts.
+
+    Returns:
+        jinja2.Environment: The template environment.
+    '''
+
+    if bytecode_cache_dir is None:
+        bytecode_cache = None
+    else:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_cache_dir)
+
+    environment = jinja2.Environment(
+        undefined=jinja2.StrictUndefined,
+        trim_blocks=True,
+        loader=jinja2.FileSystemLoader('/'),
+        bytecode_cache=bytecode_cache
+    )
+    environment.policies["json.dumps_kwargs"] = {"sort_keys": True, "default": unwrapReadOnly}
+
+    # Add the template functions to the template globals
+    ####################################################
+    for key, value in template_functions.items():
+        environment.globals.update({key: value.get})
+
+    return environment
+
 
 class Actor(object):
     """A base class providing core Actor functionality.
@@ -76,35 +165,53 @@ class Actor(object):
         self.name = config.name
         self.description = self.__getDescription(config)
 
-        self.pool = QueuePool(config.size)
+        self.pool = QueuePool(config.size, config.queue_max_bytes, config.pool_max_bytes, config.queue_sizes)
 
         self.logging = Logging(
             name=config.name,
             q=self.pool.queue._logs,
-            identification=self.config.identification
+            identification=self.config.identification,
+            level=self.config.loglevel,
+            per_greenlet=self.config.concurrency > 1
         )
 
         self.__loop = True
         self.greenlets = Greenlets([], [], [], [])
-        self.greenlets.metric.append(spawn(self.__metricProducer))
+
+        if self.config.metrics is None:
+            self.metrics = MetricRegistry()
+            self.greenlets.metric.append(spawn(self.__metricProducer))
+        else:
+            self.metrics = self.config.metrics
+        self.metrics.register("module.%s.queue" % (self.name), self.__queueStats)
 
         self._run = Event()
         self._run.clear()
 
         self.stopped = True
 
+        self.__queue_full = {}
+        self.__queue_full_logged = 0
+
+        self.__consume_hooks = []
+        self.__instrumented = False
+        self.__ordered_buffers = None
+        # The time spent in submit() by each greenlet running an
+        # instrumented consumer function.
+        self.__submit_times = {}
+
+        # Precompile the event keys used when consuming events
+        ######################################################
+        self._uuid_key = compileKey("uuid")
+        self._tmp_key = compileKey("tmp.%s" % (self.name))
+        self._errors_key = compileKey("errors.%s" % (self.name))
+
         # Setup the Jinja2 environment to render kwargs templates.
         ##########################################################
-        self.env_template = jinja2.Environment(
-            undefined=jinja2.StrictUndefined,
-            trim_blocks=True,
-            loader=jinja2.FileSystemLoader('/')
-        )
-
-        # Add the template functions to the template globals
-        ####################################################
-        for key, value in self.config.template_functions.items():
-            self.env_template.globals.update({key: value.get})
+        if self.config.template_environment is None:
+            self.env_template = createTemplateEnvironment(self.config.template_functions)
+        else:
+            self.env_template = self.config.template_environment
 
         # Store a copy of the raw/unmodified kwargs
         ##########################################
@@ -118,6 +225,10 @@ class Actor(object):
         #############################################################
         self.kwargs = self.__renderTemplateKwargs(self.kwargs_template)
 
+        # Store the subset of kwargs which have to be rendered for each event
+        #####################################################################
+        self.kwargs_dynamic = self.__getDynamicKwargs(self.kwargs_template)
+
         # Do some sanity checks
         #######################
         self.__sanityChecks()
@@ -180,6 +291,20 @@ class Actor(object):
 
         self.logging.debug("Module has no preHook() method set.")
 
+    def registerConsumeHook(self, hook):
+        '''
+        Registers <hook> to be called around each execution of the consumer
+        functions.  Hooks have to be registered before the module starts.
+
+        Args:
+            hook (wishbone.hook.ConsumeHook): The hook to register.
+
+        Returns:
+            None
+        '''
+
+        self.__consume_hooks.append(hook)
+
     def registerConsumer(self, function, queue):
         '''
         Registers <function> to process all events in <queue>
@@ -191,6 +316,9 @@ class Actor(object):
         Registering ``function`` to consume ``queue`` will also apply all the
         registered module functions against the events consumed from it.
 
+        Except for output modules, ``ActorConfig.concurrency`` greenlets
+        consume ``queue``.
+
         Args:
             function (``function``): The function which processes events
             queue (str): The name of the queue from which ``function`` will
@@ -200,7 +328,12 @@ class Actor(object):
             None
         '''
 
-        self.greenlets.consumer.append(spawn(self._consumer, function, queue))
+        if self.MODULE_TYPE == ModuleType.OUTPUT:
+            concurrency = 1
+        else:
+            concurrency = self.config.concurrency
+        for _ in range(concurrency):
+            self.greenlets.consumer.append(spawn(self._consumer, function, queue))
 
     def renderEventKwargs(self, event, queue=None):
         '''
@@ -247,6 +380,10 @@ class Actor(object):
             self.logging.debug("preHook() found, executing")
             self.preHook()
         self.__validateAppliedFunctions()
+        if self.config.instrument and not self.__instrumented:
+            self.__instrument()
+        if self.config.ordered and self.config.concurrency > 1 and self.__ordered_buffers is None:
+            self.__orderSubmit()
         self._run.set()
         self.logging.debug(
             "Started with max queue size of %s events and metrics interval of %s seconds." % (
@@ -336,16 +473,21 @@ class Actor(object):
             None
         '''
 
+        try:
+            q = getattr(self.pool.queue, queue)
+        except AttributeError:
+            self.logging.error("No such queue %s. Event with uuid %s dropped." % (queue, event.get('uuid')))
+            return
+
         while self.loop():
             try:
-                getattr(self.pool.queue, queue).put(event)
-                break
-            except AttributeError:
-                self.logging.error("No such queue %s. Event with uuid %s dropped." % (queue, event.get('uuid')))
+                q.put(event, timeout=SUBMIT_TIMEOUT)
                 break
             except QueueFull:
-                self.logging.warning("Queue '%s' is full and stalls the event pipeline. You should probably look into this." % (queue))
-                sleep(0.1)
+                self.__warnQueueFull(queue)
+            except InvalidData as err:
+                self.logging.warning("Event with UUID %s dropped by queue %s. Reason: %s", event.get(self._uuid_key), queue, err)
+                break
 
     def _applyFunctions(self, queue, event):
         '''
@@ -372,6 +514,7 @@ class Actor(object):
     def _consumer(self, function, queue):
         '''
         Greenthread which applies <function> to each element from <queue>
+        and acknowledges each element to <queue> once processed.
 
         Args:
             function (``function``): The function which has been registered to consume ``queue``.
@@ -385,47 +528,223 @@ class Actor(object):
 
         self._run.wait()
         self.logging.debug("Function '%s' has been registered to consume queue '%s'" % (function.__name__, queue))
+        function = self._wrapConsumer(function, queue)
 
-        while self.loop():
-
-            event = self.pool.getQueue(queue).get()
-            if not event.has("tmp.%s" % (self.name)):
-                event.set({}, "tmp.%s" % (self.name))
+        if self.__ordered_buffers is not None:
+            order = self.__ordered_completions.setdefault(queue, OrderedCompletion())
+            while self.loop():
+                q = self.pool.getQueue(queue)
+                events = q.getMany(self.config.batch_size)
+                ticket = order.reserve(len(events))
+                for offset, event in enumerate(events):
+                    self.__consumeEventOrdered(function, queue, event, order, ticket + offset)
+                    q.ack(event)
+        elif self.config.batch_size > 1:
+            while self.loop():
+                q = self.pool.getQueue(queue)
+                for event in q.getMany(self.config.batch_size):
+                    self.__consumeEvent(function, queue, event)
+                    q.ack(event)
+        else:
+            while self.loop():
+                q = self.pool.getQueue(queue)
+                event = q.get()
+                self.__consumeEvent(function, queue, event)
+                q.ack(event)
 
-            # Render kwargs relative to the event's content and make these accessible under event.kwargs
-            event.renderKwargs(self.kwargs_template)
+    def _wrapConsumer(self, function, queue):
+        '''
+        Returns <function> wrapped to record its service time and to call
+        the registered consume hooks.  When the actor is not instrumented and
+        has no hooks <function> is returned as is.
 
-            # Validate TTL
-            try:
-                event.decrementTTL()
-            except TTLExpired as err:
-                self.logging.warning("Event with UUID %s dropped. Reason: %s" % (event.get("uuid"), err))
-                continue
+        The service time excludes the time <function> spends in ``submit()``
+        which is recorded as ``submit_time``.
 
-            # Set the current event uuid to the logger object
-            self.logging.setCurrentEventID(event.get("uuid"))
+        Args:
+            function (``function``): The function which has been registered to consume ``queue``.
+            queue (str): The name of the queue consumed by ``function``.
 
-            # Apply all the defined queue functions to the event
-            event = self._applyFunctions(queue, event)
+        Returns:
+            ``function``: The function to apply to each consumed event.
+        '''
 
-            # Apply consumer function
+        hooks = list(self.__consume_hooks)
+        if self.config.instrument:
+            histogram = self.metrics.histogram("module.%s.consume.%s.function_time" % (self.name, queue))
+        elif hooks:
+            histogram = None
+        else:
+            return function
+
+        submit_times = self.__submit_times
+
+        @wraps(function)
+        def consume(event):
+            for hook in hooks:
+                hook.preConsume(self, queue, event)
+            if histogram is not None:
+                current = getcurrent()
+                submit_times[current] = 0
+            start = monotonic()
             try:
                 function(event)
             except Exception as err:
-                if self.config.disable_exception_handling:
-                    raise
-                exc_type, exc_value, exc_traceback = exc_info()
-                info = (traceback.extract_tb(exc_traceback)[-1][1], str(exc_type), str(exc_value))
+                error = err
+                raise
+            else:
+                error = None
+            finally:
+                if histogram is not None:
+                    histogram.record(monotonic() - start - submit_times.pop(current))
+                for hook in hooks:
+                    hook.postConsume(self, queue, event, error)
 
-                event.set(info, "errors.%s" % (self.name))
+        return consume
 
-                self.logging.error("%s" % (err))
-                self.submit(event, "_failed")
+    def __consumeEventOrdered(self, function, queue, event, order, ticket):
+        '''
+        Applies <function> to <event> while buffering the events it submits
+        and releases them once all events with a lower ticket are done.
+
+        Args:
+            function (``function``): The function which has been registered to consume ``queue``.
+            queue (str): The name of the queue from which ``event`` has been consumed.
+            event (wishbone.event.Event): The event to process.
+            order (wishbone.actor.OrderedCompletion): The tickets of ``queue``.
+            ticket (int): The ticket of ``event``.
+
+        Returns:
+            None
+        '''
+
+        current = getcurrent()
+        buffer = self.__ordered_buffers[current] = []
+        try:
+            self.__consumeEvent(function, queue, event)
+        finally:
+            del(self.__ordered_buffers[current])
+            order.wait(ticket)
+            try:
+                for submitted, destination in buffer:
+                    self.__submit(submitted, destination)
+            finally:
+                order.complete()
+
+    def __orderSubmit(self):
+        '''
+        Replaces ``submit()`` with a version which buffers the events
+        submitted by the consumer greenlets until their turn.  Applied after
+        ``__instrument()`` so ``submit_time`` measures the actual submits.
+        '''
+
+        self.__submit = self.submit
+        self.__ordered_buffers = {}
+        self.__ordered_completions = {}
+
+        def orderedSubmit(event, queue):
+            buffer = self.__ordered_buffers.get(getcurrent())
+            if buffer is None:
+                self.__submit(event, queue)
             else:
-                self.submit(event, "_success")
+                buffer.append((event, queue))
+
+        self.submit = orderedSubmit
+
+    def __instrument(self):
+        '''
+        Replaces ``_applyFunctions()`` and ``submit()`` with versions
+        recording their service time in histograms of the metric registry.
+        The submit time is also added to the consumer function running in
+        the same greenlet, if any, so it can deduct it.
+        '''
+
+        apply_functions = self._applyFunctions
+        submit = self.submit
+        functions_histograms = {}
+        submit_histogram = self.metrics.histogram("module.%s.submit_time" % (self.name))
+        submit_times = self.__submit_times
+
+        def timedApplyFunctions(queue, event):
+            start = monotonic()
+            try:
+                return apply_functions(queue, event)
             finally:
-                # Unset the current event uuid to the logger object
-                self.logging.setCurrentEventID(None)
+                histogram = functions_histograms.get(queue)
+                if histogram is None:
+                    histogram = functions_histograms[queue] = self.metrics.histogram(
+                        "module.%s.consume.%s.functions_time" % (self.name, queue)
+                    )
+                histogram.record(monotonic() - start)
+
+        def timedSubmit(event, queue):
+            start = monotonic()
+            try:
+                submit(event, queue)
+            finally:
+                elapsed = monotonic() - start
+                submit_histogram.record(elapsed)
+                current = getcurrent()
+                if current in submit_times:
+                    submit_times[current] += elapsed
+
+        self._applyFunctions = timedApplyFunctions
+        self.submit = timedSubmit
+        self.__instrumented = True
+
+    def __consumeEvent(self, function, queue, event):
+        '''
+        Applies <function> to <event> consumed from <queue>.
+
+        Args:
+            function (``function``): The function which has been registered to consume ``queue``.
+            queue (str): The name of the queue from which ``event`` has been consumed.
+            event (wishbone.event.Event): The event to process.
+
+        Returns:
+            None
+        '''
+
+        if not event.has(self._tmp_key):
+            event.set({}, self._tmp_key)
+
+        # Render kwargs relative to the event's content and make these accessible under event.kwargs
+        if self.kwargs_dynamic:
+            event.renderKwargs(self.kwargs_dynamic, self.kwargs)
+        else:
+            event.kwargs = self.kwargs
+
+        # Validate TTL
+        try:
+            event.decrementTTL()
+        except TTLExpired as err:
+            self.logging.warning("Event with UUID %s dropped. Reason: %s", event.get(self._uuid_key), err)
+            return
+
+        # Set the current event uuid to the logger object
+        self.logging.setCurrentEventID(event.get(self._uuid_key))
+
+        # Apply all the defined queue functions to the event
+        event = self._applyFunctions(queue, event)
+
+        # Apply consumer function
+        try:
+            function(event)
+        except Exception as err:
+            if self.config.disable_exception_handling:
+                raise
+            exc_type, exc_value, exc_traceback = exc_info()
+            info = (traceback.extract_tb(exc_traceback)[-1][1], str(exc_type), str(exc_value))
+
+            event.set(info, self._errors_key)
+
+            self.logging.error("%s" % (err))
+            self.submit(event, "_failed")
+        else:
+            self.submit(event, "_success")
+        finally:
+            # Unset the current event uuid to the logger object
+            self.logging.setCurrentEventID(None)
 
     def __getDescription(self, config):
         '''
@@ -443,6 +762,32 @@ class Actor(object):
         else:
             return config.description
 
+    def __getDynamicKwargs(self, kwargs):
+        '''
+        Returns the kwargs which contain at least one template and therefor
+        need to be rendered for each event.  All the other kwargs are static
+        and only rendered once into ``self.kwargs``.
+
+        Args:
+            kwargs (dict): The kwargs containing template instances.
+
+        Returns:
+            dict: The kwargs to render per event.
+        '''
+
+        def hasTemplate(data):
+
+            if isinstance(data, TEMPLATE_TYPES):
+                return True
+            elif isinstance(data, dict):
+                return any(hasTemplate(value) for value in data.values())
+            elif isinstance(data, list):
+                return any(hasTemplate(value) for value in data)
+            else:
+                return False
+
+        return {key: value for key, value in kwargs.items() if hasTemplate(value)}
+
     def __getRawKwargs(self):
         '''
         Get the class paramaters of the class basing this class.
@@ -460,7 +805,9 @@ class Actor(object):
     def __getTemplateKwargs(self, template_env, kwargs):
         '''
         Recurses through ``kwargs`` and returns a version of it in which all
-        strings are replaced by jinja2 template instances.
+        strings are replaced by jinja2 template instances.  Templates which
+        only refer to a single field such as ``{{data.host}}`` are replaced by
+        a ``FieldTemplate`` instance which bypasses Jinja2.
 
         Args:
             template_env (Jinja2.Environment instance): The Jinja2 environment instance to
@@ -474,8 +821,7 @@ class Actor(object):
             if isinstance(data, str):
                 try:
                     if len(list(template_env.parse(data).find_all(jinja2.nodes.Name))) > 0:
-                        t = template_env.from_string(data)
-                        return t
+                        return compileFieldTemplate(template_env, data) or TEMPLATE_CACHE.get(template_env, data, compileTemplate)
                     else:
                         return data
                 except Exception as err:
@@ -503,26 +849,27 @@ class Actor(object):
 
     def __metricProducer(self):
         '''
-        A greenthread collecting the queue metrics at the defined interval.
+        A greenthread submitting a snapshot of the actor's own metric
+        registry as one bulk event at the defined interval.  Only runs when
+        the actor does not share the metric registry of a router.
         '''
 
         self._run.wait()
-        hostname = socket.gethostname()
         while self.loop():
-            for queue in self.pool.listQueues(names=True):
-                for metric, value in list(self.pool.getQueue(queue).stats().items()):
-                    event = Wishbone_Event({
-                        "time": time(),
-                        "type": "wishbone",
-                        "source": hostname,
-                        "name": "module.%s.queue.%s.%s" % (self.name, queue, metric),
-                        "value": value,
-                        "unit": "",
-                        "tags": ()
-                    })
-                    self.submit(event, "_metrics")
+            self.submit(snapshotEvent(self.metrics.collect()), "_metrics")
             sleep(self.config.frequency)
 
+    def __queueStats(self):
+        '''
+        Returns the stats of all queues keyed by ``<queue>.<metric>``.
+        '''
+
+        stats = {}
+        for queue in self.pool.listQueues(names=True):
+            for metric, value in self.pool.getQueue(queue).stats().items():
+                stats["%s.%s" % (queue, metric)] = value
+        return stats
+
     def __postHook(self):
         '''
         Is always executed when the module starts.
@@ -537,7 +884,7 @@ class Actor(object):
 
         def recurse(data):
 
-            if isinstance(data, jinja2.environment.Template):
+            if isinstance(data, TEMPLATE_TYPES):
                 try:
                     return data.render()
                 except Exception as err:
@@ -611,3 +958,22 @@ class Actor(object):
 
         if not hasattr(self, "MODULE_TYPE"):
             raise InvalidModule("Module instance '%s' seems to be of an incompatible old type." % (self.name))
+
+    def __warnQueueFull(self, queue):
+        '''
+        Aggregates the occurrences of full queues stalling the event pipeline
+        and logs them at most once every ``QUEUE_FULL_WARNING_INTERVAL``
+        seconds.
+
+        Args:
+            queue (str): The name of the full queue.
+        '''
+
+        self.__queue_full[queue] = self.__queue_full.get(queue, 0) + 1
+        now = time()
+        if now - self.__queue_full_logged >= QUEUE_FULL_WARNING_INTERVAL:
+            self.logging.warning("Full queues stall the event pipeline: %s. You should probably look into this." % (
+                ", ".join("'%s' %s times" % (name, count) for name, count in sorted(self.__queue_full.items()))
+            ))
+            self.__queue_full = {}
+            self.__queue_full_logged = now
@@ -43,12 +43,23 @@ class ActorConfig(object):
         io_event (bool): When ``True`` Input and Output modules know to expect or emit serialzed wishbone events.
         identification (str): A name assigned to the Wishbone instance, useful for the module to know such as logging.
         disable_exception_handling (bool): If True, exception handling is disabled. Usefull for testing
+        template_environment (``jinja2.Environment``): The template environment shared by all actors.
+        batch_size (int): The maximum number of events a consumer drains from its queue at once.
+        queue_max_bytes (int): The maximum estimated bytes of the events in each queue.
+        pool_max_bytes (int): The maximum estimated bytes of the events in all queues of the actor.
+        queue_sizes (dict): The size of individual queues overriding ``size``.
+        loglevel (int): The highest log priority the actor generates messages for.
+        metrics (wishbone.metrics.MetricRegistry): The metric registry shared by all actors.
+        instrument (bool): Records the service times of the actor in histograms.
+        concurrency (int): The number of greenlets consuming each queue.
+        ordered (bool): Releases the events submitted by concurrent consumers in consume order.
     '''
 
     def __init__(self, name, size=100, frequency=10, template_functions={}, description=None, module_functions={},
                  protocol=None, io_event=False,
                  identification="wishbone",
-                 disable_exception_handling=False):
+                 disable_exception_handling=False, template_environment=None, batch_size=1,
+                 queue_max_bytes=None, pool_max_bytes=None, queue_sizes={}, loglevel=7, metrics=None, instrument=False, concurrency=1, ordered=False):
         '''
         Args:
             name (str): The name identifying the actor instance.
@@ -62,6 +73,26 @@ class ActorConfig(object):
             io_event (bool): When ``True`` Input and Output modules know to expect or emit serialzed wishbone events.
             identification (str): A name assigned to the Wishbone instance, useful for the module to know such as logging.
             disable_exception_handling (bool): If True, exception handling is disabled. Usefull for testing
+            template_environment (``jinja2.Environment``): The template environment shared by all actors.
+                                                           When None, the actor creates its own.
+            batch_size (int): The maximum number of events a consumer drains from its queue at once.
+                              Values higher than 1 enable batch draining.
+            queue_max_bytes (int): The maximum estimated bytes of the events in each queue.
+                                   None is unlimited.
+            pool_max_bytes (int): The maximum estimated bytes of the events in all queues of the actor.
+                                  None is unlimited.
+            queue_sizes (dict): The size of individual queues overriding ``size``.
+            loglevel (int): The highest log priority the actor generates messages for.
+                            Messages with a higher priority are discarded at the source.
+            metrics (wishbone.metrics.MetricRegistry): The metric registry shared by all actors.
+                                                       When None, the actor creates its own and
+                                                       submits its snapshot to its ``_metrics`` queue.
+            instrument (bool): Records the time spent in module functions, consumer functions and
+                               ``submit()`` in histograms of ``metrics``.
+            concurrency (int): The number of greenlets consuming each queue of a process or flow module.
+                               Output modules use ``parallel_streams`` instead.
+            ordered (bool): When ``concurrency`` is higher than 1, the events submitted while consuming an
+                            event are only released once all events consumed before it are done.
         '''
         self.name = name
         self.size = size
@@ -73,3 +104,13 @@ class ActorConfig(object):
         self.io_event = io_event
         self.identification = identification
         self.disable_exception_handling = disable_exception_handling
+        self.template_environment = template_environment
+        self.batch_size = batch_size
+        self.queue_max_bytes = queue_max_bytes
+        self.pool_max_bytes = pool_max_bytes
+        self.queue_sizes = queue_sizes
+        self.loglevel = loglevel
+        self.metrics = metrics
+        self.instrument = instrument
+        self.concurrency = concurrency
+        self.ordered = ordered
@@ -58,12 +58,18 @@ class BootStrap():
         start.add_argument('--graph-include-sys', action="store_true", dest="graph_include_sys", help='When enabled includes logs and metrics related queues modules and queues to graph layout.')
         start.add_argument('--identification', type=str, dest='identification', default="wishbone", help='An identifier string for generated logs.')
         start.add_argument('--instances', type=int, dest='instances', default=1, help='The number of parallel Wishbone instances to bootstrap.')
+        start.add_argument('--instrument', action="store_true", dest='instrument', help='When enabled records the service times of module functions, consumer functions and submit of each module as metrics.')
+        start.add_argument('--metrics-address', type=str, dest='metrics_address', default=None, help='The <host>:<port> or unix socket path to serve the metrics on as JSON.')
         start.add_argument('--loglevel', type=int, dest='log_level', default=6, help='The maximum loglevel.')
         start.add_argument('--fork', action="store_true", default=False, help="When defined forks Wishbone to background and INFO logs are written to syslog/journald.")
         start.add_argument('--nocolor', action="store_true", help='When defined does not print colored output to stdout.')
         start.add_argument('--pid', type=str, dest='pid', default='%s/wishbone.pid' % (os.getcwd()), help='The pidfile to use.')
         start.add_argument('--profile', action="store_true", help='When enabled profiles the process and dumps a Chrome developer tools profile file in the current directory.')
         start.add_argument('--queue-size', type=int, dest='queue_size', default=100, help='The queue size to use.')
+        start.add_argument('--queue-max-bytes', type=int, dest='queue_max_bytes', default=None, help='The maximum estimated bytes of the events in each queue.')
+        start.add_argument('--latency-sample-rate', type=float, dest='latency_sample_rate', default=None, help='The fraction of events of which the time spent in each queue is recorded.')
+        start.add_argument('--pool-max-bytes', type=int, dest='pool_max_bytes', default=None, help='The maximum estimated bytes of the events in all queues of a module.')
+        start.add_argument('--template-cache-dir', type=str, dest='template_cache_dir', default=None, help='The directory to persist compiled templates in.')
 
         stop = subparsers.add_parser('stop', description="Tries to gracefully stop the Wishbone instance.")
         stop.add_argument('--pid', type=str, dest='pid', default='wishbone.pid', help='The pidfile to use.')
@@ -93,6 +99,11 @@ class Dispatch():
         self.instances = kwargs.get("instances", None)
         self.pid = kwargs.get("pid", None)
         self.queue_size = kwargs.get("queue_size", None)
+        self.queue_max_bytes = kwargs.get("queue_max_bytes", None)
+        self.pool_max_bytes = kwargs.get("pool_max_bytes", None)
+        self.latency_sample_rate = kwargs.get("latency_sample_rate", None)
+        self.metrics_address = kwargs.get("metrics_address", None)
+        self.instrument = kwargs.get("instrument", False)
         self.frequency = kwargs.get("frequency", None)
         self.identification = kwargs.get("identification", None)
         self.graph = kwargs.get("graph", None)
@@ -104,6 +115,7 @@ class Dispatch():
         self.fork = kwargs.get("fork", None)
         self.log_level = kwargs.get("log_level", None)
         self.namespace = kwargs.get("namespace", None)
+        self.template_cache_dir = kwargs.get("template_cache_dir", None)
         self.routers = []
 
     def bootstrapBlock(self):
@@ -146,7 +158,14 @@ class Dispatch():
                 frequency=self.frequency,
                 identification=self.identification,
                 graph=self.graph,
-                graph_include_sys=self.graph_include_sys
+                graph_include_sys=self.graph_include_sys,
+                template_cache_dir=self.template_cache_dir,
+                queue_max_bytes=self.queue_max_bytes,
+                pool_max_bytes=self.pool_max_bytes,
+                latency_sample_rate=self.latency_sample_rate,
+                loglevel=self.log_level,
+                metrics_address=self.metrics_address,
+                instrument=self.instrument
             )
 
             router.start()
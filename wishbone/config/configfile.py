@@ -34,26 +34,6 @@ LOG_FILTER_TEMPLATE = '''
         nomatch
     {{%- endif -%}}'''
 
-LOG_COLOR_TEMPLATE = '''
-    {%- if data.level == 0 -%}
-        \x1B[0;35m
-    {%- elif data.level == 1 -%}
-        \x1B[1;35m
-    {%- elif data.level == 2 -%}
-        \x1B[0;31m
-    {%- elif data.level == 3 -%}
-        \x1B[1;31m
-    {%- elif data.level == 4 -%}
-        \x1B[1;33m
-    {%- elif data.level == 5 -%}
-        \x1B[1;30m
-    {%- elif data.level == 6 -%}
-        \x1B[1;37m
-    {%- else -%}
-        \x1B[1;37m
-    {%- endif -%}
-    {{strftime(epoch(), "YYYY-MM-DDTHH:mm:ss.SSSSZZ")}} {{data.identification}}[{{data.pid}}] {{data.txt_level}} {{data.module}}: {{data.message}}\x1B[0m'''
-
 
 class ConfigFile(object):
     '''
@@ -76,14 +56,13 @@ class ConfigFile(object):
       modules.  The effect of this is that all metrics are dropped unless
       the user connects a module for furhter processing the metrics.
 
-    - Adds a ``wishbone.module.flow.queueselect`` module called
-      ``_logs_filter`` responsible for dropping logs which log level do
-      not correspond to the define ``--log-level``
-
-    - Adds either a ``wishbone.module.output.stdout`` called
-      ``_logs_stdout`` module or ``wishbone.module.output.syslog`` module
-      called ``_logs_syslog`` and connects this instance to
-      ``_logs.outbox``.
+    - Adds either a ``wishbone.module.output.logstdout`` called
+      ``_logs_stdout`` module which filters and formats the logs itself
+      or a ``wishbone.module.output.syslog`` module called
+      ``_logs_syslog`` behind a ``wishbone.module.flow.queueselect``
+      module called ``_logs_filter`` responsible for dropping logs which
+      log level do not correspond to the define ``--log-level`` and
+      connects this instance to ``_logs.outbox``.
 
     - Initializes the following template functions and makes them
       available to each initialized module::
@@ -114,11 +93,10 @@ class ConfigFile(object):
             "routingtable": []
         })
         self.__addLogFunnel()
-        self.__addLogFilter()
         self.__addMetricFunnel()
         self.load(filename)
 
-    def addModule(self, name, module, arguments={}, description="", functions={}, protocol=None, event=False):
+    def addModule(self, name, module, arguments={}, description="", functions={}, protocol=None, event=False, queue_size=None, queues={}, concurrency=1, ordered=False, batch_size=1):
         '''
         Adds a module to the configuration.
 
@@ -130,12 +108,17 @@ class ConfigFile(object):
             functions (dict): The module functions
             protocol (str): The protocol to apply to the module
             event (bool): Whether incoming or outgoing events need to be treated as full events.
+            queue_size (int): The size of the module queues.  None uses the router default.
+            queues (dict): The size of individual module queues.
+            concurrency (int): The number of greenlets consuming each queue.
+            ordered (bool): Releases the events submitted by concurrent consumers in the order they were consumed.
+            batch_size (int): The max number of events each consumer drains from a queue at once.
         '''
 
         if name.startswith('_'):
             raise Exception("Module instance names cannot start with _.")
 
-        self.__addModule(name, module, arguments, description, functions, protocol, event)
+        self.__addModule(name, module, arguments, description, functions, protocol, event, queue_size, queues, concurrency, ordered, batch_size)
 
     def addTemplateFunction(self, name, function, arguments={}):
         '''Adds a template funtion to the configuration.
@@ -178,7 +161,7 @@ class ConfigFile(object):
 
         self.config["protocols"][name] = EasyDict({"protocol": protocol, "arguments": arguments})
 
-    def addConnection(self, source_module, source_queue, destination_module, destination_queue):
+    def addConnection(self, source_module, source_queue, destination_module, destination_queue, overflow="block", sample_rate=0.1, spill=None, durable=None, size=None, lanes=1, starvation_limit=100, latency_sample_rate=None):
         '''
         Adds connections between module queues.
 
@@ -187,6 +170,14 @@ class ConfigFile(object):
             source_queue (str): The source module instance queue name
             destination_module (str): The destination instance name
             destination_queue (str): The destination instance queue name
+            overflow (str): The overflow policy of the queue
+            sample_rate (float): The fraction of events accepted by the sample overflow policy
+            spill (dict): The disk spill parameters of the queue
+            durable (dict): The write-ahead log parameters of the queue
+            size (int): The size of the queue.  None uses the module default.
+            lanes (int): The number of priority lanes of the queue
+            starvation_limit (int): The max number of consecutive events consumed from higher lanes
+            latency_sample_rate (float): The fraction of events of which the time spent in the queue is recorded
         '''
         connected = self.__queueConnected(source_module, source_queue)
 
@@ -196,7 +187,15 @@ class ConfigFile(object):
                     "source_module": source_module,
                     "source_queue": source_queue,
                     "destination_module": destination_module,
-                    "destination_queue": destination_queue
+                    "destination_queue": destination_queue,
+                    "overflow": overflow,
+                    "sample_rate": sample_rate,
+                    "spill": spill,
+                    "durable": durable,
+                    "size": size,
+                    "lanes": lanes,
+                    "starvation_limit": starvation_limit,
+                    "latency_sample_rate": latency_sample_rate
                 })
             )
         else:
@@ -243,8 +242,12 @@ class ConfigFile(object):
             self.addModule(name=module, **config["modules"][module])
 
         for route in config["routingtable"]:
-            sm, sq, dm, dq = self.__splitRoute(route)
-            self.addConnection(sm, sq, dm, dq)
+            if isinstance(route, dict):
+                sm, sq, dm, dq = self.__splitRoute(route["route"])
+                self.addConnection(sm, sq, dm, dq, route.get("overflow", "block"), route.get("sample_rate", 0.1), route.get("spill"), route.get("durable"), route.get("size"), route.get("lanes", 1), route.get("starvation_limit", 100), route.get("latency_sample_rate"))
+            else:
+                sm, sq, dm, dq = self.__splitRoute(route)
+                self.addConnection(sm, sq, dm, dq)
 
         getattr(self, "_setupLogging%s" % (self.logstyle.upper()))()
 
@@ -258,7 +261,7 @@ class ConfigFile(object):
         self.addTemplateFunction("env", "wishbone.function.template.environment")
         self.addTemplateFunction("version", "wishbone.function.template.version")
 
-    def __addModule(self, name, module, arguments={}, description="", functions={}, protocol=None, event=False):
+    def __addModule(self, name, module, arguments={}, description="", functions={}, protocol=None, event=False, queue_size=None, queues={}, concurrency=1, ordered=False, batch_size=1):
 
         if protocol is not None and protocol not in self.config.protocols:
             raise Exception("No protocol module defined with name '%s' for module instance '%s'" % (protocol, name))
@@ -275,7 +278,12 @@ class ConfigFile(object):
                 'arguments': arguments,
                 'functions': functions,
                 'protocol': protocol,
-                'event': event})
+                'event': event,
+                'queue_size': queue_size,
+                'queues': queues,
+                'concurrency': concurrency,
+                'ordered': ordered,
+                'batch_size': batch_size})
             self.addConnection(name, "_logs", "_logs", "_%s" % (name))
             self.addConnection(name, "_metrics", "_metrics", "_%s" % (name))
 
@@ -317,6 +325,8 @@ class ConfigFile(object):
     def __validateRoutingTable(self, config):
 
         for route in config["routingtable"]:
+            if isinstance(route, dict):
+                route = route["route"]
             (left, right) = route.split("->")
             assert "." in left.lstrip().rstrip(), "routingtable rule \"%s\" does not have the right format. Missing a dot." % (route)
             assert "." in right.lstrip().rstrip(), "routingtable rule \"%s\" does not have the right format. Missing a dot." % (route)
@@ -369,41 +379,25 @@ class ConfigFile(object):
 
         if not self.__queueConnected("_logs", "outbox"):
 
-            self.__addModule(
-                name="_logs_format",
-                module="wishbone.module.process.template",
-                arguments={
-                    "templates": {
-                        "human_log": LOG_COLOR_TEMPLATE
-                    }
-                },
-                description="Create a human readable log format.",
-                functions={
-                },
-                protocol=None
-            )
-
-            self.addConnection("_logs", "outbox", "_logs_filter", "inbox")
-            self.addConnection("_logs_filter", "pass", "_logs_format", "inbox")
-
             self.__addModule(
                 name="_logs_stdout",
-                module="wishbone.module.output.stdout",
+                module="wishbone.module.output.logstdout",
                 arguments={
                     "colorize": self.colorize_stdout,
-                    "selection": "human_log"
+                    "loglevel": self.loglevel
                 },
                 description="Prints all incoming logs to STDOUT.",
                 functions={
                 },
                 protocol=None
             )
-            self.addConnection("_logs_format", "outbox", "_logs_stdout", "inbox")
+            self.addConnection("_logs", "outbox", "_logs_stdout", "inbox")
 
     def _setupLoggingSYSLOG(self):
 
         if not self.__queueConnected("_logs", "outbox"):
 
+            self.__addLogFilter()
             self.__addModule(
                 name="_logs_syslog",
                 module="wishbone.module.output.syslog",
@@ -24,6 +24,7 @@
 
 
 SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
     "type": "object",
     "properties": {
         "protocols": {
@@ -103,6 +104,30 @@ SCHEMA = {
                         },
                         "event": {
                             "type": "boolean"
+                        },
+                        "queue_size": {
+                            "type": "integer",
+                            "minimum": 1
+                        },
+                        "queues": {
+                            "type": "object",
+                            "patternProperties": {
+                                ".*": {
+                                    "type": "integer",
+                                    "minimum": 1
+                                }
+                            }
+                        },
+                        "concurrency": {
+                            "type": "integer",
+                            "minimum": 1
+                        },
+                        "ordered": {
+                            "type": "boolean"
+                        },
+                        "batch_size": {
+                            "type": "integer",
+                            "minimum": 1
                         }
                     },
                     "required": ["module"],
@@ -111,7 +136,94 @@ SCHEMA = {
             }
         },
         "routingtable": {
-            "type": "array"
+            "type": "array",
+            "items": {
+                "oneOf": [
+                    {
+                        "type": "string"
+                    },
+                    {
+                        "type": "object",
+                        "properties": {
+                            "route": {
+                                "type": "string"
+                            },
+                            "size": {
+                                "type": "integer",
+                                "minimum": 1
+                            },
+                            "lanes": {
+                                "type": "integer",
+                                "minimum": 1
+                            },
+                            "starvation_limit": {
+                                "type": "integer",
+                                "minimum": 1
+                            },
+                            "latency_sample_rate": {
+                                "type": "number",
+                                "minimum": 0,
+                                "exclusiveMinimum": True,
+                                "maximum": 1
+                            },
+                            "overflow": {
+                                "type": "string",
+                                "enum": ["block", "drop-newest", "drop-oldest", "sample"]
+                            },
+                            "sample_rate": {
+                                "type": "number",
+                                "minimum": 0,
+                                "maximum": 1
+                            },
+                            "spill": {
+                                "type": "object",
+                                "properties": {
+                                    "directory": {
+                                        "type": "string"
+                                    },
+                                    "segment_size": {
+                                        "type": "integer",
+                                        "minimum": 1
+                                    },
+                                    "max_disk": {
+                                        "type": "integer",
+                                        "minimum": 1
+                                    },
+                                    "fsync": {
+                                        "type": "string",
+                                        "enum": ["never", "segment", "always"]
+                                    }
+                                },
+                                "additionalProperties": False
+                            },
+                            "durable": {
+                                "type": "object",
+                                "properties": {
+                                    "directory": {
+                                        "type": "string"
+                                    },
+                                    "commit_size": {
+                                        "type": "integer",
+                                        "minimum": 1
+                                    },
+                                    "commit_interval": {
+                                        "type": "number",
+                                        "minimum": 0
+                                    },
+                                    "max_log_size": {
+                                        "type": "integer",
+                                        "minimum": 1
+                                    }
+                                },
+                                "required": ["directory"],
+                                "additionalProperties": False
+                            }
+                        },
+                        "required": ["route"],
+                        "additionalProperties": False
+                    }
+                ]
+            }
         }
     },
     "required": ["modules", "routingtable"],
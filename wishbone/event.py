@@ -23,15 +23,822 @@
 #
 
 import time
+from sys import getsizeof
 from wishbone.error import BulkFull, InvalidData, TTLExpired
+from wishbone.templatecache import TEMPLATE_CACHE, compileString
 from uuid import uuid4
-from jinja2 import Template
-from copy import deepcopy
-from scalpl import Cut
+from jinja2 import Environment, Template, nodes
+from jinja2.exceptions import UndefinedError
+from copy import deepcopy, copy
 from easydict import EasyDict
+from msgpack import packb, unpackb
+from functools import lru_cache
+from collections import OrderedDict, ChainMap
+from collections.abc import Mapping, MutableMapping, Sequence
 
 
 EVENT_RESERVED = ["timestamp", "data", "tmp", "errors", "uuid", "uuid_previous", "cloned", "bulk", "ttl", "tags"]
+KEY_CACHE_SIZE = 4096
+MEMO_CACHE_SIZE = 1024
+TEMPLATE_INTERNALS = frozenset(["loop", "self", "super", "caller", "varargs", "kwargs"])
+NONDETERMINISTIC_FILTERS = frozenset(["random"])
+NONDETERMINISTIC_GLOBALS = frozenset(["lipsum"])
+EVENT_OVERHEAD = 1024
+
+
+def readOnly(value):
+    '''
+    Wraps dicts and lists into a read-only view.  Other values are returned
+    as is.
+
+    Args:
+        value (dict/list/str/int/float/...): The value to wrap.
+
+    Returns:
+        ReadOnlyDict/ReadOnlyList/str/int/float/...: The read-only value.
+    '''
+
+    if isinstance(value, (dict, EventHeader)):
+        return ReadOnlyDict(value)
+    elif isinstance(value, list):
+        return ReadOnlyList(value)
+    else:
+        return value
+
+
+def unwrapReadOnly(value):
+    '''
+    Returns the object wrapped by a ``ReadOnlyDict`` or ``ReadOnlyList``.
+    Used as ``default`` serializer by ``json.dumps``.
+    '''
+
+    if isinstance(value, (ReadOnlyDict, ReadOnlyList)):
+        return value._data
+    raise TypeError("Object of type '%s' is not JSON serializable" % (type(value).__name__))
+
+
+class ReadOnlyDict(Mapping):
+    '''
+    A read-only view on a dict.  Nested dicts and lists are wrapped when
+    accessed so the underlying data is never copied and cannot be modified.
+
+    Args:
+        data (dict): The dict to wrap.
+    '''
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+
+        self._data = data
+
+    def __contains__(self, key):
+
+        return key in self._data
+
+    def __eq__(self, other):
+
+        if isinstance(other, ReadOnlyDict):
+            other = other._data
+        return dict(self._data) == other
+
+    __hash__ = None
+
+    def __getitem__(self, key):
+
+        return readOnly(self._data[key])
+
+    def __iter__(self):
+
+        return iter(self._data)
+
+    def __len__(self):
+
+        return len(self._data)
+
+    def __repr__(self):
+
+        return repr(self._data)
+
+
+class ReadOnlyList(Sequence):
+    '''
+    A read-only view on a list.  Nested dicts and lists are wrapped when
+    accessed.  Concatenation and repetition return a new plain list.
+
+    Args:
+        data (list): The list to wrap.
+    '''
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+
+        self._data = data
+
+    def __contains__(self, value):
+
+        return value in self._data
+
+    def __eq__(self, other):
+
+        if isinstance(other, ReadOnlyList):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return ReadOnlyList(self._data[index])
+        return readOnly(self._data[index])
+
+    def __iter__(self):
+
+        for value in self._data:
+            yield readOnly(value)
+
+    def __len__(self):
+
+        return len(self._data)
+
+    def __repr__(self):
+
+        return repr(self._data)
+
+    def __add__(self, other):
+
+        if isinstance(other, ReadOnlyList):
+            other = other._data
+        if not isinstance(other, list):
+            return NotImplemented
+        return self._data + other
+
+    def __radd__(self, other):
+
+        if not isinstance(other, list):
+            return NotImplemented
+        return other + self._data
+
+    def __mul__(self, other):
+
+        return self._data * other
+
+    __rmul__ = __mul__
+
+
+class KwargsOverlay(Mapping):
+    '''
+    Presents the per event rendered module kwargs on top of the module's
+    static kwargs without copying the latter.  Values are accessible as
+    attributes and as items.  The static kwargs are shared by all events and
+    should be considered read-only.
+
+    Args:
+        base (EasyDict): The module's static kwargs.
+        rendered (dict): The kwargs rendered against the event.
+    '''
+
+    __slots__ = ("_base", "_rendered")
+
+    def __init__(self, base, rendered):
+
+        self._base = base
+        self._rendered = rendered
+
+    def __getattr__(self, name):
+
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getitem__(self, key):
+
+        try:
+            return self._rendered[key]
+        except KeyError:
+            return self._base[key]
+
+    def __iter__(self):
+
+        return iter(self._base)
+
+    def __len__(self):
+
+        return len(self._base)
+
+    def __repr__(self):
+
+        return repr(dict(self))
+
+
+# The environment used to render templates when no environment is provided.
+DEFAULT_ENVIRONMENT = Environment()
+DEFAULT_ENVIRONMENT.policies["json.dumps_kwargs"] = {"sort_keys": True, "default": unwrapReadOnly}
+
+
+class EventHeader(MutableMapping):
+    '''
+    Stores the ``EVENT_RESERVED`` fields of an event in slots and presents
+    them as a dict.
+
+    The ``errors``, ``tmp``, ``tags`` and ``uuid_previous`` containers and the
+    ``uuid`` value are only created once they are accessed.  Keys which are
+    not reserved are stored in a regular dict.  Deleting a reserved key
+    unsets its slot.
+
+    Args:
+        data (dict/list/string/int/float): The value of the ``data`` field.
+        ttl (int): The TTL value.
+        bulk (bool): Whether the event is a bulk event.
+    '''
+
+    __slots__ = ("timestamp", "data", "tmp", "errors", "uuid", "uuid_previous", "cloned", "bulk", "ttl", "tags", "extra")
+
+    RESERVED = frozenset(EVENT_RESERVED)
+    LAZY = {
+        "errors": dict,
+        "tmp": dict,
+        "tags": list,
+        "uuid_previous": list,
+        "uuid": lambda: str(uuid4())
+    }
+
+    def __init__(self, data=None, ttl=254, bulk=False):
+
+        self.timestamp = time.time()
+        self.data = data
+        self.tmp = None
+        self.errors = None
+        self.uuid = None
+        self.uuid_previous = None
+        self.cloned = False
+        self.bulk = bulk
+        self.ttl = ttl
+        self.tags = None
+        self.extra = None
+
+    def __deepcopy__(self, memo):
+
+        header = EventHeader.__new__(EventHeader)
+        memo[id(self)] = header
+        for key in self.__slots__:
+            try:
+                setattr(header, key, deepcopy(getattr(self, key), memo))
+            except AttributeError:
+                pass
+        return header
+
+    def __delitem__(self, key):
+
+        if key in self.RESERVED:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        elif self.extra is None:
+            raise KeyError(key)
+        else:
+            del(self.extra[key])
+
+    def __getitem__(self, key):
+
+        if key in self.RESERVED:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+            if value is None and key in self.LAZY:
+                value = self.LAZY[key]()
+                setattr(self, key, value)
+            return value
+        elif self.extra is None:
+            raise KeyError(key)
+        else:
+            return self.extra[key]
+
+    def __iter__(self):
+
+        for key in EVENT_RESERVED:
+            if hasattr(self, key):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+
+        return len(list(iter(self)))
+
+    def __repr__(self):
+
+        return repr(dict(self))
+
+    def __setitem__(self, key, value):
+
+        if key in self.RESERVED:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def pack(self):
+        '''
+        Serializes the header into a compact MessagePack array containing a
+        bitmask of the unset slots followed by the value of each slot.  The
+        lazy ``uuid`` is assigned first so it survives serialization.
+
+        Returns:
+            bytes: The serialized header.
+        '''
+
+        if getattr(self, "uuid", False) is None:
+            self["uuid"]
+        values = [0]
+        for index, key in enumerate(self.__slots__):
+            try:
+                values.append(getattr(self, key))
+            except AttributeError:
+                values[0] |= 1 << index
+                values.append(None)
+        return packb(values, use_bin_type=True)
+
+    @staticmethod
+    def unpack(data):
+        '''
+        Creates a header from the output of ``pack()``.
+
+        Args:
+            data (bytes): The serialized header.
+
+        Returns:
+            wishbone.event.EventHeader: The header.
+        '''
+
+        values = unpackb(data, raw=False)
+        header = EventHeader.__new__(EventHeader)
+        for index, key in enumerate(EventHeader.__slots__):
+            if not values[0] & 1 << index:
+                setattr(header, key, values[index + 1])
+        return header
+
+    def copy(self):
+        '''
+        Returns a shallow copy of the header.
+
+        Returns:
+            wishbone.event.EventHeader: The copy.
+        '''
+
+        header = EventHeader.__new__(EventHeader)
+        for key in self.__slots__:
+            try:
+                setattr(header, key, getattr(self, key))
+            except AttributeError:
+                pass
+        if header.extra is not None:
+            header.extra = dict(header.extra)
+        return header
+
+
+class KeyPath(object):
+    '''
+    A key in ``Scalpl`` format compiled into a tuple of steps.
+
+    ``data.items[0].name`` becomes ``("data", "items", 0, "name")``.
+    Instances should be obtained through ``compileKey()`` so that each key
+    is only parsed once.
+
+    Args:
+        key (str): The key in ``Scalpl`` format.
+
+    Attributes:
+        key (str): The original key.
+        steps (tuple): The dict keys and list indexes to traverse.
+        parent (tuple): All steps except the last one.
+        last (str/int): The last step.
+    '''
+
+    __slots__ = ("key", "steps", "parent", "last")
+
+    def __init__(self, key):
+
+        steps = []
+        for part in key.split('.'):
+            name, *indexes = part.split('[')
+            steps.append(name)
+            for index in indexes:
+                steps.append(int(index[:-1]))
+
+        self.key = key
+        self.steps = tuple(steps)
+        self.parent = self.steps[:-1]
+        self.last = self.steps[-1]
+
+    def __repr__(self):
+
+        return "KeyPath(%r)" % (self.key)
+
+    def __str__(self):
+
+        return self.key
+
+    def delete(self, data):
+        '''
+        Deletes the key from ``data``.
+        '''
+
+        for step in self.parent:
+            data = data[step]
+        del(data[self.last])
+
+    def get(self, data):
+        '''
+        Returns the value of the key stored in ``data``.
+        '''
+
+        for step in self.steps:
+            data = data[step]
+        return data
+
+    def has(self, data):
+        '''
+        Returns True when ``data`` contains the key.
+        '''
+
+        try:
+            for step in self.steps:
+                data = data[step]
+        except (KeyError, IndexError):
+            return False
+        else:
+            return True
+
+    def set(self, data, value):
+        '''
+        Assigns ``value`` to the key in ``data``.  The parent of the key has
+        to exist.
+        '''
+
+        for step in self.parent:
+            data = data[step]
+        data[self.last] = value
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _compileKey(key):
+
+    return KeyPath(key)
+
+
+def compileKey(key):
+    '''
+    Returns the ``KeyPath`` instance of ``key``.
+
+    Compiled keys are kept in a LRU cache bound to ``KEY_CACHE_SIZE`` entries.
+
+    Args:
+        key (str/KeyPath): The key in ``Scalpl`` format.
+
+    Returns:
+        wishbone.event.KeyPath: The compiled key.
+    '''
+
+    if isinstance(key, KeyPath):
+        return key
+    else:
+        return _compileKey(key)
+
+
+class FieldTemplate(object):
+    '''
+    A template consisting out of a single field reference such as
+    ``{{data.host}}`` compiled into a direct lookup.
+
+    Contrary to a Jinja2 template the referred value is returned in its
+    native type instead of being converted into a string.  Dicts and lists
+    are returned as a deep copy so the result can be stored in and modified
+    through another event.
+
+    Instances should be obtained through ``compileFieldTemplate()``.
+
+    Args:
+        source (str): The original template string.
+        key (str): The referred field in ``Scalpl`` format.
+    '''
+
+    __slots__ = ("source", "path")
+
+    def __init__(self, source, key):
+
+        self.source = source
+        self.path = compileKey(key)
+
+    def __repr__(self):
+
+        return "FieldTemplate(%r)" % (self.source)
+
+    def render(self, context=None):
+        '''
+        Returns the value of the referred field.
+
+        Args:
+            context (Mapping): The event view to lookup the field in.
+
+        Returns:
+            The value of the field.
+
+        Raises:
+            jinja2.exceptions.UndefinedError: The field does not exist.
+        '''
+
+        try:
+            value = self.path.get(context)
+        except (KeyError, IndexError, TypeError):
+            raise UndefinedError("'%s' is undefined" % (self.path.key))
+        if isinstance(value, (ReadOnlyDict, ReadOnlyList)):
+            return deepcopy(value._data)
+        return value
+
+
+def compileFieldTemplate(environment, source):
+    '''
+    Returns a ``FieldTemplate`` when ``source`` is nothing more than a single
+    variable lookup such as ``{{data.host}}`` or ``{{tmp.switch.queue}}``.
+
+    Anything else such as filters, function calls, expressions or additional
+    text requires a real Jinja2 render and returns None.
+
+    Args:
+        environment (jinja2.Environment): The environment to parse ``source`` with.
+        source (str): The template string.
+
+    Returns:
+        FieldTemplate/None: The compiled template or None.
+    '''
+
+    body = environment.parse(source).body
+    if len(body) != 1 or not isinstance(body[0], nodes.Output) or len(body[0].nodes) != 1:
+        return None
+
+    steps = []
+    node = body[0].nodes[0]
+    while not isinstance(node, nodes.Name):
+        if isinstance(node, nodes.Getattr):
+            steps.append(".%s" % (node.attr))
+        elif isinstance(node, nodes.Getitem) and isinstance(node.arg, nodes.Const) and type(node.arg.value) is int and node.arg.value >= 0:
+            steps.append("[%s]" % (node.arg.value))
+        elif isinstance(node, nodes.Getitem) and isinstance(node.arg, nodes.Const) and isinstance(node.arg.value, str) and not any(c in node.arg.value for c in ".[]"):
+            steps.append(".%s" % (node.arg.value))
+        else:
+            return None
+        node = node.node
+
+    if node.name in environment.globals:
+        return None
+
+    return FieldTemplate(source, node.name + "".join(reversed(steps)))
+
+
+def analyseTemplate(environment, ast):
+    '''
+    Returns the event fields and the template functions a template refers to.
+
+    Field references are resolved as deep as possible so ``{{data.host}}``
+    refers to ``data.host`` and not to the complete ``data`` field.
+
+    Args:
+        environment (jinja2.Environment): The environment the template belongs to.
+        ast (jinja2.nodes.Template): The parsed template.
+
+    Returns:
+        tuple: A set of fields, a set of template functions and a bool
+            indicating whether the template is deterministic.
+    '''
+
+    local = set(n.name for n in ast.find_all(nodes.Name) if n.ctx != "load") | TEMPLATE_INTERNALS
+    fields = set()
+    functions = set()
+    filters = set()
+
+    def isStaticItem(node):
+
+        if not isinstance(node, nodes.Const):
+            return False
+        elif type(node.value) is int:
+            return node.value >= 0
+        elif isinstance(node.value, str):
+            return not any(c in node.value for c in ".[]")
+        else:
+            return False
+
+    def visitReference(node):
+
+        steps = []
+        while not isinstance(node, nodes.Name):
+            if isinstance(node, nodes.Getattr):
+                steps.append(".%s" % (node.attr))
+            elif isStaticItem(node.arg):
+                steps.append("[%s]" % (node.arg.value) if type(node.arg.value) is int else ".%s" % (node.arg.value))
+            else:
+                visit(node.arg)
+                steps = []
+            node = node.node
+            if not isinstance(node, (nodes.Name, nodes.Getattr, nodes.Getitem)):
+                visit(node)
+                return
+
+        if node.name in local:
+            return
+        elif node.name in environment.globals:
+            functions.add(node.name)
+        else:
+            fields.add(node.name + "".join(reversed(steps)))
+
+    def visit(node):
+
+        if isinstance(node, (nodes.Name, nodes.Getattr, nodes.Getitem)):
+            visitReference(node)
+        elif isinstance(node, nodes.Call):
+            if isinstance(node.node, nodes.Getattr):
+                visit(node.node.node)
+            else:
+                visit(node.node)
+            for child in node.iter_child_nodes(exclude=("node",)):
+                visit(child)
+        else:
+            if isinstance(node, nodes.Filter):
+                filters.add(node.name)
+            for child in node.iter_child_nodes():
+                visit(child)
+
+    visit(ast)
+
+    deterministic = not (filters & NONDETERMINISTIC_FILTERS or functions & NONDETERMINISTIC_GLOBALS) and \
+        all(getattr(getattr(environment.globals[f], "__self__", None), "deterministic", True) for f in functions)
+
+    return (fields, functions, deterministic)
+
+
+class MemoizedTemplate(object):
+    '''
+    Wraps a deterministic Jinja2 template and remembers its rendered result
+    for each combination of values of the event fields it refers to.
+
+    Templates which depend on a few low cardinality fields are therefor
+    rendered once per distinct value instead of once per event.  When a
+    referred field is missing or holds a container the template is rendered
+    without memoization.
+
+    Instances should be obtained through ``compileTemplate()``.
+
+    Args:
+        template (jinja2.Template): The compiled template.
+        fields (set): The fields the template refers to.
+        size (int): The maximum number of results to remember.
+    '''
+
+    __slots__ = ("template", "paths", "results", "size")
+
+    def __init__(self, template, fields, size=MEMO_CACHE_SIZE):
+
+        self.template = template
+        self.paths = tuple(compileKey(field) for field in sorted(fields))
+        self.results = OrderedDict()
+        self.size = size
+
+    def __repr__(self):
+
+        return "MemoizedTemplate(%s)" % (", ".join(path.key for path in self.paths))
+
+    def render(self, context=None):
+        '''
+        Renders the template using ``context``.
+
+        Args:
+            context (Mapping): The event view to render the template with.
+
+        Returns:
+            str: The rendered template.
+        '''
+
+        if context is None:
+            return self.template.render()
+
+        try:
+            key = tuple([(value.__class__, value) for value in [path.get(context) for path in self.paths]])
+            hash(key)
+        except (KeyError, IndexError, TypeError):
+            return renderTemplate(self.template, context)
+
+        try:
+            result = self.results[key]
+        except KeyError:
+            result = self.results[key] = renderTemplate(self.template, context)
+            if len(self.results) > self.size:
+                self.results.popitem(last=False)
+        else:
+            self.results.move_to_end(key)
+        return result
+
+
+def compileTemplate(environment, source):
+    '''
+    Compiles template ``source`` and wraps it into a ``MemoizedTemplate`` when
+    it is deterministic.
+
+    Meant to be used as compiler of ``TEMPLATE_CACHE`` so that each template
+    is only analysed once.
+
+    Args:
+        environment (jinja2.Environment): The environment to compile the template with.
+        source (str): The template string.
+
+    Returns:
+        jinja2.Template/MemoizedTemplate: The compiled template.
+    '''
+
+    template = compileString(environment, source)
+    (fields, functions, deterministic) = analyseTemplate(environment, environment.parse(source))
+    if deterministic:
+        return MemoizedTemplate(template, fields)
+    else:
+        return template
+
+
+TEMPLATE_TYPES = (Template, FieldTemplate, MemoizedTemplate)
+
+
+def renderTemplate(template, context=None):
+    '''
+    Renders ``template`` using the event view ``context``.
+
+    Contrary to ``jinja2.Template.render()`` the context is not copied into
+    a dict so the lazy fields of the event, such as ``uuid``, are only
+    created when the template refers to them.
+
+    Args:
+        template (jinja2.Template/FieldTemplate/MemoizedTemplate): The template to render.
+        context (Mapping): The event view to render the template with.
+
+    Returns:
+        The rendered template.
+    '''
+
+    if context is None:
+        return template.render()
+    elif not isinstance(template, Template):
+        return template.render(context)
+
+    ctx = template.new_context(ChainMap(context, template.globals), shared=True)
+    try:
+        return template.environment.concat(template.root_render_func(ctx))
+    except Exception:
+        template.environment.handle_exception()
+
+
+def estimateSize(data):
+    '''
+    Returns an approximation of the memory in bytes used by ``data``.
+
+    Args:
+        data (dict/list/str/int/float/...): The data structure to estimate.
+
+    Returns:
+        int: The estimated size in bytes.
+    '''
+
+    size = getsizeof(data)
+    if isinstance(data, Mapping):
+        for key, value in data.items():
+            size += getsizeof(key) + estimateSize(value)
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            size += estimateSize(value)
+    return size
+
+
+def unpackEvent(data):
+    '''
+    Creates an event from the output of ``Event.pack()``.
+
+    Args:
+        data (bytes): The serialized event.
+
+    Returns:
+        wishbone.event.Event: The event.
+    '''
+
+    (header, size, tracking) = unpackb(data, raw=False)
+    event = Event()
+    event.data = EventHeader.unpack(header)
+    event.size = size
+    event.tracking = tracking
+    return event
 
 
 def extractBulkItemValues(event, selection):
@@ -78,7 +885,18 @@ class Event(object):
     module to the other.
 
     The keyformat used is the one handled by the ``Scalpl`` module
-    (https://pypi.python.org/pypi/scalpl/).
+    (https://pypi.python.org/pypi/scalpl/).  Keys are parsed only once and
+    cached, see ``compileKey()``.  All methods accepting a key also accept
+    a precompiled ``wishbone.event.KeyPath`` instance.
+
+    Templates are rendered against ``getView()``, a read-only view on the
+    event which is created once and doesn't copy any data.
+
+    Cloned events share their nested data structures with the event they
+    have been cloned from.  A nested ``dict`` or ``list`` is only copied
+    once the event writes to it through ``set()``, ``delete()``,
+    ``merge()`` or ``copy()`` (copy-on-write).  Values returned by ``get()``
+    should therefor not be modified in place.
 
     Args:
 
@@ -89,34 +907,41 @@ class Event(object):
 
     Attributes:
 
-        data (dict): A dict containing the event data structure.
+        data (wishbone.event.EventHeader): A dict like object containing the event data structure.
         bulk_size (int): The max allowed bulk size.
+        size (int): The estimated size of the event, see ``getSize()``.
+        tracking (dict): The state queue buffers keep on the event while it
+                         is queued keyed by buffer.  None when empty.
     '''
 
     def __init__(self, data=None, ttl=254, bulk=False, bulk_size=100):
 
-        self.data = Cut({
-            "cloned": False,
-            "bulk": bulk,
-            "data": None,
-            "errors": {
-            },
-            "tags": [],
-            "timestamp": time.time(),
-            "tmp": {
-            },
-            "ttl": ttl,
-
-            "uuid_previous": [
-            ],
-        })
-
-        if bulk:
-            self.data["data"] = []
-        else:
-            self.set(data)
-        self.data["uuid"] = str(uuid4())
+        # None means none of the containers are shared with another event.
+        # Otherwise it maps id() to the containers this event has privately
+        # copied since it got cloned.
+        self.__owned = None
+        self.__view = None
+
+        self.data = EventHeader(
+            data=[] if bulk else data,
+            ttl=ttl,
+            bulk=bulk
+        )
         self.bulk_size = bulk_size
+        self.size = None
+        self.tracking = None
+
+    def __deepcopy__(self, memo):
+
+        e = Event.__new__(Event)
+        memo[id(self)] = e
+        for key, value in self.__dict__.items():
+            if key not in ("_Event__owned", "_Event__view", "tracking"):
+                setattr(e, key, deepcopy(value, memo))
+        e.__owned = None
+        e.__view = None
+        e.tracking = None
+        return e
 
     def appendBulk(self, event):
         '''Appends an event to this bulk event.
@@ -131,12 +956,15 @@ class Event(object):
                          not an wishbone.event.Event instance.
         '''
 
-        if self.data["bulk"]:
+        if self.data.bulk:
             if isinstance(event, Event):
-                if len(self.data["data"]) == self.bulk_size:
+                if len(self.data.data) == self.bulk_size:
                     raise BulkFull("The bulk event already contains '%s' events." % (self.bulk_size))
 
-                self.data["data"].append(event.dump())
+                (parent, last) = self.__unshare("data", True)
+                parent[last].append(event.dump())
+                if self.size is not None:
+                    self.size += event.getSize()
             else:
                 raise InvalidData("'event' should be of type wishbone.event.Event.")
         else:
@@ -151,19 +979,22 @@ class Event(object):
 
 
         '''
-        e = deepcopy(self)
-
-        if "uuid_previous" in e.data:
-            e.data["uuid_previous"].append(
-                e.data["uuid"]
-            )
-        else:
-            e.data["uuid_previous"] = [
-                e.data["uuid"]
-            ]
-        e.data["uuid"] = str(uuid4())
-        e.data["timestamp"] = time.time()
-        e.data["cloned"] = True
+        e = Event.__new__(Event)
+        e.__dict__.update(self.__dict__)
+        e.data = self.data.copy()
+        e.__view = None
+        e.tracking = None
+
+        # From here on both events share all nested containers.
+        self.__owned = {}
+        e.__owned = {}
+
+        e.data.uuid_previous = self.data["uuid_previous"] + [
+            self.data["uuid"]
+        ]
+        e.data.uuid = None
+        e.data.timestamp = time.time()
+        e.data.cloned = True
 
         return e
 
@@ -193,9 +1024,9 @@ class Event(object):
             TTLExpired: When TTL has reached 0.
         '''
 
-        self.data["ttl"] -= 1
+        self.data.ttl -= 1
 
-        if self.data["ttl"] <= 0:
+        if self.data.ttl <= 0:
             raise TTLExpired("Event TTL expired in transit.")
 
     def delete(self, key=None):
@@ -211,11 +1042,17 @@ class Event(object):
             KeyError: When a non-existing key is referred to.
         '''
 
-        s = key.split('.')
-        if s[0] in EVENT_RESERVED and len(s) == 1:
+        path = compileKey(key)
+        if len(path.steps) == 1 and path.last in EVENT_RESERVED:
             raise Exception("Cannot delete root of reserved keyword '%s'." % (key))
 
-        del(self.data[key])
+        if path.steps[0] == "data":
+            self.size = None
+        if self.__owned is None:
+            path.delete(self.data)
+        else:
+            (parent, last) = self.__unshare(path)
+            del(parent[last])
 
     def dump(self):
         '''
@@ -227,9 +1064,28 @@ class Event(object):
             dict: The content of the event.
         '''
 
-        d = deepcopy(self)
-        d.data["timestamp"] = float(d.data["timestamp"])
-        return d.data.data
+        d = deepcopy(dict(self.data))
+        d["timestamp"] = float(d["timestamp"])
+        return d
+
+    def getSize(self):
+        '''
+        Returns the estimated memory size of the event in bytes.
+
+        The estimate is only calculated when first asked for, which is when
+        the event enters a byte bounded queue, and then travels along with
+        the event, its clones and its packed form.  Modifying the ``data``
+        field through ``set()``, ``delete()`` or ``merge()`` resets it, after
+        which it is calculated again on the next call.  Writes to ``tmp`` or
+        other header fields keep it.
+
+        Returns:
+            int: The estimated size in bytes.
+        '''
+
+        if self.size is None:
+            self.size = EVENT_OVERHEAD + estimateSize(self.data.data)
+        return self.size
 
     def get(self, key="data"):
         '''Returns the value of ``key``.
@@ -252,12 +1108,30 @@ class Event(object):
             return self.data
         else:
             try:
-                return self.data[key]
+                return compileKey(key).get(self.data)
             except Exception as err:
                 raise KeyError(key)
 
     getNative = dump
 
+    def getView(self):
+        '''
+        Returns a read-only view on the complete event.
+
+        Contrary to ``dump()`` nothing is copied.  The view reflects the
+        current content of the event and raises an error when something
+        tries to modify it.  It's intended to be used as a template
+        rendering context.
+
+        Returns:
+
+            wishbone.event.ReadOnlyDict: A read-only view on the event.
+        '''
+
+        if self.__view is None or self.__view._data is not self.data:
+            self.__view = ReadOnlyDict(self.data)
+        return self.__view
+
     def has(self, key="data"):
         '''Returns a bool indicating the event has ``key``
 
@@ -276,12 +1150,7 @@ class Event(object):
             KeyError: The provided key does not exist
         '''
 
-        try:
-            self.data[key]
-        except KeyError:
-            return False
-        else:
-            return True
+        return compileKey(key).has(self.data)
 
     def isBulk(self):
         '''Tells whether event is ``bulk`` or not.
@@ -293,7 +1162,7 @@ class Event(object):
 
         '''
 
-        return self.data["bulk"]
+        return self.data.bulk
 
     def merge(self, value, key="data"):
         '''
@@ -308,16 +1177,45 @@ class Event(object):
             InvalidData: Types are not mergeable
         '''
 
+        if compileKey(key).steps[0] == "data":
+            self.size = None
         try:
             if isinstance(value, list):
-                self.data[key] += value
+                (parent, last) = self.__unshare(key, True)
+                parent[last] += value
             elif isinstance(value, dict):
-                self.data[key].update(value)
+                (parent, last) = self.__unshare(key, True)
+                parent[last].update(value)
             else:
                 raise InvalidData("Source and destination are incompatible to merge")
         except Exception:
             raise InvalidData("Source and destination are incompatible to merge")
 
+    def pack(self):
+        '''
+        Serializes the event into a compact binary MessagePack representation
+        which can be turned into an event again using ``unpackEvent()``.
+
+        The size estimate and the tracking state are included so they
+        survive a queue spilling the event to disk.
+
+        MessagePack has no tuple type so tuples, such as the ones stored in
+        ``errors``, are unpacked as lists.  Values of other types than
+        dict, list, tuple, str, bytes, int, float, bool and None can't be
+        serialized.
+
+        Returns:
+            bytes: The serialized event.
+
+        Raises:
+            InvalidData: The event contains values which can't be serialized.
+        '''
+
+        try:
+            return packb([self.data.pack(), self.size, self.tracking], use_bin_type=True)
+        except (TypeError, ValueError, OverflowError) as err:
+            raise InvalidData("Failed to serialize event. Reason: %s" % (err))
+
     def render(self, template, env_template=None):
         '''Returns a formatted string using the provided template and key
 
@@ -338,9 +1236,8 @@ class Event(object):
 
         try:
             if env_template is None:
-                return Template(template).render(**self.data)
-            else:
-                return env_template.from_string(template).render(**self.data)
+                env_template = DEFAULT_ENVIRONMENT
+            return renderTemplate(TEMPLATE_CACHE.get(env_template, template, compileTemplate), self.getView())
         except Exception as err:
             raise InvalidData("Failed to render template. Reason: %s" % (err))
 
@@ -370,23 +1267,28 @@ class Event(object):
         except Exception as err:
             raise InvalidData("Failed to render template. Reason: %s" % (err))
 
-    def renderKwargs(self, template_kwargs):
+    def renderKwargs(self, template_kwargs, base=None):
         '''
         Renders all the templates found in ``template_kwargs`` and sets
         self.kwarg, a version of the current module's kwargs relate to this
         events' content
 
+        When ``base`` is provided, ``template_kwargs`` is expected to only
+        contain the kwargs which need rendering and the result is overlaid
+        on ``base`` using a ``KwargsOverlay`` instance.
+
         Args:
 
             template_kwargs (dict): A dict of the modules kwargs optoinally
                                     containing Template instances.
+            base (EasyDict): The static kwargs of the module.
         '''
 
         def recurse(data):
 
-            if isinstance(data, Template):
+            if isinstance(data, TEMPLATE_TYPES):
                 try:
-                    return data.render(**self.dump())
+                    return renderTemplate(data, self.getView())
                 except Exception as err:
                     return "#error: %s#" % (err)
             elif isinstance(data, dict):
@@ -402,11 +1304,17 @@ class Event(object):
             else:
                 return data
 
-        self.kwargs = EasyDict(
-            recurse(
-                template_kwargs
+        if base is None:
+            self.kwargs = EasyDict(
+                recurse(
+                    template_kwargs
+                )
             )
-        )
+        else:
+            rendered = {}
+            for key, value in template_kwargs.items():
+                rendered[key] = recurse(value)
+            self.kwargs = KwargsOverlay(base, rendered)
 
     def set(self, value, key="data"):
         '''Sets the value of ``key``.
@@ -419,7 +1327,14 @@ class Event(object):
             key (str): The key to store the value
         '''
 
-        self.data[key] = value
+        path = compileKey(key)
+        if path.steps[0] == "data":
+            self.size = None
+        if self.__owned is None:
+            path.set(self.data, value)
+        else:
+            (parent, last) = self.__unshare(path)
+            parent[last] = value
 
     def slurp(self, data):
         '''
@@ -446,7 +1361,7 @@ class Event(object):
                                   an event
         '''
         try:
-            assert isinstance(data, (dict, Cut)), "event.slurp() expects a dict."
+            assert isinstance(data, (dict, EventHeader)), "event.slurp() expects a dict."
             for item in [
                 ("timestamp", float),
                 ("data", None),
@@ -465,13 +1380,50 @@ class Event(object):
         except AssertionError as err:
             raise InvalidData("The incoming data could not be used to construct an event.  Reason: '%s'." % err)
         else:
-            self.data = Cut(data)
-            self.data["timestamp"] = time.time()
+            self.data = EventHeader()
+            self.data.update(data)
+            self.data.timestamp = time.time()
+            self.__owned = None
+            self.size = None
 
         return(self)
 
     raw = dump
 
+    def __unshare(self, key, leaf=False):
+        '''
+        Makes sure none of the containers leading to ``key`` are shared with
+        another event by shallow copying the ones which aren't owned yet.
+
+        Args:
+            key (str/KeyPath): The key in ``Scalpl`` format.
+            leaf (bool): Whether the container stored under ``key`` should
+                         be unshared too.
+
+        Returns:
+            tuple: The (unshared) parent container and the last key element.
+        '''
+
+        path = compileKey(key)
+        last = path.last
+        if leaf:
+            steps = path.steps
+        else:
+            steps = path.parent
+
+        parent = self.data
+        for step in steps:
+            child = parent[step]
+            if self.__owned is not None and isinstance(child, (dict, list)) and id(child) not in self.__owned:
+                child = copy(child)
+                self.__owned[id(child)] = child
+                parent[step] = child
+            previous, parent = parent, child
+
+        if leaf:
+            return (previous, last)
+        return (parent, last)
+
     def __renderDataStructure(self, datastructure, env_template):
 
         def recurse(data):
@@ -479,10 +1431,7 @@ class Event(object):
             if isinstance(data, str):
                 if '{{' in data and '}}'in data:
                     try:
-                        if env_template is None:
-                            return Template(data).render(**self.dump())
-                        else:
-                            return env_template.from_string(data).render(**self.dump())
+                        return renderTemplate(TEMPLATE_CACHE.get(env_template or DEFAULT_ENVIRONMENT, data, compileTemplate), self.getView())
                     except Exception as err:
                         return "#error: %s#" % (err)
                 else:
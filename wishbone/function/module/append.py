@@ -23,6 +23,7 @@
 #
 
 from wishbone.function.module import ModuleFunction
+from wishbone.event import compileKey
 
 
 class Append(ModuleFunction):
@@ -39,7 +40,7 @@ class Append(ModuleFunction):
     def __init__(self, data, destination='tags'):
 
         self.data = data
-        self.destination = destination
+        self.destination = compileKey(destination)
 
     def do(self, event):
         '''
@@ -55,8 +56,7 @@ class Append(ModuleFunction):
         if isinstance(self.data, (int, float, str)):
             lst = event.get(self.destination)
             if isinstance(lst, list):
-                lst.append(self.data)
-                event.set(lst, self.destination)
+                event.set(lst + [self.data], self.destination)
             else:
                 raise Exception("'%s' is not an array" % (self.destination))
         else:
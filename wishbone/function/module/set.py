@@ -24,6 +24,7 @@
 
 
 from wishbone.function.module import ModuleFunction
+from wishbone.event import compileKey
 
 
 class Set(ModuleFunction):
@@ -40,7 +41,7 @@ class Set(ModuleFunction):
     def __init__(self, data, destination='data'):
 
         self.data = data
-        self.destination = destination
+        self.destination = compileKey(destination)
 
     def do(self, event):
         '''
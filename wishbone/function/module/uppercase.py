@@ -23,6 +23,7 @@
 #
 
 from wishbone.function.module import ModuleFunction
+from wishbone.event import compileKey
 
 
 class Uppercase(ModuleFunction):
@@ -38,8 +39,8 @@ class Uppercase(ModuleFunction):
 
     def __init__(self, source='data', destination='data'):
 
-        self.source = source
-        self.destination = destination
+        self.source = compileKey(source)
+        self.destination = compileKey(destination)
 
     def do(self, event):
         '''
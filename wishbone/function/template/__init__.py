@@ -26,6 +26,16 @@ from wishbone.error import ModuleInitFailure
 
 
 class TemplateFunction(object):
+    '''
+    The base class of Wishbone template functions.
+
+    Attributes:
+        deterministic (bool): Whether get() always returns the same value for
+            the same arguments.  Only templates calling deterministic
+            functions are memoized.
+    '''
+
+    deterministic = True
 
     def get(self):
         raise ModuleInitFailure("A template function is supposed to have a get() method.")
@@ -37,6 +37,8 @@ class Choice(TemplateFunction):
         values (list): An list of elements to choose from
     '''
 
+    deterministic = False
+
     def __init__(self, values):
 
         self.values = values
@@ -41,6 +41,8 @@ class Cycle(TemplateFunction):
         values(list): A list of elements to cycle through.
     '''
 
+    deterministic = False
+
     def __init__(self, values):
 
         self.c = cycle_array(values)
@@ -36,6 +36,8 @@ class RandomBool(TemplateFunction):
         None
     '''
 
+    deterministic = False
+
     def get(self):
         '''
         The function mapped to the template function.
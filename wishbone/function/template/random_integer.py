@@ -38,6 +38,8 @@ class RandomInteger(TemplateFunction):
         maximum (int): The maximum of the range.
     '''
 
+    deterministic = False
+
     def __init__(self, minimum=0, maximum=0):
 
         self.minimum = minimum
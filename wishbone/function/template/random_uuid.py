@@ -38,6 +38,8 @@ class RandomUUID(TemplateFunction):
 
     '''
 
+    deterministic = False
+
     def get(self):
         '''
         The function mapped to the template function.
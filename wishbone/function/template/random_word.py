@@ -43,6 +43,8 @@ class RandomWord(TemplateFunction):
         encoding (str): The encoding used to read the file.
     '''
 
+    deterministic = False
+
     def __init__(self, filename=None, encoding="latin-1"):
 
         if filename is None:
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  hook.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+
+class ConsumeHook(object):
+
+    '''
+    Base class of the hooks called around each execution of a consumer
+    function registered with ``Actor.registerConsumer()``.
+
+    Hooks are registered with ``Actor.registerConsumeHook()``.  An actor
+    without hooks calls its consumer functions directly.
+    '''
+
+    def preConsume(self, actor, queue, event):
+        '''
+        Is executed before the consumer function processes ``event``.
+
+        Args:
+            actor (wishbone.actor.Actor): The actor consuming ``event``.
+            queue (str): The name of the queue ``event`` was consumed from.
+            event (wishbone.event.Event): The event.
+        '''
+
+        pass
+
+    def postConsume(self, actor, queue, event, error):
+        '''
+        Is executed after the consumer function processed ``event``.
+
+        Args:
+            actor (wishbone.actor.Actor): The actor consuming ``event``.
+            queue (str): The name of the queue ``event`` was consumed from.
+            event (wishbone.event.Event): The event.
+            error (Exception): The exception raised by the consumer function
+                               or None.
+        '''
+
+        pass
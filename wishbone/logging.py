@@ -28,6 +28,7 @@ from wishbone.event import Event
 from wishbone.error import QueueFull
 from time import time
 from os import getpid
+from gevent import getcurrent
 
 
 class MockLogger():
@@ -35,20 +36,20 @@ class MockLogger():
     A wrapper around Logging which mimics logger.Logger
     '''
 
-    def __init__(self, name, q, level=5):
+    def __init__(self, name, q, level=5, loglevel=7):
 
         self.level = level
-        self.l = Logging(name, q)
+        self.l = Logging(name, q, level=loglevel)
 
     def flush(self):
         pass
 
     def write(self, line):
-        self.l._Logging__log(self.level, line.rstrip())
+        self.l.log(self.level, line.rstrip())
 
     def writelines(self, lines):
         for line in lines:
-            self.l.Logging.__log(self.level, line.rstrip())
+            self.l.log(self.level, line.rstrip())
 
 
 class Logging():
@@ -56,6 +57,21 @@ class Logging():
     '''
     Generates Wishbone formatted log messages following the Syslog priority
     definition.
+
+    Messages with a priority higher than ``level`` are discarded before any
+    work is done.  Positional ``args`` are merged into ``message`` using
+    ``%`` formatting only when the message is not discarded::
+
+        self.logging.debug("Event with id '%s' dropped.", event_id)
+
+    Args:
+        name (str): The name of the module generating the messages.
+        q (wishbone.queue.Queue): The queue to submit the messages to.
+        identification (str): The identification of the Wishbone instance.
+        level (int): The highest priority to generate messages for.
+        per_greenlet (bool): Keeps the current event ID per greenlet for
+                             modules consuming a queue with multiple
+                             greenlets.
     '''
 
     LEVELS = {
@@ -69,19 +85,29 @@ class Logging():
         7: "debug"
     }
 
-    def __init__(self, name, q, identification=None):
+    def __init__(self, name, q, identification=None, level=7, per_greenlet=False):
         self.name = name
         self.logs = q
         self.identification = identification
+        self.level = level
         self.__queue_full_message = False
         self.__event_id = None
+        self.__event_ids = {} if per_greenlet else None
+
+    def __log(self, level, message, args):
 
-    def __log(self, level, message):
+        if args:
+            message = message % args
+
+        if self.__event_ids is None:
+            event_id = self.__event_id
+        else:
+            event_id = self.__event_ids.get(getcurrent())
 
         event = Event({
             "time": time(),
             "identification": self.identification,
-            "event_id": self.__event_id,
+            "event_id": event_id,
             "level": level,
             "txt_level": self.LEVELS[level],
             "pid": getpid(),
@@ -100,49 +126,93 @@ class Logging():
     def alert(self, message, *args, **kwargs):
         """Generates a log message with priority alert(1).
         """
-        self.__log(1, message)
+        if self.level >= 1:
+            self.__log(1, message, args)
 
     def critical(self, message, *args, **kwargs):
         """Generates a log message with priority critical(2).
         """
-        self.__log(2, message)
+        if self.level >= 2:
+            self.__log(2, message, args)
     crit = critical
 
     def debug(self, message, *args, **kwargs):
         """Generates a log message with priority debug(7).
         """
-        self.__log(7, message)
+        if self.level >= 7:
+            self.__log(7, message, args)
 
     def emergency(self, message, *args, **kwargs):
         """Generates a log message with priority emergency(0).
         """
-        self.__log(0, message)
+        if self.level >= 0:
+            self.__log(0, message, args)
     emerg = emergency
     exception = emergency
 
     def error(self, message, *args, **kwargs):
         """Generates a log message with priority error(3).
         """
-        self.__log(3, message, *args, **kwargs)
+        if self.level >= 3:
+            self.__log(3, message, args)
     err = error
 
     def informational(self, message, *args, **kwargs):
         """Generates a log message with priority informational(6).
         """
-        self.__log(6, message)
+        if self.level >= 6:
+            self.__log(6, message, args)
     info = informational
 
+    def isEnabledFor(self, level):
+        '''
+        Returns True when messages with priority ``level`` are generated.
+
+        Useful to skip building expensive log messages.
+
+        Args:
+            level (int): The priority.
+
+        Returns:
+            bool: True when messages with priority ``level`` are generated.
+        '''
+
+        return level <= self.level
+
+    def log(self, level, message, *args, **kwargs):
+        """Generates a log message with priority <level>.
+        """
+        if self.level >= level:
+            self.__log(level, message, args)
+
     def notice(self, message, *args, **kwargs):
         """Generates a log message with priority notice(5).
         """
-        self.__log(5, message)
+        if self.level >= 5:
+            self.__log(5, message, args)
 
     def setCurrentEventID(self, event_id):
 
-        self.__event_id = event_id
+        if self.__event_ids is None:
+            self.__event_id = event_id
+        elif event_id is None:
+            self.__event_ids.pop(getcurrent(), None)
+        else:
+            self.__event_ids[getcurrent()] = event_id
+
+    def setLevel(self, level):
+        '''
+        Sets the highest priority to generate messages for.
+
+        Args:
+            level (int): The priority.
+        '''
+
+        self.level = level
 
     def warning(self, message, *args, **kwargs):
         """Generates a log message with priority warning(4).
         """
-        self.__log(4, message, *args, **kwargs)
+        if self.level >= 4:
+            self.__log(4, message, args)
     warn = warning
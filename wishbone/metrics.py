@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  metrics.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+import os
+import json
+from collections import OrderedDict
+from time import time
+from gevent import socket
+from gevent.pywsgi import WSGIServer
+from wishbone.error import InvalidConfig
+from wishbone.event import Event
+from wishbone.utils.histogram import Histogram
+
+
+class Counter(object):
+
+    '''
+    A monotonically increasing value.
+    '''
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+
+        self.value = 0
+
+    def inc(self, amount=1):
+        '''
+        Increments the counter with ``amount``.
+        '''
+
+        self.value += amount
+
+
+class Gauge(object):
+
+    '''
+    A value which can go up and down.
+    '''
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+
+        self.value = 0
+
+    def set(self, value):
+        '''
+        Sets the gauge to ``value``.
+        '''
+
+        self.value = value
+
+
+class MetricRegistry(object):
+
+    '''
+    A registry of the counters, gauges and histograms of all actors and
+    queues of a router.
+
+    Metrics are updated in place by their owner.  Owners which already keep
+    their own statistics such as ``wishbone.queue.Queue`` register a
+    function returning them instead using ``register()``.  Nothing is
+    generated until ``collect()`` is called, so the cost of metrics does not
+    depend on the number of events flowing through the pipeline.
+
+    Args:
+        source (str): The source of the metrics.  Defaults to the hostname.
+    '''
+
+    def __init__(self, source=None):
+
+        self.source = socket.gethostname() if source is None else source
+        self.metrics = OrderedDict()
+        self.functions = OrderedDict()
+        self.snapshot = []
+
+    def collect(self):
+        '''
+        Collects the value of all metrics and stores the result as
+        ``snapshot``.  Histograms are reset.
+
+        Returns:
+            list: The metrics as dicts with the format of the Wishbone metric
+                  events.
+        '''
+
+        now = time()
+        values = []
+        for name, metric in list(self.metrics.items()):
+            if isinstance(metric, Histogram):
+                for key, value in metric.summary().items():
+                    values.append(("%s.%s" % (name, key), value))
+                metric.reset()
+            else:
+                values.append((name, metric.value))
+        for prefix, function in list(self.functions.items()):
+            for key, value in function().items():
+                values.append(("%s.%s" % (prefix, key), value))
+
+        self.snapshot = [{
+            "time": now,
+            "type": "wishbone",
+            "source": self.source,
+            "name": name,
+            "value": value,
+            "unit": "",
+            "tags": ()
+        } for name, value in values]
+        return self.snapshot
+
+    def counter(self, name):
+        '''
+        Returns the counter ``name``, creating it when required.
+
+        Args:
+            name (str): The name of the metric.
+
+        Returns:
+            wishbone.metrics.Counter: The counter.
+        '''
+
+        return self.__get(name, Counter)
+
+    def gauge(self, name):
+        '''
+        Returns the gauge ``name``, creating it when required.
+
+        Args:
+            name (str): The name of the metric.
+
+        Returns:
+            wishbone.metrics.Gauge: The gauge.
+        '''
+
+        return self.__get(name, Gauge)
+
+    def histogram(self, name):
+        '''
+        Returns the histogram ``name``, creating it when required.  Its
+        p50, p90, p99, max and count are collected.
+
+        Args:
+            name (str): The name of the metric.
+
+        Returns:
+            wishbone.utils.histogram.Histogram: The histogram.
+        '''
+
+        return self.__get(name, Histogram)
+
+    def register(self, prefix, function):
+        '''
+        Registers ``function`` returning a dict of metric values which are
+        collected as ``<prefix>.<key>``.
+
+        Args:
+            prefix (str): The prefix of the metric names.
+            function (func): A function returning a dict.
+        '''
+
+        self.functions[prefix] = function
+
+    def unregister(self, prefix):
+        '''
+        Removes all metrics and functions starting with ``prefix``.
+
+        Args:
+            prefix (str): The prefix of the metric names.
+        '''
+
+        for name in [name for name in self.metrics if name == prefix or name.startswith(prefix + ".")]:
+            del(self.metrics[name])
+        for name in [name for name in self.functions if name == prefix or name.startswith(prefix + ".")]:
+            del(self.functions[name])
+
+    def __get(self, name, cls):
+
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls()
+        elif not isinstance(metric, cls):
+            raise InvalidConfig("Metric '%s' is already registered as a %s." % (name, type(metric).__name__))
+        return metric
+
+
+class MetricServer(object):
+
+    '''
+    Serves the latest snapshot of a ``MetricRegistry`` as JSON over HTTP.
+
+    Args:
+        registry (wishbone.metrics.MetricRegistry): The registry to serve.
+        address (str): ``<host>:<port>`` to listen on TCP or, when it contains
+                       a ``/``, the path of a unix socket.
+    '''
+
+    def __init__(self, registry, address):
+
+        self.registry = registry
+        self.address = address
+        self.server = None
+
+    def application(self, env, start_response):
+
+        if env['PATH_INFO'] in ('/', '/metrics'):
+            start_response('200 OK', [('Content-Type', 'application/json')])
+            return [json.dumps(self.registry.snapshot).encode()]
+        else:
+            start_response('404 Not Found', [('Content-Type', 'text/html')])
+            return [b'<h1>Not Found</h1>']
+
+    def start(self):
+        '''
+        Starts listening in the background.
+        '''
+
+        if "/" in self.address:
+            if os.path.exists(self.address):
+                os.remove(self.address)
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(self.address)
+            listener.listen(50)
+        else:
+            (host, port) = self.address.rsplit(":", 1)
+            listener = (host, int(port))
+        self.server = WSGIServer(listener, self.application, log=None, error_log=None)
+        self.server.start()
+
+    def stop(self):
+        '''
+        Stops listening.
+        '''
+
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+            if "/" in self.address and os.path.exists(self.address):
+                os.remove(self.address)
+
+
+def snapshotEvent(snapshot):
+    '''
+    Returns ``snapshot`` as one bulk event.  ``wishbone.module.process.unpack``
+    turns it into one event per metric.
+
+    The native events of the bulk are built directly from the metric dicts
+    instead of through a ``wishbone.event.Event`` per metric.  They share
+    the timestamp and the ID of the bulk event, suffixed with the position
+    of the metric.
+
+    Args:
+        snapshot (list): A snapshot returned by ``MetricRegistry.collect()``.
+
+    Returns:
+        wishbone.event.Event: The bulk event.
+    '''
+
+    bulk = Event(bulk=True, bulk_size=max(1, len(snapshot)))
+    now = bulk.data.timestamp
+    uuid = bulk.data["uuid"]
+    bulk.data.data = [{
+        "timestamp": now,
+        "data": dict(metric),
+        "tmp": {},
+        "errors": {},
+        "uuid": "%s-%s" % (uuid, index),
+        "uuid_previous": [],
+        "cloned": False,
+        "bulk": False,
+        "ttl": 254,
+        "tags": []
+    } for index, metric in enumerate(snapshot)]
+    return bulk
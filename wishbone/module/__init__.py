@@ -196,8 +196,9 @@ class OutputModule(Actor):
         self.parallel_pool = Pool(self.kwargs.parallel_streams)
         self._run.wait()
         self.logging.debug("Function '%s' has been registered to consume queue '%s'" % (function.__name__, queue))
+        function = self._wrapConsumer(function, queue)
 
-        def execFunction(function, event):
+        def execFunction(function, event, q, consumed):
             try:
                 function(deepcopy(event))
             except Exception as err:
@@ -206,7 +207,7 @@ class OutputModule(Actor):
                 exc_type, exc_value, exc_traceback = exc_info()
                 info = (traceback.extract_tb(exc_traceback)[-1][1], str(exc_type), str(exc_value))
 
-                event.set(info, "errors.%s" % (self.name))
+                event.set(info, self._errors_key)
 
                 self.logging.error("%s" % (err))
                 self.submit(event, "_failed")
@@ -215,31 +216,37 @@ class OutputModule(Actor):
             finally:
                 # Unset the current event uuid to the logger object
                 self.logging.setCurrentEventID(None)
+                q.ack(consumed)
 
         while self.loop():
 
-            event = self.pool.getQueue(queue).get()
-            if not event.has("tmp.%s" % (self.name)):
-                event.set({}, "tmp.%s" % (self.name))
+            q = self.pool.getQueue(queue)
+            event = consumed = q.get()
+            if not event.has(self._tmp_key):
+                event.set({}, self._tmp_key)
 
             # Render kwargs relative to the event's content and make these accessible under event.kwargs
-            event.renderKwargs(self.kwargs_template)
+            if self.kwargs_dynamic:
+                event.renderKwargs(self.kwargs_dynamic, self.kwargs)
+            else:
+                event.kwargs = self.kwargs
 
             # Validate TTL
             try:
                 event.decrementTTL()
             except TTLExpired as err:
-                self.logging.warning("Event with UUID %s dropped. Reason: %s" % (event.get("uuid"), err))
+                self.logging.warning("Event with UUID %s dropped. Reason: %s", event.get(self._uuid_key), err)
+                q.ack(consumed)
                 continue
 
             # Set the current event uuid to the logger object
-            self.logging.setCurrentEventID(event.get("uuid"))
+            self.logging.setCurrentEventID(event.get(self._uuid_key))
 
             # Apply all the defined queue functions to the event
             event = self._applyFunctions(queue, event)
 
             # Apply consumer function
-            self.parallel_pool.spawn(execFunction, function, event)
+            self.parallel_pool.spawn(execFunction, function, event, q, consumed)
 
     def _moduleInitSetup(self):
         '''
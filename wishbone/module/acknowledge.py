@@ -124,7 +124,7 @@ class Acknowledge(FlowModule):
             if self.ack_table.unack(ack_id):
                 self.submit(event, "outbox")
             else:
-                self.logging.debug("Event with still unacknowledged <ack_id> '%s' send to <dropped> queue." % (ack_id))
+                self.logging.debug("Event with still unacknowledged <ack_id> '%s' send to <dropped> queue.", ack_id)
                 self.submit(event, "dropped")
 
     def acknowledge(self, event):
@@ -132,10 +132,10 @@ class Acknowledge(FlowModule):
         if event.has("tmp.%s.ack_id" % (self.name)):
             ack_id = event.get('tmp.%s.ack_id' % (self.name))
             if self.ack_table.ack(ack_id):
-                self.logging.debug("Event acknowledged with <ack_id> '%s'." % (ack_id))
+                self.logging.debug("Event acknowledged with <ack_id> '%s'.", ack_id)
                 event.delete('tmp.%s.ack_id' % (self.name))
             else:
-                self.logging.debug("Event with <ack_id> '%s' received but was not previously acknowledged." % (ack_id))
+                self.logging.debug("Event with <ack_id> '%s' received but was not previously acknowledged.", ack_id)
         else:
             self.logging.warning("Received event without 'tmp.%s.ack_id' therefor it is dropped" % (self.name))
 
@@ -127,20 +127,20 @@ class Count(FlowModule):
                             self.submit(event, "outbox")
                         if condition["action"] == "drop":
                             self.submit(event, "dropped")
-                            self.logging.debug("Event with id '%s' and key '%s' dropped" % (event.get('uuid'), key))
+                            self.logging.debug("Event with id '%s' and key '%s' dropped", event.get('uuid'), key)
                     else:
                         if condition["action"] == "pass":
                             self.submit(event, "dropped")
-                            self.logging.debug("Event with id '%s' and key '%s' dropped" % (event.get('uuid'), key))
+                            self.logging.debug("Event with id '%s' and key '%s' dropped", event.get('uuid'), key)
                         if condition["action"] == "drop":
                             self.submit(event, "outbox")
                     break
         else:
             self.submit(event, "outbox")
-            self.logging.debug("Event with id '%s' has not a single key defined in the conditions therefor it is passed to outbox." % (event.get('uuid'), key))
+            self.logging.debug("Event with id '%s' has not a single key defined in the conditions therefor it is passed to outbox.", event.get('uuid'))
 
     def __countDown(self, seconds, key):
 
         sleep(seconds)
         del(self.__counter[key])
-        self.logging.debug("Time window of '%s' expired for key '%s'." % (seconds, key))
+        self.logging.debug("Time window of '%s' expired for key '%s'.", seconds, key)
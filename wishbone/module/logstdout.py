@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  logstdout.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from gevent import monkey; monkey.patch_all()
+from wishbone.module import OutputModule
+from gevent.fileobject import FileObjectThread
+from operator import itemgetter
+from string import Formatter
+from time import localtime, strftime
+import sys
+
+LOG_FORMAT = "{timestamp} {identification}[{pid}] {txt_level} {module}: {message}"
+
+LOG_COLORS = {
+    0: "\x1B[0;35m",
+    1: "\x1B[1;35m",
+    2: "\x1B[0;31m",
+    3: "\x1B[1;31m",
+    4: "\x1B[1;33m",
+    5: "\x1B[1;30m",
+    6: "\x1B[1;37m",
+    7: "\x1B[1;37m"
+}
+LOG_COLOR_RESET = "\x1B[0m"
+
+
+class Timestamp(object):
+
+    '''
+    Formats epoch times as ``YYYY-MM-DDTHH:mm:ss.SSSS+HH:MM`` in local time.
+
+    The part depending on the second is cached so only the fraction is
+    formatted as long as the second does not change.
+    '''
+
+    def __init__(self):
+
+        self.__second = None
+        self.__date = None
+        self.__zone = None
+
+    def format(self, epoch):
+
+        second = int(epoch)
+        if second != self.__second:
+            t = localtime(second)
+            zone = strftime("%z", t)
+            self.__date = strftime("%Y-%m-%dT%H:%M:%S", t)
+            self.__zone = "%s:%s" % (zone[:3], zone[3:])
+            self.__second = second
+        return "%s.%04d%s" % (self.__date, int((epoch - second) * 10000), self.__zone)
+
+
+def compileFormat(log_format):
+    '''
+    Compiles a ``str.format()`` style ``log_format`` into a ``%`` style
+    template and a function returning the values of the referred fields.
+
+    Args:
+        log_format (str): The format string with named fields.
+
+    Returns:
+        tuple: The template and a function accepting a dict.
+    '''
+
+    template = []
+    fields = []
+    for literal, field, spec, conversion in Formatter().parse(log_format):
+        template.append(literal.replace("%", "%%"))
+        if field is not None:
+            template.append("%s")
+            fields.append(field)
+    if not fields:
+        return ("".join(template), lambda data: ())
+    elif len(fields) == 1:
+        getter = itemgetter(fields[0])
+        return ("".join(template), lambda data: (getter(data),))
+    else:
+        return ("".join(template), itemgetter(*fields))
+
+
+class LogSTDOUT(OutputModule):
+
+    '''**Prints Wishbone log events to STDOUT.**
+
+    A dedicated sink for the events of the ``_logs`` queue which filters
+    them by level and formats them without rendering templates.  Unlike
+    other output modules the events are consumed directly, without deep
+    copying them or spawning a greenlet per event.  Lines are written in
+    batches of up to ``batch_size`` lines whenever the inbox runs empty.
+
+
+    Parameters::
+
+        - batch_size(int)(100)
+           |  The maximum number of lines per write.
+
+        - colorize(bool)(True)
+           |  Colors each line according to its level.
+
+        - format(str)("{timestamp} {identification}[{pid}] {txt_level} {module}: {message}")
+           |  The line format.  Refers to the fields of the log event
+           |  and ``timestamp``.
+
+        - loglevel(int)(6)
+           |  The maximum level of the printed logs.
+
+        - native_events(bool)(False)
+           |  If True, outgoing events are native events.
+
+        - parallel_streams(int)(1)
+           |  The number of outgoing parallel data streams.
+
+        - payload(str)(None)
+           |  Unused.
+
+        - selection(str)("data")
+           |  The event key containing the log record.
+
+
+    Queues::
+
+        - inbox
+           |  Incoming log events.
+    '''
+
+    def __init__(self, actor_config,
+                 selection="data", payload=None, native_events=False, parallel_streams=1,
+                 loglevel=6, format=LOG_FORMAT, colorize=True, batch_size=100):
+        OutputModule.__init__(self, actor_config)
+
+        self.pool.createQueue("inbox")
+        self.registerConsumer(self.consume, "inbox")
+
+        (self.template, self.fields) = compileFormat(format)
+        self.timestamp = Timestamp()
+        self.lines = []
+
+    def preHook(self):
+
+        self.f = FileObjectThread(sys.stdout)
+
+    def _consumer(self, function, queue):
+        '''
+        Greenthread which drains up to ``batch_size`` events from <queue> at
+        once, applies <function> to each of them and writes the resulting
+        lines.  Overrides ``OutputModule._consumer``.
+
+        Args:
+            function (``function``): The function which has been registered to consume ``queue``.
+
+            queue (str): The name of the queue from which events have to be
+                         consumed and processed by ``function``.
+
+        Returns:
+            None
+        '''
+
+        self._run.wait()
+        self.logging.debug("Function '%s' has been registered to consume queue '%s'" % (function.__name__, queue))
+        function = self._wrapConsumer(function, queue)
+
+        while self.loop():
+            q = self.pool.getQueue(queue)
+            for event in q.getMany(self.kwargs.batch_size):
+                try:
+                    function(event)
+                except Exception as err:
+                    if self.config.disable_exception_handling:
+                        raise
+                    self.logging.error("Invalid log event skipped. Reason: %s" % (err))
+                finally:
+                    q.ack(event)
+            if self.lines:
+                self.flush()
+
+    def consume(self, event):
+
+        data = event.get(self.kwargs.selection)
+        level = data["level"]
+        if level <= self.kwargs.loglevel:
+            data = dict(data, timestamp=self.timestamp.format(data["time"]))
+            line = self.template % self.fields(data)
+            if self.kwargs.colorize:
+                line = "%s%s%s" % (LOG_COLORS.get(level, LOG_COLORS[7]), line, LOG_COLOR_RESET)
+            self.lines.append(line)
+
+    def flush(self):
+        '''
+        Writes the pending lines.
+        '''
+
+        lines = self.lines
+        self.lines = []
+        self.f.write("\n".join(lines) + "\n")
+
+    def postHook(self):
+
+        if self.lines:
+            self.flush()
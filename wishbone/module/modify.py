@@ -214,7 +214,7 @@ class Modify(ProcessModule):
 
     def command_add_item(self, event, item, key):
 
-        event.get(key).append(item)
+        event.set(event.get(key) + [item], key)
         return event
 
     def command_copy(self, event, source, destination, default_value):
@@ -227,7 +227,9 @@ class Modify(ProcessModule):
 
     def command_del_item(self, event, item, key):
 
-        event.get(key).remove(item)
+        lst = list(event.get(key))
+        lst.remove(item)
+        event.set(lst, key)
 
         return event
 
@@ -61,7 +61,7 @@ class Bucket(object):
             self._timer -= 1
             if self._timer == 0:
                 if len(self.bucket.data) > 0:
-                    self.logging.debug("Bucket age expired after %s s." % (self.age))
+                    self.logging.debug("Bucket age expired after %s s.", self.age)
                     self.flush()
                 else:
                     self.resetTimer()
@@ -70,7 +70,7 @@ class Bucket(object):
         '''
         Flushes the buffer.
         '''
-        self.logging.debug("Flushed bucket '%s' of size '%s'" % (self.key, len(self.bucket.data)))
+        self.logging.debug("Flushed bucket '%s' of size '%s'", self.key, len(self.bucket.data))
         self.queue.put(self.bucket)
         self.createEmptyBucket()
 
@@ -139,7 +139,7 @@ class Pack(ProcessModule):
         try:
             self.getBucket(self.kwargs.aggregation_key).bucket.appendBulk(event)
         except BulkFull:
-            self.logging.debug("Bucket full after %s events." % (self.kwargs.bucket_size))
+            self.logging.debug("Bucket full after %s events.", self.kwargs.bucket_size)
             self.getBucket(self.kwargs.aggregation_key).flush()
             self.getBucket(self.kwargs.aggregation_key).bucket.appendBulk(event)
 
@@ -25,6 +25,7 @@
 
 from wishbone.module import ProcessModule
 from wishbone.utils.structured_data_file import StructuredDataFile
+from wishbone.utils.ruleindex import RuleIndex
 from wishbone.error import InvalidData
 
 
@@ -57,9 +58,37 @@ class QueueSelect(ProcessModule):
         }
 
 
+    Instead of a template, rules can be expressed declaratively using the
+    <rules> parameter.  Declarative rules are compiled into an index which
+    only evaluates the rules relevant to the event so their cost does not
+    grow with the number of rules:
+
+    ::
+
+        { "name": "name of the rule",
+          "match": {
+              "data.env": "production",
+              "data.region": {"in": ["eu", "us"]},
+              "data.host": {"regex": "^web"},
+              "data.level": {"gte": 3, "lt": 6}
+          },
+          "queue": "queue_1,queue_one",
+          "payload": {
+            "queue_1": {
+                "detail_1": "some value"
+            }
+          }
+        }
+
+    All conditions have to match.  A plain value is shorthand for
+    ``{"equals": value}``.  The supported operators are ``equals``, ``in``,
+    ``regex``, ``gt``, ``gte``, ``lt`` and ``lte``.  When no Jinja2 templates
+    are defined, events not matching any rule are submitted to <nomatch>.
+
     The <file> queue expects events containing the absolute path of a YAML
     file to read (or delete). Typically this queue receives events from
-    wishbone.module.input.inotify.
+    wishbone.module.input.inotify.  A file can contain a template or a
+    declarative rule.
 
     Events of type "IN_CREATE", "IN_CLOSE_WRITE", "IN_DELETE", "WISHBONE_INIT"
     are processed all others are ignored.
@@ -70,6 +99,10 @@ class QueueSelect(ProcessModule):
         - templates(list)([])*
            |  A list consisting out of template dicts as explained above.
 
+        - rules(list)([])
+           |  A list consisting out of declarative rule dicts as explained
+           |  above.
+
         - log_matching(bool)(False)
            |  Whether to produce debug log messages for matches.
            | Can be verbose hence it's configurable.
@@ -98,7 +131,7 @@ class QueueSelect(ProcessModule):
         "WISHBONE_INIT"
     ]
 
-    def __init__(self, actor_config, templates=[], log_matching=False):
+    def __init__(self, actor_config, templates=[], rules=[], log_matching=False):
         ProcessModule.__init__(self, actor_config)
 
         self.pool.createQueue("inbox")
@@ -114,8 +147,25 @@ class QueueSelect(ProcessModule):
             expect_yaml=True
         )
 
+        self.rules = RuleIndex(self.kwargs.rules)
+        self.file_rules = RuleIndex()
+        self.file_templates = {}
+
     def consume(self, event):
 
+        matched = False
+        for index in (self.rules, self.file_rules):
+            for rule in index.match(event):
+                matched = True
+                self.handleQueueSelect(
+                    template_name=rule.get("name"),
+                    queue_list=rule["queue"],
+                    payload=rule.get("payload", {}),
+                    event=event)
+
+        if not matched and len(event.kwargs.templates) == 0 and len(self.file_templates) == 0:
+            self.submit(event, "nomatch")
+
         for template in event.kwargs.templates:
             self.handleQueueSelect(
                 template_name=template.name,
@@ -123,7 +173,7 @@ class QueueSelect(ProcessModule):
                 payload=template.get("payload", {}),
                 event=event)
 
-        for file_name, file_content in self.template_loader.dump().items():
+        for file_name, file_content in self.file_templates.items():
             try:
                 queue_name = event.render(file_content["queue"])
             except InvalidData as err:
@@ -143,11 +193,7 @@ class QueueSelect(ProcessModule):
             if self.pool.hasQueue(queue_name):
 
                 if self.kwargs.log_matching:
-                    self.logging.debug("Template '{template_name}' selected queue '{queue_name}' to route event '{event_id}' to.".format(
-                        template_name=template_name,
-                        queue_name=queue_name,
-                        event_id=event.get('uuid')
-                    ))
+                    self.logging.debug("Template '%s' selected queue '%s' to route event '%s' to.", template_name, queue_name, event.get('uuid'))
 
                 # Construct and set the payload
                 queue_payload = {
@@ -163,11 +209,7 @@ class QueueSelect(ProcessModule):
 
             else:
                 if self.kwargs.log_matching:
-                    self.logging.debug("Template '{template_name}' selected non-existing queue '{queue_name}' to route event '{event_id}' to.".format(
-                        template_name=template_name,
-                        queue_name=queue_name,
-                        event_id=event.get('uuid')
-                    ))
+                    self.logging.debug("Template '%s' selected non-existing queue '%s' to route event '%s' to.", template_name, queue_name, event.get('uuid'))
                 self.submit(event, "nomatch")
 
     def handleFileTemplate(self, event):
@@ -183,7 +225,28 @@ class QueueSelect(ProcessModule):
             else:
                 self.template_loader.load(path)
                 self.logging.debug("Loaded template file '{path}'".format(path=path))
+            self.compileFileRules()
         else:
             self.logging.warning("No support for inotify type '{inotify_type}'. Dropped.".format(
                 inotify_type=inotify_type
             ))
+
+    def compileFileRules(self):
+        '''Splits the loaded files in declarative rules and templates.'''
+
+        rules = []
+        templates = {}
+        for file_name, file_content in self.template_loader.dump().items():
+            if "match" in file_content:
+                rule = dict(file_content, name=file_name)
+                try:
+                    RuleIndex([rule])
+                except InvalidData as err:
+                    self.logging.error("Skipped invalid rule file '%s'. Reason: %s" % (file_name, err))
+                else:
+                    rules.append(rule)
+            else:
+                templates[file_name] = file_content
+
+        self.file_rules = RuleIndex(rules)
+        self.file_templates = templates
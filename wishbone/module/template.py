@@ -25,6 +25,8 @@
 
 from jinja2 import Environment, FileSystemLoader
 from wishbone.module import ProcessModule
+from wishbone.templatecache import TEMPLATE_CACHE
+from wishbone.event import renderTemplate
 from os.path import isabs
 
 
@@ -82,7 +84,7 @@ class Template(ProcessModule):
         if event.kwargs.filename is not None:
 
             if isabs(event.kwargs.filename):
-                data = self.renderFile(event.kwargs.filename, event.dump())
+                data = self.renderFile(event.kwargs.filename, event.getView())
                 event.set(data, event.kwargs.destination)
             else:
                 self.logging.error("%s is not an absolute path. Skipped" % (event.kwargs.filename))
@@ -91,5 +93,4 @@ class Template(ProcessModule):
 
     def renderFile(self, filename, data):
 
-        # TODO(smetj): calling thie private function is ugly, rewrite this part.
-        return self._Actor__renderKwargs.env_template.get_template(filename).render(data)
+        return renderTemplate(TEMPLATE_CACHE.getFile(self.env_template, filename), data)
@@ -66,8 +66,8 @@ class Unpack(ProcessModule):
                 try:
                     self.submit(Event().slurp(e), "outbox")
                 except InvalidData:
-                    self.logging.debug("Bulk event with id '%s' contained an invalid event. Invalid event skipped." % (event.get('uuid')))
-            self.logging.debug("Expanded Bulk event into %s events." % (len(event.data)))
+                    self.logging.debug("Bulk event with id '%s' contained an invalid event. Invalid event skipped.", event.get('uuid'))
+            self.logging.debug("Expanded Bulk event into %s events.", len(event.data))
         else:
-            self.logging.debug("Event with id '%s' is not a bulk event. Dropped.")
+            self.logging.debug("Event with id '%s' is not a bulk event. Dropped.", event.get('uuid'))
             self.submit(event, "dropped")
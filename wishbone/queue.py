@@ -23,16 +23,379 @@
 #
 
 from uuid import uuid4
+from collections import deque
 from gevent.queue import Queue as Gevent_Queue
-from wishbone.error import ReservedName, QueueMissing, QueueFull, QueueEmpty
-from time import time
+from gevent.event import Event
+from gevent.lock import Semaphore
+from wishbone.error import ReservedName, QueueMissing, QueueFull, QueueEmpty, InvalidConfig, InvalidData
+from time import time, monotonic
+from random import random
 from gevent.queue import Empty, Full
 from gevent import sleep
 from types import SimpleNamespace
+from wishbone.spill import SpillBuffer, SEGMENT_SIZE, MAX_DISK
+from wishbone.wal import DurableBuffer, COMMIT_SIZE, COMMIT_INTERVAL, MAX_LOG_SIZE
+from wishbone.utils.histogram import Histogram
+
+
+OVERFLOW_POLICIES = ["block", "drop-newest", "drop-oldest", "sample"]
+STARVATION_LIMIT = 100
+LATENCY_SAMPLE_RATE = 0.01
+
+
+class ByteBudget(object):
+
+    '''
+    Keeps track of the estimated bytes of the events stored in one or more
+    queues.
+
+    A budget without any bytes in use always accepts an event so an event
+    larger than the budget can't block a queue forever.
+
+    Args:
+        max_bytes (int): The maximum number of bytes.  None is unlimited.
+    '''
+
+    def __init__(self, max_bytes=None):
+
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.__released = Event()
+
+    def acquire(self, size):
+
+        self.bytes += size
+
+    def fits(self, size):
+        '''Returns True when ``size`` bytes fit in the budget.'''
+
+        return self.max_bytes is None or self.bytes == 0 or self.bytes + size <= self.max_bytes
+
+    def release(self, size):
+
+        self.bytes -= size
+        self.__released.set()
+
+    def wait(self, timeout=None):
+        '''
+        Blocks until bytes are released or ``timeout`` expires.
+
+        Returns:
+            bool: False when ``timeout`` expired.
+        '''
+
+        self.__released.clear()
+        return self.__released.wait(timeout)
+
+
+class BoundedBuffer(object):
+
+    '''
+    Wraps a queue buffer and only accepts events as long as their estimated
+    size, see ``wishbone.event.Event.getSize()``, fits in the queue's own
+    budget and the optional budget shared by all queues of a QueuePool.
+
+    The accounted size is kept in the tracking state of each event so the
+    right amount is released regardless of the order in which the wrapped
+    buffer returns its events.
+
+    It offers the subset of the ``gevent.queue.Queue`` interface used by
+    ``wishbone.queue.Queue``.
+
+    Args:
+        buffer (gevent.queue.Queue): The buffer to wrap.
+        budget (ByteBudget): The budget of the queue.
+        pool_budget (ByteBudget): The budget shared by the queues of a QueuePool.
+    '''
+
+    def __init__(self, buffer, budget, pool_budget=None):
+
+        self.buffer = buffer
+        self.budget = budget
+        self.budgets = [budget] if pool_budget is None else [budget, pool_budget]
+        self.key = uuid4().hex
+        self.bytes = 0
+
+    def close(self):
+        '''
+        Releases the bytes of all stored events.
+        '''
+
+        for budget in self.budgets:
+            budget.release(self.bytes)
+        self.bytes = 0
+
+    def empty(self):
+
+        return self.buffer.empty()
+
+    def evict(self):
+
+        return self.__release(getattr(self.buffer, "evict", self.buffer.get_nowait)())
+
+    def get(self, block=True, timeout=None):
+
+        return self.__release(self.buffer.get(block=block, timeout=timeout))
+
+    def get_nowait(self):
+
+        return self.get(block=False)
+
+    def put(self, element, block=True, timeout=None):
+
+        size = element.getSize()
+        if timeout is not None:
+            deadline = time() + timeout
+        while True:
+            for budget in self.budgets:
+                if not budget.fits(size):
+                    break
+            else:
+                self.__track(element, size)
+                try:
+                    self.buffer.put(element, block=block, timeout=None if timeout is None else max(0, deadline - time()))
+                except BaseException:
+                    del(element.tracking[self.key])
+                    raise
+                self.__accept(size)
+                return
+            if not block:
+                raise Full
+            if not budget.wait(None if timeout is None else max(0, deadline - time())):
+                raise Full
+
+    def put_nowait(self, element):
+
+        size = element.getSize()
+        for budget in self.budgets:
+            if not budget.fits(size):
+                raise Full
+        self.__track(element, size)
+        try:
+            self.buffer.put_nowait(element)
+        except BaseException:
+            del(element.tracking[self.key])
+            raise
+        self.__accept(size)
+
+    def qsize(self):
+
+        return self.buffer.qsize()
+
+    def __accept(self, size):
+
+        self.bytes += size
+        for budget in self.budgets:
+            budget.acquire(size)
+
+    def __release(self, element):
+
+        size = element.tracking.pop(self.key)
+        self.bytes -= size
+        for budget in self.budgets:
+            budget.release(size)
+        return element
+
+    def __track(self, element, size):
+
+        if element.tracking is None:
+            element.tracking = {}
+        element.tracking[self.key] = size
+
+
+class LaneBuffer(object):
+
+    '''
+    A buffer with a FIFO lane per priority level.
+
+    The lane of an event is defined by the ``priority`` field of the event.
+    Events without ``priority`` go into lane 0 while priorities higher than
+    the number of lanes go into the highest lane.
+
+    Higher lanes are always drained first.  To prevent starvation, one event
+    of the next non-empty lower lane is returned after ``starvation_limit``
+    consecutive events from higher lanes while lower lanes were waiting.
+    ``evict()`` removes the oldest event of the lowest non-empty lane.
+
+    It offers the subset of the ``gevent.queue.Queue`` interface used by
+    ``wishbone.queue.Queue``.
+
+    Args:
+        max_size (int): The max number of elements in all lanes together.
+        lanes (int): The number of lanes.
+        starvation_limit (int): The max number of consecutive events served
+                                from higher lanes while lower lanes wait.
+    '''
+
+    def __init__(self, max_size, lanes=2, starvation_limit=STARVATION_LIMIT):
+
+        self.lanes = [deque() for _ in range(lanes)]
+        self.starvation_limit = starvation_limit
+        self.__streak = 0
+        self.__slots = Semaphore(max_size)
+        self.__items = Semaphore(0)
+
+    def empty(self):
+
+        return self.qsize() == 0
+
+    def evict(self):
+
+        if not self.__items.acquire(False):
+            raise Empty
+
+        for lane in self.lanes:
+            if lane:
+                element = lane.popleft()
+                break
+        self.__slots.release()
+        return element
+
+    def get(self, block=True, timeout=None):
+
+        if not self.__items.acquire(block, timeout):
+            raise Empty
+
+        for lane in range(len(self.lanes) - 1, -1, -1):
+            if self.lanes[lane]:
+                break
+        waiting = [lower for lower in range(lane - 1, -1, -1) if self.lanes[lower]]
+        if not waiting:
+            self.__streak = 0
+        elif self.__streak >= self.starvation_limit:
+            lane = waiting[0]
+            self.__streak = 0
+        else:
+            self.__streak += 1
+
+        element = self.lanes[lane].popleft()
+        self.__slots.release()
+        return element
+
+    def get_nowait(self):
+
+        return self.get(block=False)
+
+    def put(self, element, block=True, timeout=None):
+
+        if not self.__slots.acquire(block, timeout):
+            raise Full
+        self.lanes[self.__lane(element)].append(element)
+        self.__items.release()
+
+    def put_nowait(self, element):
+
+        self.put(element, block=False)
+
+    def qsize(self):
+
+        return sum(len(lane) for lane in self.lanes)
+
+    def __lane(self, element):
+
+        extra = element.data.extra
+        if not extra:
+            return 0
+        try:
+            return max(0, min(int(extra.get("priority", 0)), len(self.lanes) - 1))
+        except (TypeError, ValueError):
+            return 0
+
+
+class TimedBuffer(object):
+
+    '''
+    Wraps a queue buffer and records the time a sample of the events spend
+    in the buffer into a histogram.
+
+    The enqueue time is kept in the tracking state of the sampled events so
+    it survives the wrapped buffer spilling them to disk.
+
+    It offers the subset of the ``gevent.queue.Queue`` interface used by
+    ``wishbone.queue.Queue``.
+
+    Args:
+        buffer (gevent.queue.Queue): The buffer to wrap.
+        histogram (wishbone.utils.histogram.Histogram): The histogram to record into.
+        sample_rate (float): The fraction of events to time.
+    '''
+
+    def __init__(self, buffer, histogram, sample_rate=LATENCY_SAMPLE_RATE):
+
+        self.buffer = buffer
+        self.histogram = histogram
+        self.every = max(1, int(round(1 / sample_rate)))
+        self.key = uuid4().hex
+        self.__counter = 0
+
+    def empty(self):
+
+        return self.buffer.empty()
+
+    def evict(self):
+
+        element = getattr(self.buffer, "evict", self.buffer.get_nowait)()
+        if element.tracking:
+            element.tracking.pop(self.key, None)
+        return element
+
+    def get(self, block=True, timeout=None):
+
+        element = self.buffer.get(block=block, timeout=timeout)
+        if element.tracking:
+            stamp = element.tracking.pop(self.key, None)
+            if stamp is not None:
+                self.histogram.record(monotonic() - stamp)
+        return element
+
+    def get_nowait(self):
+
+        return self.get(block=False)
+
+    def put(self, element, block=True, timeout=None):
+
+        stamped = self.__stamp(element)
+        try:
+            self.buffer.put(element, block=block, timeout=timeout)
+        except BaseException:
+            if stamped:
+                del(element.tracking[self.key])
+            raise
+
+    def put_nowait(self, element):
+
+        self.put(element, block=False)
+
+    def qsize(self):
+
+        return self.buffer.qsize()
+
+    def __stamp(self, element):
+
+        self.__counter += 1
+        if self.__counter >= self.every:
+            self.__counter = 0
+            if element.tracking is None:
+                element.tracking = {}
+            element.tracking[self.key] = monotonic()
+            return True
+        return False
 
 
 class QueuePool():
 
+    '''
+    The queues of an actor.
+
+    Args:
+        size (int): The max number of events of each queue.
+        queue_max_bytes (int): The max estimated bytes of the events in each
+                               queue.  None is unlimited.
+        max_bytes (int): The max estimated bytes of the events in all queues
+                         of the pool.  None is unlimited.
+        sizes (dict): The size of individual queues overriding ``size``.
+    '''
+
     RESERVED_QUEUES = [
         '_failed',
         '_success',
@@ -40,13 +403,16 @@ class QueuePool():
         '_metrics'
     ]
 
-    def __init__(self, size):
+    def __init__(self, size, queue_max_bytes=None, max_bytes=None, sizes={}):
         self.__size = size
+        self.__sizes = sizes
+        self.__queue_max_bytes = queue_max_bytes
+        self.budget = None if max_bytes is None else ByteBudget(max_bytes)
         self.queue = SimpleNamespace()
-        self.queue._metrics = Queue(size)
-        self.queue._logs = Queue(size)
-        self.queue._success = Queue(size)
-        self.queue._failed = Queue(size)
+        self.queue._metrics = self.__newQueue("_metrics")
+        self.queue._logs = self.__newQueue("_logs")
+        self.queue._success = self.__newQueue("_success")
+        self.queue._failed = self.__newQueue("_failed")
 
     def listQueues(self, names=False, default=True):
         '''returns the list of queue names from the queuepool.
@@ -64,13 +430,20 @@ class QueuePool():
                 else:
                     yield m
 
-    def createQueue(self, name):
-        '''Creates a Queue.'''
+    def createQueue(self, name, size=None):
+        '''Creates a Queue.
+
+        Args:
+            name (str): The name of the queue.
+            size (int): The size of the queue.  When None, the size defined
+                        for ``name`` by the pool or else the pool's default
+                        size is used.
+        '''
 
         if name in self.RESERVED_QUEUES or name.startswith("_"):
             raise ReservedName("%s is an invalid queue name." % (name))
 
-        setattr(self.queue, name, Queue(self.__size))
+        setattr(self.queue, name, self.__newQueue(name, size))
 
     def createSystemQueue(self, name):
         '''
@@ -85,7 +458,7 @@ class QueuePool():
             name (str): The name of the queue (should start with _)
         '''
 
-        setattr(self.queue, name, Queue(self.__size))
+        setattr(self.queue, name, self.__newQueue(name))
 
     def hasQueue(self, name):
         '''Returns <True> when queue with <name> exists.'''
@@ -114,6 +487,12 @@ class QueuePool():
                 if counter == 5:
                     break
 
+    def __newQueue(self, name, size=None):
+
+        if size is None:
+            size = self.__sizes.get(name, self.__size)
+        return Queue(size, max_bytes=self.__queue_max_bytes, budget=self.budget)
+
 
 class Queue():
 
@@ -124,6 +503,22 @@ class Queue():
         - max_size (int):   The max number of elements in the queue.
                             Default: 1
 
+        - overflow (str):   The overflow policy.
+                            Default: block
+
+        - sample_rate (float): The fraction of events accepted by the sample
+                               overflow policy.
+                               Default: 0.1
+
+        - max_bytes (int):  The max estimated bytes of the events in the queue.
+                            Default: None (unlimited)
+
+        - budget (ByteBudget): A byte budget shared with other queues.
+                               Default: None
+
+        - lanes (int):      The number of priority lanes.
+                            Default: 1
+
     When a queue is created, it will drop all messages. This is by design.
     When <disableFallThrough()> is called, the queue will keep submitted
     messages.  The motivation for this is that when is queue is not connected
@@ -133,26 +528,118 @@ class Queue():
     The <stats()> function will reveal whether any events have disappeared via
     this queue.
 
+    When the queue is full, <put()> and <putMany()> block until a consumer
+    frees a slot or the optional timeout expires in which case QueueFull is
+    raised.  The time producers spend blocked is exposed as backpressure in
+    <stats()>.
+
+    The overflow policy defines how a connected queue behaves when full:
+
+        - block:        The producer blocks until a slot is freed.
+        - drop-newest:  The submitted event is dropped.
+        - drop-oldest:  The oldest queued event is dropped to make room.
+        - sample:       Once the queue is half full, only <sample_rate> of the
+                        submitted events are accepted. When completely full
+                        the submitted event is dropped.
+
+    Each policy has its own drop counter in <stats()> on top of
+    <dropped_total>.
+
+    When the queue spills to disk or is durable, events which can't be
+    serialized by <Event.pack()> are dropped, counted as
+    <dropped_invalid_total> and InvalidData is raised to the producer.
+
+    When <max_bytes> or <budget> is defined the queue is also full once the
+    estimated size of the queued events exceeds the byte budget.  Byte usage
+    is exposed in <stats()>.
+
+    When the queue has more than 1 lane, events are stored in the lane
+    defined by their ``priority`` field and higher lanes are consumed first.
+    See <setLanes()>.
+
+    When <enableLatencyTracking()> is called, the time a sample of the events
+    spend in the queue is recorded and the p50, p90, p99 and max since the
+    previous call to <stats()> are included in <stats()>.
+
+    When <enableSpill()> is called, events exceeding <max_size> are spilled to
+    memory-mapped segment files on disk instead and are read back in order
+    once the consumer catches up.  The queue is then only full when the
+    configured disk budget is used.
+
+    When <enableDurability()> is called, accepted events are written to a
+    write-ahead log until the consumer acknowledges them using <ack()>.
+    Unacknowledged events are replayed when the queue is made durable again
+    after a restart.
+
     '''
 
-    def __init__(self, max_size=1):
+    def __init__(self, max_size=1, overflow="block", sample_rate=0.1, max_bytes=None, budget=None, lanes=1):
         self.max_size = max_size
+        self.lanes = lanes
+        self.starvation_limit = STARVATION_LIMIT
+        self.max_bytes = max_bytes
         self.id = str(uuid4())
-        self.__q = Gevent_Queue(max_size)
         self.__in = 0
         self.__out = 0
         self.__dropped = 0
+        self.__dropped_newest = 0
+        self.__dropped_oldest = 0
+        self.__dropped_sampled = 0
+        self.__dropped_invalid = 0
+        self.__backpressure = 0
         self.__cache = {}
+        self.__fall_through = True
+        self.__spill = None
+        self.__spill_buffer = None
+        self.__durable = None
+        self.__pool_budget = budget
+        self.__budget = None if max_bytes is None and budget is None else ByteBudget(max_bytes)
+        self.__bounded = None
+        self.__histogram = None
+        self.__latency_sample_rate = LATENCY_SAMPLE_RATE
+        self.__q = self.__buffer()
 
         self.put = self.__fallThrough
+        self.putMany = self.__fallThroughMany
+        self.setOverflow(overflow, sample_rate)
+
+    def ack(self, element):
+        '''Acknowledges the consumer is done with <element>.
+
+        Only has an effect when the queue is durable.
+        '''
+
+        pass
 
     def clean(self):
         '''Deletes the content of the queue.
         '''
-        self.__q = Gevent_Queue(self.max_size)
+
+        if self.__durable is not None:
+            self.__q.close(delete=True)
+        if self.__bounded is not None:
+            self.__bounded.close()
+        if self.__spill_buffer is not None:
+            self.__spill_buffer.close()
+        self.__q = self.__buffer()
+        if self.__durable is not None:
+            self.__q = DurableBuffer(self.__q, **self.__durable)
+            self.ack = self.__q.ack
 
     def disableFallThrough(self):
-        self.put = self.__put
+        self.__fall_through = False
+        if self.overflow == "block":
+            self.put = self.__put
+            self.putMany = self.__putMany
+        elif self.overflow == "drop-newest":
+            self.put = self.__putDropNewest
+            self.putMany = self.__putManyOverflow
+        elif self.overflow == "drop-oldest":
+            self.put = self.__putDropOldest
+            self.putMany = self.__putManyOverflow
+        else:
+            self.put = self.__putSample
+            self.putMany = self.__putManyOverflow
 
     def dump(self):
         '''Dumps the queue as a generator and cleans it when done.
@@ -170,7 +657,89 @@ class Queue():
         return self.__q.empty()
 
     def enableFallthrough(self):
+        self.__fall_through = True
         self.put = self.__fallThrough
+        self.putMany = self.__fallThroughMany
+
+    def enableDurability(self, path, commit_size=COMMIT_SIZE, commit_interval=COMMIT_INTERVAL, max_log_size=MAX_LOG_SIZE):
+        '''
+        Records accepted events in the write-ahead log ``path`` until they
+        are acknowledged using <ack()>.  The unacknowledged events of an
+        existing log are replayed into the queue.
+
+        Args:
+            path (str): The filename of the write-ahead log.
+            commit_size (int): The number of events covered by one fsync.
+                               1 disables group commit.
+            commit_interval (float): The maximum number of seconds an event
+                                     remains uncommitted.
+            max_log_size (int): The log size in bytes after which the log is
+                                compacted.
+        '''
+
+        self.__durable = {
+            "path": path,
+            "commit_size": commit_size,
+            "commit_interval": commit_interval,
+            "max_log_size": max_log_size
+        }
+        self.__q = DurableBuffer(self.__q, **self.__durable)
+        self.ack = self.__q.ack
+
+    def enableLatencyTracking(self, sample_rate=LATENCY_SAMPLE_RATE):
+        '''
+        Records the time a sample of the events spend in the queue.
+
+        Args:
+            sample_rate (float): The fraction of events to time.
+
+        Raises:
+            InvalidConfig: The sample rate is invalid.
+        '''
+
+        if not 0 < sample_rate <= 1:
+            raise InvalidConfig("Latency sample rate '%s' should be higher than 0 and max 1." % (sample_rate))
+
+        self.__latency_sample_rate = sample_rate
+        if self.__histogram is None:
+            self.__histogram = Histogram()
+            if self.__durable is None:
+                self.__q = TimedBuffer(self.__q, self.__histogram, sample_rate)
+            else:
+                self.__q.buffer = TimedBuffer(self.__q.buffer, self.__histogram, sample_rate)
+
+    def enableSpill(self, directory, segment_size=SEGMENT_SIZE, max_disk=MAX_DISK, fsync="segment"):
+        '''
+        Spills the events exceeding <max_size> to memory-mapped segment files
+        in ``directory``.  Queued events are retained.
+
+        Args:
+            directory (str): The directory to store the segment files in.  Any
+                             existing content is removed.
+            segment_size (int): The size of a segment file in bytes.
+            max_disk (int): The maximum number of bytes used on disk.
+            fsync (str): One of never, segment or always.
+
+        Raises:
+            InvalidConfig: The fsync policy is invalid, the queue is already
+                           durable or has priority lanes.
+        '''
+
+        if self.__durable is not None:
+            raise InvalidConfig("Spilling should be enabled before durability.")
+        if self.lanes > 1:
+            raise InvalidConfig("Spilling is not supported by queues with priority lanes.")
+
+        self.__spill = {
+            "directory": directory,
+            "segment_size": segment_size,
+            "max_disk": max_disk,
+            "fsync": fsync
+        }
+        queue = self.__q
+        self.__q = self.__buffer()
+        while not queue.empty():
+            self.__q.put_nowait(queue.get_nowait())
 
     def get(self, block=True):
         '''Gets an element from the queue.'''
@@ -182,10 +751,92 @@ class Queue():
         self.__out += 1
         return e
 
+    def getMany(self, max_items, timeout=None):
+        '''
+        Gets up to ``max_items`` elements from the queue.
+
+        Blocks until at least one element is available and then drains the
+        queue without blocking any further.
+
+        Args:
+            max_items (int): The maximum number of elements to return.
+            timeout (float): The maximum time in seconds to wait for the first
+                element.  None waits forever.
+
+        Returns:
+            list: The elements.
+
+        Raises:
+            QueueEmpty: No element became available within ``timeout``.
+        '''
+
+        try:
+            elements = [self.__q.get(timeout=timeout)]
+        except Empty:
+            raise QueueEmpty("Queue is empty.")
+
+        while len(elements) < max_items:
+            try:
+                elements.append(self.__q.get_nowait())
+            except Empty:
+                break
+
+        self.__out += len(elements)
+        return elements
+
     def rescue(self, element):
 
         self.__q.put(element)
 
+    def setLanes(self, lanes, starvation_limit=STARVATION_LIMIT):
+        '''
+        Sets the number of priority lanes of the queue.  Queued events are
+        retained.
+
+        Args:
+            lanes (int): The number of lanes.  1 disables priority lanes.
+            starvation_limit (int): The max number of consecutive events
+                                    consumed from higher lanes while lower
+                                    lanes wait.
+
+        Raises:
+            InvalidConfig: The queue spills to disk or is durable.
+        '''
+
+        if lanes < 1:
+            raise InvalidConfig("A queue requires at least 1 lane.")
+        if self.__spill is not None or self.__durable is not None:
+            raise InvalidConfig("Priority lanes should be set before spilling or durability.")
+
+        self.lanes = lanes
+        self.starvation_limit = starvation_limit
+        queue = self.__q
+        self.__q = self.__buffer()
+        while not queue.empty():
+            self.__q.put_nowait(queue.get_nowait())
+
+    def setOverflow(self, policy="block", sample_rate=0.1):
+        '''
+        Sets the overflow policy of the queue.
+
+        Args:
+            policy (str): One of block, drop-newest, drop-oldest or sample.
+            sample_rate (float): The fraction of events accepted by the sample policy.
+
+        Raises:
+            InvalidConfig: The policy or sample rate is invalid.
+        '''
+
+        if policy not in OVERFLOW_POLICIES:
+            raise InvalidConfig("Overflow policy '%s' is invalid. Choose from %s." % (policy, ", ".join(OVERFLOW_POLICIES)))
+        if not 0 <= sample_rate <= 1:
+            raise InvalidConfig("Sample rate '%s' should be between 0 and 1." % (sample_rate))
+
+        self.overflow = policy
+        self.sample_rate = sample_rate
+        if not self.__fall_through:
+            self.disableFallThrough()
+
     def size(self):
         '''Returns the length of the queue.'''
 
@@ -194,29 +845,165 @@ class Queue():
     def stats(self):
         '''Returns statistics of the queue.'''
 
-        return {"size": self.__q.qsize(),
-                "in_total": self.__in,
-                "out_total": self.__out,
-                "in_rate": self.__rate("in_rate", self.__in),
-                "out_rate": self.__rate("out_rate", self.__out),
-                "dropped_total": self.__dropped,
-                "dropped_rate": self.__rate("dropped_rate", self.__dropped)
-                }
+        stats = {"size": self.__q.qsize(),
+                 "in_total": self.__in,
+                 "out_total": self.__out,
+                 "in_rate": self.__rate("in_rate", self.__in),
+                 "out_rate": self.__rate("out_rate", self.__out),
+                 "dropped_total": self.__dropped,
+                 "dropped_rate": self.__rate("dropped_rate", self.__dropped),
+                 "dropped_newest_total": self.__dropped_newest,
+                 "dropped_oldest_total": self.__dropped_oldest,
+                 "dropped_sampled_total": self.__dropped_sampled,
+                 "dropped_invalid_total": self.__dropped_invalid,
+                 "backpressure_time": self.__backpressure,
+                 "backpressure_rate": self.__rate("backpressure_rate", self.__backpressure)
+                 }
+
+        if self.__budget is not None:
+            stats["bytes"] = self.__budget.bytes
+
+        if self.__histogram is not None:
+            for name, value in self.__histogram.summary().items():
+                stats["latency_%s" % (name)] = value
+            self.__histogram.reset()
+
+        if self.__spill_buffer is not None:
+            spill = self.__spill_buffer
+            stats["spilled_total"] = spill.spilled
+            stats["spilled_rate"] = self.__rate("spilled_rate", spill.spilled)
+            stats["unspilled_total"] = spill.unspilled
+            stats["unspilled_rate"] = self.__rate("unspilled_rate", spill.unspilled)
+            stats["spill_disk_bytes"] = spill.disk_bytes
+
+        if self.__durable is not None:
+            stats["wal_pending"] = self.__q.pending()
+            stats["wal_replayed_total"] = self.__q.replayed
+            stats["wal_commits_total"] = self.__q.commits
+            stats["wal_commits_rate"] = self.__rate("wal_commits_rate", self.__q.commits)
+            stats["wal_log_bytes"] = self.__q.log_bytes
+
+        return stats
+
+    def __buffer(self):
+        '''Returns a new empty buffer to store the queued elements.'''
+
+        if self.lanes > 1:
+            buffer = LaneBuffer(self.max_size, self.lanes, self.starvation_limit)
+        elif self.__spill is None:
+            buffer = Gevent_Queue(self.max_size)
+        else:
+            buffer = self.__spill_buffer = SpillBuffer(self.max_size, **self.__spill)
+        if self.__budget is not None:
+            buffer = self.__bounded = BoundedBuffer(buffer, self.__budget, self.__pool_budget)
+        if self.__histogram is not None:
+            buffer = TimedBuffer(buffer, self.__histogram, self.__latency_sample_rate)
+        return buffer
+
+    def __dropInvalid(self):
+        '''Counts an element which can't be serialized as dropped.'''
+
+        self.__dropped += 1
+        self.__dropped_invalid += 1
 
-    def __fallThrough(self, element):
+    def __fallThrough(self, element, timeout=None):
         '''Accepts an element but discards it'''
 
         self.__dropped += 1
         del(element)
 
-    def __put(self, element):
+    def __fallThroughMany(self, elements, timeout=None):
+        '''Accepts elements but discards them'''
+
+        self.__dropped += len(elements)
+
+    def __put(self, element, timeout=None):
         '''Puts element in queue.'''
 
         try:
-            self.__q.put(element)
+            self.__q.put_nowait(element)
+        except Full:
+            self.__wait(element, timeout)
+        except InvalidData:
+            self.__dropInvalid()
+            raise
+        self.__in += 1
+
+    def __putMany(self, elements, timeout=None):
+        '''Puts elements in queue.'''
+
+        count = 0
+        try:
+            for element in elements:
+                try:
+                    self.__q.put_nowait(element)
+                except Full:
+                    self.__wait(element, timeout)
+                except InvalidData:
+                    self.__dropInvalid()
+                    raise
+                count += 1
+        finally:
+            self.__in += count
+
+    def __putDropNewest(self, element, timeout=None):
+        '''Puts element in queue or drops it when the queue is full.'''
+
+        try:
+            self.__q.put_nowait(element)
             self.__in += 1
         except Full:
-            raise QueueFull("Queue full.")
+            self.__dropped += 1
+            self.__dropped_newest += 1
+        except InvalidData:
+            self.__dropInvalid()
+            raise
+
+    def __putDropOldest(self, element, timeout=None):
+        '''Puts element in queue and drops the oldest element when the queue is full.
+
+        When the queue is empty but still full because a byte budget shared
+        with other queues is used up, element itself is dropped.
+        '''
+
+        while True:
+            try:
+                self.__q.put_nowait(element)
+                break
+            except Full:
+                self.__dropped += 1
+                self.__dropped_oldest += 1
+                try:
+                    self.ack(getattr(self.__q, "evict", self.__q.get_nowait)())
+                except Empty:
+                    return
+            except InvalidData:
+                self.__dropInvalid()
+                raise
+        self.__in += 1
+
+    def __putSample(self, element, timeout=None):
+        '''Puts a sample of the elements in queue once the queue is half full.'''
+
+        if self.__q.qsize() * 2 >= self.max_size and random() >= self.sample_rate:
+            self.__dropped += 1
+            self.__dropped_sampled += 1
+        else:
+            try:
+                self.__q.put_nowait(element)
+                self.__in += 1
+            except Full:
+                self.__dropped += 1
+                self.__dropped_sampled += 1
+            except InvalidData:
+                self.__dropInvalid()
+                raise
+
+    def __putManyOverflow(self, elements, timeout=None):
+        '''Puts elements in queue applying the overflow policy.'''
+
+        for element in elements:
+            self.put(element)
 
     def __rate(self, name, value):
 
@@ -232,3 +1019,17 @@ class Queue():
             self.__cache[name]["rate"] = (amount_now - amount_then) / (time_now - time_then)
 
         return self.__cache[name]["rate"]
+
+    def __wait(self, element, timeout):
+        '''Blocks until element is accepted by the queue or timeout expires.'''
+
+        start = time()
+        try:
+            self.__q.put(element, timeout=timeout)
+        except Full:
+            raise QueueFull("Queue full.")
+        except InvalidData:
+            self.__dropInvalid()
+            raise
+        finally:
+            self.__backpressure += time() - start
@@ -23,14 +23,20 @@
 #
 
 from wishbone.actorconfig import ActorConfig
-from wishbone.error import ModuleInitFailure, NoSuchModule
+from wishbone.actor import createTemplateEnvironment
+from wishbone.error import ModuleInitFailure, NoSuchModule, InvalidConfig
 from wishbone.error import QueueConnected
 from wishbone.componentmanager import ComponentManager
+from wishbone.templatecache import TEMPLATE_CACHE
+from wishbone.metrics import MetricRegistry, MetricServer, snapshotEvent
+from wishbone.queue import STARVATION_LIMIT
 from gevent import event, sleep, spawn
+from tempfile import gettempdir
 from gevent import pywsgi
 from .graphcontent import GRAPHCONTENT
 from .graphcontent import VisJSData
 from types import SimpleNamespace
+import os
 from wishbone.utils import GetProtocolHandler
 
 
@@ -82,9 +88,20 @@ class Default(object):
         size (int): The size of all queues.
         frequency (int)(1): The frequency at which metrics are produced.
         identification (wishbone): A string identifying this instance in logging.
+        template_cache_dir (str): The directory to persist compiled templates in.
+        queue_max_bytes (int): The maximum estimated bytes of the events in each queue.
+        pool_max_bytes (int): The maximum estimated bytes of the events in all queues of a module.
+        latency_sample_rate (float): The fraction of events timed by each connected queue.
+                                     None disables latency tracking.
+        loglevel (int): The highest log priority the modules generate messages for.
+        metrics_address (str): ``<host>:<port>`` or the path of a unix socket on which
+                               the latest metric snapshot is served as JSON.
+                               None disables it.
+        instrument (bool): Records the service times of all modules in histograms.
     '''
 
-    def __init__(self, config=None, size=100, frequency=10, identification="wishbone", graph=False, graph_include_sys=False):
+    def __init__(self, config=None, size=100, frequency=10, identification="wishbone", graph=False, graph_include_sys=False, template_cache_dir=None,
+                 queue_max_bytes=None, pool_max_bytes=None, latency_sample_rate=None, loglevel=7, metrics_address=None, instrument=False):
 
         self.component_manager = ComponentManager()
         self.config = config
@@ -93,6 +110,16 @@ class Default(object):
         self.identification = identification
         self.graph = graph
         self.graph_include_sys = graph_include_sys
+        self.template_cache_dir = template_cache_dir
+        self.queue_max_bytes = queue_max_bytes
+        self.pool_max_bytes = pool_max_bytes
+        self.latency_sample_rate = latency_sample_rate
+        self.loglevel = loglevel
+        self.metrics_address = metrics_address
+        self.instrument = instrument
+        self.metrics = MetricRegistry()
+        self.metrics.register("wishbone.template_cache", TEMPLATE_CACHE.stats)
+        self.metrics_server = None
 
         self.module_pool = ModulePool()
         self.__block = event.Event()
@@ -106,7 +133,7 @@ class Default(object):
 
         self.__block.wait()
 
-    def connectQueue(self, source, destination):
+    def connectQueue(self, source, destination, overflow="block", sample_rate=0.1, spill=None, durable=None, lanes=1, starvation_limit=STARVATION_LIMIT, latency_sample_rate=None):
         '''Connects one queue to the other.
 
         For convenience, the syntax of the queues is <modulename>.<queuename>
@@ -120,6 +147,24 @@ class Default(object):
         Args:
             source (str): The source queue in <module.queue_name> syntax
             destination (str): The destination queue in <module.queue_name> syntax
+            overflow (str): The overflow policy of the connected queue.
+            sample_rate (float): The fraction of events accepted by the sample overflow policy.
+            spill (dict): When defined, the events exceeding the queue size
+                          are spilled to disk.  Accepts the ``directory``,
+                          ``segment_size``, ``max_disk`` and ``fsync``
+                          parameters of ``wishbone.queue.Queue.enableSpill``.
+            durable (dict): When defined, the events are written to a
+                            write-ahead log until consumed.  Requires a
+                            persistent ``directory`` and accepts the
+                            ``commit_size``, ``commit_interval`` and
+                            ``max_log_size`` parameters.
+            lanes (int): The number of priority lanes of the connected queue.
+            starvation_limit (int): The max number of consecutive events
+                                    consumed from higher lanes while lower
+                                    lanes wait.
+            latency_sample_rate (float): When defined, the fraction of events
+                                         of which the time spent in the
+                                         connected queue is recorded.
         '''
 
         (source_module, source_queue) = source.split('.')
@@ -131,6 +176,9 @@ class Default(object):
         if not self.module_pool.hasModule(destination_module):
             raise NoSuchModule("Module instance %s does not exist." % (destination_module))
 
+        if durable is not None and "directory" not in durable:
+            raise InvalidConfig("Durable queue %s requires a directory." % (source))
+
         result = self.__isConnectedTo(source)
         if result is not None:
             raise QueueConnected("Queue %s is already connected to %s." % (source, result))
@@ -159,6 +207,25 @@ class Default(object):
             )
         )
 
+        source_module_instance.pool.getQueue(source_queue).setOverflow(overflow, sample_rate)
+        if lanes > 1:
+            source_module_instance.pool.getQueue(source_queue).setLanes(lanes, starvation_limit)
+        if spill is not None:
+            spill = dict(spill)
+            spill["directory"] = os.path.join(
+                spill.get("directory", os.path.join(gettempdir(), self.identification)),
+                source
+            )
+            source_module_instance.pool.getQueue(source_queue).enableSpill(**spill)
+        if durable is not None:
+            durable = dict(durable)
+            durable["path"] = os.path.join(
+                durable.pop("directory"),
+                "%s.wal" % (source)
+            )
+            source_module_instance.pool.getQueue(source_queue).enableDurability(**durable)
+        if latency_sample_rate is not None:
+            source_module_instance.pool.getQueue(source_queue).enableLatencyTracking(latency_sample_rate)
         source_module_instance.pool.getQueue(source_queue).disableFallThrough()
         source_module_instance.logging.debug("Connected queue %s to %s" % (source, destination))
 
@@ -213,6 +280,9 @@ class Default(object):
         while not self.__logsEmpty():
             sleep(0.1)
 
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+
         self.__running = False
         self.__block.set()
 
@@ -226,6 +296,19 @@ class Default(object):
             self.graph = GraphWebserver(self.config, self.module_pool, self.__block, self.graph_include_sys)
             self.graph.start()
 
+        self.__running = True
+        if self.module_pool.hasModule("_metrics"):
+            metrics = self.module_pool.getModule("_metrics")
+            metrics.pool.createSystemQueue("__router")
+            metrics.pool.getQueue("__router").disableFallThrough()
+            spawn(self.__metricCollector, metrics.pool.getQueue("__router"))
+        else:
+            spawn(self.__metricCollector, None)
+
+        if self.metrics_address is not None:
+            self.metrics_server = MetricServer(self.metrics, self.metrics_address)
+            self.metrics_server.start()
+
         for module in self.module_pool.list():
             module.start()
 
@@ -239,11 +322,17 @@ class Default(object):
         template_functions = {}
         for name, instance in list(self.config.template_functions.items()):
             template_functions[name] = self.component_manager.getComponentByName(instance.function)(**instance.arguments)
+        template_environment = createTemplateEnvironment(template_functions, self.template_cache_dir)
 
         module_functions = {}
         for name, instance in list(self.config.module_functions.items()):
             module_functions[name] = self.component_manager.getComponentByName(instance.function)(**instance.arguments)
 
+        queue_sizes = {}
+        for route in self.config.routingtable:
+            if route.get("size") is not None:
+                queue_sizes.setdefault(route.source_module, {})[route.source_queue] = route.size
+
         for name, instance in list(self.config.modules.items()):
             mod_func = {}
             for queue, queue_functions in list(instance.functions.items()):
@@ -259,16 +348,29 @@ class Default(object):
             else:
                 protocol = GetProtocolHandler(protocols[instance.protocol]["class"], protocols[instance.protocol]["arguments"]).getProtocol
 
+            sizes = dict(instance.get("queues") or {})
+            sizes.update(queue_sizes.get(name, {}))
+
             actor_config = ActorConfig(
                 name=name,
-                size=self.size,
+                size=instance.get("queue_size") or self.size,
                 frequency=self.frequency,
                 template_functions=template_functions,
                 description=instance.description,
                 module_functions=mod_func,
                 identification=self.identification,
                 protocol=protocol,
-                io_event=instance.event
+                io_event=instance.event,
+                template_environment=template_environment,
+                queue_max_bytes=self.queue_max_bytes,
+                pool_max_bytes=self.pool_max_bytes,
+                queue_sizes=sizes,
+                loglevel=self.loglevel,
+                metrics=self.metrics,
+                instrument=self.instrument,
+                concurrency=instance.get("concurrency") or 1,
+                ordered=instance.get("ordered", False),
+                batch_size=instance.get("batch_size") or 1
             )
 
             self.registerModule(
@@ -308,11 +410,41 @@ class Default(object):
         else:
             return True
 
+    def __metricCollector(self, queue):
+        '''
+        A greenthread collecting the metric registry shared by all modules at
+        the defined interval and submitting the snapshot as one bulk event
+        into ``queue``.
+
+        Args:
+            queue (wishbone.queue.Queue): The queue to submit the snapshot to.
+                                          None only collects the snapshot.
+        '''
+
+        while self.__running:
+            snapshot = self.metrics.collect()
+            if queue is not None:
+                queue.put(snapshotEvent(snapshot))
+            sleep(self.frequency)
+
     def __setupConnections(self):
         '''Setup all connections as defined by configuration_manager'''
 
         for route in self.config.routingtable:
-            self.connectQueue("%s.%s" % (route.source_module, route.source_queue), "%s.%s" % (route.destination_module, route.destination_queue))
+            latency_sample_rate = route.get("latency_sample_rate")
+            if latency_sample_rate is None:
+                latency_sample_rate = self.latency_sample_rate
+            self.connectQueue(
+                "%s.%s" % (route.source_module, route.source_queue),
+                "%s.%s" % (route.destination_module, route.destination_queue),
+                route.get("overflow", "block"),
+                route.get("sample_rate", 0.1),
+                route.get("spill"),
+                route.get("durable"),
+                route.get("lanes", 1),
+                route.get("starvation_limit", STARVATION_LIMIT),
+                latency_sample_rate
+            )
 
 
 class GraphWebserver():
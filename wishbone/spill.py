@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  spill.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+import os
+import mmap
+import shutil
+from struct import Struct
+from collections import deque
+from time import time
+from gevent.queue import Queue as Gevent_Queue
+from gevent.queue import Full
+from gevent.event import Event
+from wishbone.error import InvalidConfig
+from wishbone.event import unpackEvent
+
+SEGMENT_SIZE = 16777216
+MAX_DISK = 1073741824
+FSYNC_POLICIES = ["never", "segment", "always"]
+
+RECORD_HEADER = Struct("<I")
+
+
+class Segment(object):
+
+    '''
+    An append-only memory-mapped segment file containing length prefixed
+    records.
+
+    Args:
+        path (str): The path of the segment file.
+        size (int): The size of the segment file in bytes.
+    '''
+
+    __slots__ = ("path", "size", "file", "mm", "write_offset", "read_offset")
+
+    def __init__(self, path, size):
+
+        self.path = path
+        self.size = size
+        self.file = open(path, "w+b")
+        self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), size)
+        self.write_offset = 0
+        self.read_offset = 0
+
+    def append(self, record):
+        '''
+        Appends ``record`` to the segment.
+
+        Args:
+            record (bytes): The record to append.
+
+        Returns:
+            bool: False when the segment has no room left for ``record``.
+        '''
+
+        end = self.write_offset + RECORD_HEADER.size + len(record)
+        if end > self.size:
+            return False
+        RECORD_HEADER.pack_into(self.mm, self.write_offset, len(record))
+        self.mm[self.write_offset + RECORD_HEADER.size:end] = record
+        self.write_offset = end
+        return True
+
+    def close(self):
+        '''
+        Closes and deletes the segment file.
+        '''
+
+        self.mm.close()
+        self.file.close()
+        os.remove(self.path)
+
+    def drained(self):
+        '''
+        Returns True when all appended records have been read.
+        '''
+
+        return self.read_offset >= self.write_offset
+
+    def flush(self):
+        '''
+        Flushes the written records to disk.
+        '''
+
+        self.mm.flush()
+
+    def read(self):
+        '''
+        Returns the next record.
+
+        Returns:
+            bytes: The record.
+        '''
+
+        (length,) = RECORD_HEADER.unpack_from(self.mm, self.read_offset)
+        start = self.read_offset + RECORD_HEADER.size
+        self.read_offset = start + length
+        return self.mm[start:self.read_offset]
+
+
+class SpillBuffer(object):
+
+    '''
+    A FIFO buffer which keeps up to ``threshold`` events in memory and spills
+    the remainder to append-only memory-mapped segment files.
+
+    Spilled events are serialized using ``Event.pack()`` and read back in
+    order into memory as soon as the in-memory part has room again.  The
+    buffer is only full once ``max_disk`` is used.
+
+    It offers the subset of the ``gevent.queue.Queue`` interface used by
+    ``wishbone.queue.Queue``.
+
+    Args:
+        threshold (int): The maximum number of events kept in memory.
+        directory (str): The directory to store the segment files in.  Any
+                         content is removed.
+        segment_size (int): The size of a segment file in bytes.
+        max_disk (int): The maximum number of bytes used by segment files.
+        fsync (str): When to flush segments to disk.  One of ``never``,
+                     ``segment`` (when a segment is full) or ``always``
+                     (after each event).
+
+    Raises:
+        InvalidConfig: The fsync policy is invalid.
+    '''
+
+    def __init__(self, threshold, directory, segment_size=SEGMENT_SIZE, max_disk=MAX_DISK, fsync="segment"):
+
+        if fsync not in FSYNC_POLICIES:
+            raise InvalidConfig("Fsync policy '%s' is invalid. Choose from %s." % (fsync, ", ".join(FSYNC_POLICIES)))
+
+        self.threshold = threshold
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_disk = max_disk
+        self.fsync = fsync
+
+        self.spilled = 0
+        self.unspilled = 0
+        self.disk_bytes = 0
+
+        self.__memory = Gevent_Queue(threshold)
+        self.__segments = deque()
+        self.__count = 0
+        self.__sequence = 0
+        self.__space = Event()
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+    def close(self):
+        '''
+        Closes the buffer and deletes all segment files.
+        '''
+
+        while self.__segments:
+            self.__segments.popleft().close()
+        self.__count = 0
+        self.disk_bytes = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def empty(self):
+
+        return self.qsize() == 0
+
+    def get(self, block=True, timeout=None):
+
+        element = self.__memory.get(block=block, timeout=timeout)
+        self.__unspill()
+        return element
+
+    def get_nowait(self):
+
+        return self.get(block=False)
+
+    def put(self, element, block=True, timeout=None):
+
+        if timeout is not None:
+            deadline = time() + timeout
+        while True:
+            try:
+                return self.put_nowait(element)
+            except Full:
+                if not block:
+                    raise
+                self.__space.clear()
+                if timeout is None:
+                    self.__space.wait()
+                elif not self.__space.wait(max(0, deadline - time())):
+                    raise
+
+    def put_nowait(self, element):
+
+        if self.__count == 0:
+            try:
+                return self.__memory.put_nowait(element)
+            except Full:
+                pass
+        self.__spill(element)
+
+    def qsize(self):
+
+        return self.__memory.qsize() + self.__count
+
+    def __spill(self, element):
+
+        record = element.pack()
+        if not self.__segments or not self.__segments[-1].append(record):
+            size = max(self.segment_size, RECORD_HEADER.size + len(record))
+            if self.disk_bytes + size > self.max_disk:
+                raise Full
+            if self.__segments and self.fsync != "never":
+                self.__segments[-1].flush()
+            self.__sequence += 1
+            segment = Segment(os.path.join(self.directory, "%020d.segment" % (self.__sequence)), size)
+            segment.append(record)
+            self.__segments.append(segment)
+            self.disk_bytes += size
+        if self.fsync == "always":
+            self.__segments[-1].flush()
+        self.__count += 1
+        self.spilled += 1
+
+    def __unspill(self):
+
+        while self.__count > 0 and self.__memory.qsize() < self.threshold:
+            segment = self.__segments[0]
+            self.__memory.put_nowait(unpackEvent(segment.read()))
+            self.__count -= 1
+            self.unspilled += 1
+            if segment.drained():
+                self.__segments.popleft().close()
+                self.disk_bytes -= segment.size
+        self.__space.set()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  templatecache.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+from collections import OrderedDict
+
+
+TEMPLATE_CACHE_SIZE = 2048
+
+
+class TemplateCache(object):
+
+    '''
+    A LRU cache of compiled Jinja2 templates.
+
+    Compiling a template is by far the most expensive part of rendering it.
+    Templates are cached by (environment, source) so each distinct template
+    string is only compiled once per environment.
+
+    Args:
+        size (int): The maximum number of compiled templates to keep.
+    '''
+
+    def __init__(self, size=TEMPLATE_CACHE_SIZE):
+
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__cache = OrderedDict()
+
+    def clear(self):
+        '''
+        Removes all compiled templates from the cache.
+        '''
+
+        self.__cache.clear()
+
+    def get(self, environment, source, compiler=None):
+        '''
+        Returns the compiled template of ``source``.
+
+        Args:
+            environment (jinja2.Environment): The environment to compile the template with.
+            source (str): The template string.
+            compiler (func): An optional function accepting ``environment`` and
+                ``source`` returning the compiled template.  Defaults to
+                ``compileString``.
+
+        Returns:
+            jinja2.Template: The compiled template.
+
+        Raises:
+            jinja2.TemplateSyntaxError: ``source`` is not a valid template.
+        '''
+
+        key = (environment, source, compiler)
+        try:
+            template = self.__cache[key]
+        except KeyError:
+            self.misses += 1
+            if compiler is None:
+                template = compileString(environment, source)
+            else:
+                template = compiler(environment, source)
+            self.__store(key, template)
+        else:
+            self.hits += 1
+            self.__cache.move_to_end(key)
+        return template
+
+    def getFile(self, environment, filename):
+        '''
+        Returns the compiled template of ``filename`` loaded by the
+        environment's loader. The template is reloaded when the file changed.
+
+        Args:
+            environment (jinja2.Environment): The environment to load the template with.
+            filename (str): The name of the template file.
+
+        Returns:
+            jinja2.Template: The compiled template.
+        '''
+
+        key = (environment, None, filename)
+        template = self.__cache.get(key)
+        if template is not None and template.is_up_to_date:
+            self.hits += 1
+            self.__cache.move_to_end(key)
+        else:
+            self.misses += 1
+            template = environment.get_template(filename)
+            self.__store(key, template)
+        return template
+
+    def stats(self):
+        '''
+        Returns the statistics of the cache.
+
+        Returns:
+            dict: The cache statistics.
+        '''
+
+        return {
+            "size": len(self.__cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def __store(self, key, template):
+
+        self.__cache[key] = template
+        if len(self.__cache) > self.size:
+            self.__cache.popitem(last=False)
+            self.evictions += 1
+
+
+def compileString(environment, source):
+    '''
+    Compiles template string ``source``.
+
+    Jinja2 only consults the bytecode cache for templates loaded through a
+    loader.  When ``environment`` has a bytecode cache, the compiled code of
+    template strings is stored in and loaded from it as well.
+
+    Args:
+        environment (jinja2.Environment): The environment to compile the template with.
+        source (str): The template string.
+
+    Returns:
+        jinja2.Template: The compiled template.
+    '''
+
+    cache = environment.bytecode_cache
+    if cache is None:
+        return environment.from_string(source)
+
+    bucket = cache.get_bucket(environment, source, None, source)
+    if bucket.code is None:
+        bucket.code = environment.compile(source)
+        cache.set_bucket(bucket)
+    return environment.template_class.from_code(environment, bucket.code, environment.make_globals(None), None)
+
+
+TEMPLATE_CACHE = TemplateCache()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  histogram.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_VALUE_BITS = 40
+
+
+def bucketIndex(value):
+    '''
+    Returns the index of the bucket holding ``value``.
+
+    Values below ``SUB_BUCKETS`` have a bucket of their own.  Larger values
+    share a bucket with all values with the same ``SUB_BUCKET_BITS`` most
+    significant bits, which bounds the relative error to about 3%.
+
+    Args:
+        value (int): A positive integer.
+
+    Returns:
+        int: The bucket index.
+    '''
+
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def bucketValue(index):
+    '''
+    Returns the highest value stored in bucket ``index``.
+
+    Args:
+        index (int): The bucket index.
+
+    Returns:
+        int: The highest value of the bucket.
+    '''
+
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+    return ((index - (shift << (SUB_BUCKET_BITS - 1)) + 1) << shift) - 1
+
+
+class Histogram(object):
+
+    '''
+    A fixed memory histogram with logarithmic buckets in the spirit of
+    HdrHistogram.
+
+    Values are recorded in seconds with microsecond resolution.  Values
+    larger than ``2 ** MAX_VALUE_BITS`` microseconds are stored in the last
+    bucket.
+    '''
+
+    SIZE = bucketIndex((1 << MAX_VALUE_BITS) - 1) + 1
+
+    def __init__(self):
+
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.max = 0
+
+    def percentile(self, percentile):
+        '''
+        Returns the value at ``percentile``.
+
+        Args:
+            percentile (float): The percentile between 0 and 100.
+
+        Returns:
+            float: The value in seconds.  0 when no values are recorded.
+        '''
+
+        if self.count == 0:
+            return 0.0
+        threshold = max(1, self.count * percentile / 100.0)
+        total = 0
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= threshold:
+                return min(bucketValue(index), self.max) / 1000000.0
+        return self.max / 1000000.0
+
+    def record(self, value):
+        '''
+        Records ``value``.
+
+        Args:
+            value (float): The value in seconds.
+        '''
+
+        value = int(value * 1000000)
+        if value < 0:
+            value = 0
+        if value > self.max:
+            self.max = value
+        self.counts[min(bucketIndex(value), self.SIZE - 1)] += 1
+        self.count += 1
+
+    def reset(self):
+        '''
+        Removes all recorded values.
+        '''
+
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.max = 0
+
+    def summary(self, percentiles=(50, 90, 99)):
+        '''
+        Returns the requested percentiles, the max and the number of
+        recorded values.
+
+        Args:
+            percentiles (tuple): The percentiles to include.
+
+        Returns:
+            dict: The values in seconds keyed by ``p<percentile>``, ``max``
+                  and ``count``.
+        '''
+
+        summary = {}
+        for percentile in percentiles:
+            summary["p%s" % (percentile)] = self.percentile(percentile)
+        summary["max"] = self.max / 1000000.0
+        summary["count"] = self.count
+        return summary
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  ruleindex.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+import re
+from collections.abc import Mapping
+from wishbone.error import InvalidData
+from wishbone.event import compileKey
+
+MISSING = object()
+
+
+def _equals(value, operand):
+
+    return value == operand
+
+
+def _in(value, operand):
+
+    return value in operand
+
+
+def _regex(value, operand):
+
+    return isinstance(value, str) and operand.match(value) is not None
+
+
+def _gt(value, operand):
+
+    return value > operand
+
+
+def _gte(value, operand):
+
+    return value >= operand
+
+
+def _lt(value, operand):
+
+    return value < operand
+
+
+def _lte(value, operand):
+
+    return value <= operand
+
+
+OPERATORS = {
+    "equals": _equals,
+    "in": _in,
+    "regex": _regex,
+    "gt": _gt,
+    "gte": _gte,
+    "lt": _lt,
+    "lte": _lte
+}
+
+
+class RuleIndex(object):
+
+    '''
+    Compiles declarative match rules into an index which returns the rules
+    matching an event without evaluating each rule.
+
+    A rule looks like this:
+
+    ::
+
+        { "name": "name of the rule",
+          "match": {
+              "data.env": "production",
+              "data.region": {"in": ["eu", "us"]},
+              "data.host": {"regex": "^web"},
+              "data.level": {"gte": 3, "lt": 6}
+          }
+        }
+
+    All conditions of a rule have to match.  A plain value is shorthand for
+    ``{"equals": value}``.  Supported operators are ``equals``, ``in``,
+    ``regex``, ``gt``, ``gte``, ``lt`` and ``lte``.
+
+    Each rule is indexed on the value(s) of its first ``equals`` or ``in``
+    condition so that only the rules referring to the value of the event are
+    evaluated.  The remaining conditions and the rules without any
+    ``equals`` or ``in`` condition are evaluated one by one.
+
+    Args:
+        rules (list): A list of rule dicts.
+
+    Raises:
+        InvalidData: A rule is invalid.
+    '''
+
+    def __init__(self, rules=[]):
+
+        self.rules = []
+        self.index = {}
+        self.residual = []
+
+        for position, rule in enumerate(rules):
+            self.__compile(position, rule)
+
+    def __len__(self):
+
+        return len(self.rules)
+
+    def match(self, event):
+        '''
+        Returns the rules matching ``event`` in the order they were defined.
+
+        Args:
+            event (wishbone.event.Event): The event to match.
+
+        Returns:
+            list: The matching rule dicts.
+        '''
+
+        candidates = list(self.residual)
+        for path, values in self.index.items():
+            value = self.__get(path, event)
+            try:
+                candidates.extend(values.get(value, ()))
+            except TypeError:
+                continue
+
+        matches = []
+        for position in sorted(set(candidates)):
+            (rule, predicates) = self.rules[position]
+            for path, operator, operand in predicates:
+                value = self.__get(path, event)
+                try:
+                    if value is MISSING or not operator(value, operand):
+                        break
+                except TypeError:
+                    break
+            else:
+                matches.append(rule)
+        return matches
+
+    def __compile(self, position, rule):
+
+        if not isinstance(rule.get("match"), Mapping) or len(rule["match"]) == 0:
+            raise InvalidData("Rule '%s' requires a 'match' dict with at least one condition." % (rule.get("name")))
+
+        predicates = []
+        indexed = None
+        for field, conditions in rule["match"].items():
+            path = compileKey(field)
+            if not isinstance(conditions, Mapping):
+                conditions = {"equals": conditions}
+            for operator, operand in conditions.items():
+                if operator not in OPERATORS:
+                    raise InvalidData("Rule '%s' has unsupported operator '%s'." % (rule.get("name"), operator))
+                elif operator == "regex":
+                    operand = re.compile(operand)
+                elif operator == "in":
+                    operand = list(operand)
+
+                if indexed is None and operator in ("equals", "in") and self.__hashable(operand if operator == "in" else [operand]):
+                    indexed = (path, [operand] if operator == "equals" else operand)
+                else:
+                    predicates.append((path, OPERATORS[operator], operand))
+
+        self.rules.append((rule, predicates))
+        if indexed is None:
+            self.residual.append(position)
+        else:
+            (path, values) = indexed
+            for value in values:
+                self.index.setdefault(path, {}).setdefault(value, []).append(position)
+
+    def __hashable(self, values):
+
+        try:
+            for value in values:
+                hash(value)
+        except TypeError:
+            return False
+        else:
+            return True
+
+    def __get(self, path, event):
+
+        try:
+            return path.get(event.data)
+        except (KeyError, IndexError, TypeError):
+            return MISSING
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  wal.py
+#
+#  Copyright 2018 Jelle Smet <development@smetj.net>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+#
+
+import os
+from uuid import uuid4
+from struct import Struct
+from collections import OrderedDict, deque
+from gevent import spawn_later, get_hub
+from gevent.queue import Full
+from gevent.lock import Semaphore
+from wishbone.event import unpackEvent
+
+COMMIT_SIZE = 100
+COMMIT_INTERVAL = 0.01
+MAX_LOG_SIZE = 67108864
+
+RECORD_HEADER = Struct("<BQI")
+PUT = 1
+ACK = 2
+
+
+class DurableBuffer(object):
+
+    '''
+    Wraps a queue buffer and records each accepted event in a write-ahead log
+    until it is acknowledged using ``ack()``.
+
+    Each record is written to the log when the event is accepted so it
+    survives the process being killed.  The log is fsynced once per
+    ``commit_size`` events or at the latest ``commit_interval`` seconds after
+    the first uncommitted event (group commit).  A ``commit_size`` of 1
+    fsyncs each event.  The fsync runs in the threadpool of the gevent hub
+    so other greenlets keep running while the writers of the log wait for
+    it to finish.
+
+    The sequence numbers of the records of an event are kept in the tracking
+    state of the event so acknowledging works regardless of the buffers the
+    event passed through.
+
+    At initialization the events of ``path`` which were never acknowledged
+    are replayed in their original order ahead of any new event.  The log
+    is compacted to the unacknowledged events at startup and whenever it
+    grows beyond ``max_log_size``.
+
+    It offers the subset of the ``gevent.queue.Queue`` interface used by
+    ``wishbone.queue.Queue``.
+
+    Args:
+        buffer (gevent.queue.Queue): The buffer to wrap.
+        path (str): The filename of the write-ahead log.
+        commit_size (int): The number of events covered by one fsync.
+        commit_interval (float): The maximum number of seconds an event
+                                 remains uncommitted.
+        max_log_size (int): The log size in bytes after which the log is
+                            compacted.
+    '''
+
+    def __init__(self, buffer, path, commit_size=COMMIT_SIZE, commit_interval=COMMIT_INTERVAL, max_log_size=MAX_LOG_SIZE):
+
+        self.buffer = buffer
+        self.path = path
+        self.commit_size = commit_size
+        self.commit_interval = commit_interval
+        self.max_log_size = max_log_size
+        self.key = uuid4().hex
+
+        self.commits = 0
+        self.replayed = 0
+        self.log_bytes = 0
+
+        self.__pending = OrderedDict()
+        self.__sequence = 0
+        self.__uncommitted = 0
+        self.__timer = None
+        self.__backlog = deque()
+        self.__fd = None
+        self.__lock = Semaphore()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.__replay()
+
+    def ack(self, element):
+        '''
+        Acknowledges ``element`` so it is not replayed anymore.
+
+        Args:
+            element (wishbone.event.Event): The event to acknowledge.
+        '''
+
+        if not element.tracking or self.key not in element.tracking:
+            return
+        sequences = element.tracking[self.key]
+        sequence = sequences.pop(0)
+        if not sequences:
+            del(element.tracking[self.key])
+        del(self.__pending[sequence])
+        self.__write(RECORD_HEADER.pack(ACK, sequence, 0))
+
+    def close(self, delete=False):
+        '''
+        Commits and closes the log.
+
+        Args:
+            delete (bool): Deletes the log, discarding the unacknowledged events.
+        '''
+
+        if self.__fd is not None:
+            self.commit()
+            os.close(self.__fd)
+            self.__fd = None
+        if delete and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def commit(self):
+        '''
+        Fsyncs the log.
+        '''
+
+        if self.__timer is not None:
+            self.__timer.kill(block=False)
+            self.__timer = None
+        with self.__lock:
+            if self.__uncommitted > 0:
+                get_hub().threadpool.apply(os.fsync, (self.__fd,))
+                self.__uncommitted = 0
+                self.commits += 1
+            if self.log_bytes > self.max_log_size:
+                self.__compact()
+
+    def empty(self):
+
+        return self.qsize() == 0
+
+    def evict(self):
+
+        return self.__refill(getattr(self.buffer, "evict", self.buffer.get_nowait)())
+
+    def get(self, block=True, timeout=None):
+
+        return self.__refill(self.buffer.get(block=block, timeout=timeout))
+
+    def get_nowait(self):
+
+        return self.get(block=False)
+
+    def pending(self):
+        '''
+        Returns the number of unacknowledged events.
+        '''
+
+        return len(self.__pending)
+
+    def put(self, element, block=True, timeout=None):
+
+        (sequence, payload) = self.__pack(element)
+        try:
+            self.buffer.put(element, block=block, timeout=timeout)
+        except BaseException:
+            self.__untrack(element, sequence)
+            raise
+        self.__log(sequence, payload)
+
+    def put_nowait(self, element):
+
+        self.put(element, block=False)
+
+    def qsize(self):
+
+        return self.buffer.qsize() + len(self.__backlog)
+
+    def __compact(self):
+
+        tmp = "%s.tmp" % (self.path)
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        size = 0
+        for sequence, payload in self.__pending.items():
+            size += os.write(fd, RECORD_HEADER.pack(PUT, sequence, len(payload)) + payload)
+        get_hub().threadpool.apply(os.fsync, (fd,))
+        os.close(fd)
+        os.rename(tmp, self.path)
+
+        if self.__fd is not None:
+            os.close(self.__fd)
+        self.__fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        self.log_bytes = size
+        self.max_log_size = max(self.max_log_size, size * 2)
+
+    def __log(self, sequence, payload):
+
+        self.__pending[sequence] = payload
+        self.__write(RECORD_HEADER.pack(PUT, sequence, len(payload)) + payload)
+        self.__uncommitted += 1
+        if self.__uncommitted >= self.commit_size:
+            self.commit()
+        elif self.__timer is None:
+            self.__timer = spawn_later(self.commit_interval, self.__timedCommit)
+
+    def __pack(self, element):
+        '''
+        Assigns the next sequence number to ``element`` and serializes it
+        before it is handed to the wrapped buffer.
+        '''
+
+        self.__sequence += 1
+        sequence = self.__sequence
+        if element.tracking is None:
+            element.tracking = {}
+        element.tracking.setdefault(self.key, []).append(sequence)
+        try:
+            return (sequence, element.pack())
+        except BaseException:
+            self.__untrack(element, sequence)
+            raise
+
+    def __refill(self, element):
+
+        while self.__backlog:
+            try:
+                self.buffer.put_nowait(self.__backlog[0])
+            except Full:
+                break
+            self.__backlog.popleft()
+        return element
+
+    def __replay(self):
+
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(data):
+            (kind, sequence, length) = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            if start + length > len(data):
+                # A partially written record of a crashed process.
+                break
+            if kind == PUT:
+                self.__pending[sequence] = data[start:start + length]
+            else:
+                self.__pending.pop(sequence, None)
+            self.__sequence = max(self.__sequence, sequence)
+            offset = start + length
+
+        self.__compact()
+
+        for sequence, payload in self.__pending.items():
+            event = unpackEvent(payload)
+            event.tracking = {self.key: [sequence]}
+            try:
+                self.buffer.put_nowait(event)
+            except Full:
+                self.__backlog.append(event)
+            self.replayed += 1
+
+    def __timedCommit(self):
+
+        self.__timer = None
+        self.commit()
+
+    def __untrack(self, element, sequence):
+
+        sequences = element.tracking[self.key]
+        sequences.remove(sequence)
+        if not sequences:
+            del(element.tracking[self.key])
+
+    def __write(self, record):
+
+        with self.__lock:
+            self.log_bytes += os.write(self.__fd, record)